@@ -0,0 +1,303 @@
+/* -*- Mode: vala; indent-tabs-mode: nil; c-basic-offset: 2; tab-width: 2 -*-  */
+/* gflow-benchmark.vala
+ *
+ * This library is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU Lesser General Public
+ * License as published by the Free Software Foundation; either
+ * version 2.1 of the License, or (at your option) any later version.
+
+ * This library is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ * Lesser General Public License for more details.
+
+ * You should have received a copy of the GNU Lesser General Public
+ * License along with this library; if not, see <http://www.gnu.org/licenses/>.
+ */
+using GFlow;
+
+/**
+ * Sums up all its inputs
+ */
+public class GFlowBenchmark.SumNode : GFlow.SimpleNode
+{
+  public GFlow.SimpleSource output;
+
+  public SumNode ()
+  {
+    output = new GFlow.SimpleSource (0);
+    try {
+      add_source (output);
+    } catch (GLib.Error e) { warning (e.message); }
+    evaluate.connect (() => {
+      int total = 0;
+      foreach (Sink s in get_sinks ())
+        total += s.val.get_int ();
+      try { output.set_value (total); } catch (GLib.Error e) { warning (e.message); }
+    });
+  }
+
+  public GFlow.SimpleSink add_input () throws GLib.Error
+  {
+    var snk = new GFlow.SimpleSink (0);
+    add_sink (snk);
+    return snk;
+  }
+}
+
+/**
+ * The connections of a synthetic graph. Every edge leads from a node
+ * with a lower to a node with a higher index, so the graph is acyclic.
+ */
+public class GFlowBenchmark.Shape
+{
+  public string name;
+  public int n_nodes;
+  public int[] from = {};
+  public int[] to = {};
+
+  public Shape (string name, int n_nodes)
+  {
+    this.name = name;
+    this.n_nodes = n_nodes;
+  }
+
+  public void add_edge (int a, int b)
+  {
+    from += a;
+    to += b;
+  }
+
+  public static Shape chain (int n)
+  {
+    var s = new Shape ("chain", n);
+    for (int i = 1; i < n; i++)
+      s.add_edge (i - 1, i);
+    return s;
+  }
+
+  public static Shape fan_out (int n)
+  {
+    var s = new Shape ("fan-out", n);
+    for (int i = 1; i < n; i++)
+      s.add_edge (0, i);
+    return s;
+  }
+
+  // A chain of diamonds a -> b, a -> c, (b, c) -> d, where d is the a
+  // of the next diamond
+  public static Shape diamonds (int n)
+  {
+    var s = new Shape ("diamonds", n);
+    for (int a = 0; a + 3 < n; a += 3) {
+      s.add_edge (a, a + 1);
+      s.add_edge (a, a + 2);
+      s.add_edge (a + 1, a + 3);
+      s.add_edge (a + 2, a + 3);
+    }
+    return s;
+  }
+
+  public static Shape random_dag (int n, int degree, uint32 seed)
+  {
+    var s = new Shape ("random", n);
+    var rand = new Rand.with_seed (seed);
+    for (int i = 1; i < n; i++) {
+      for (int k = 0; k < int.min (degree, i); k++)
+        s.add_edge (rand.int_range (0, i), i);
+    }
+    return s;
+  }
+}
+
+public class GFlowBenchmark.Main
+{
+  private static string? output = null;
+  private static string? sizes = null;
+  private static bool quick = false;
+  private static int repetitions = 20;
+  private static int soak_cycles = 2000000;
+
+  private const OptionEntry[] options = {
+    { "output", 'o', 0, OptionArg.FILENAME, ref output, "Write the results to FILE instead of stdout", "FILE" },
+    { "sizes", 's', 0, OptionArg.STRING, ref sizes, "Comma separated graph sizes", "N,N,..." },
+    { "quick", 'q', 0, OptionArg.NONE, ref quick, "Only run small graphs", null },
+    { "repetitions", 'r', 0, OptionArg.INT, ref repetitions, "Repetitions of the latency measurements", "N" },
+    { "soak-cycles", 0, 0, OptionArg.INT, ref soak_cycles, "Reconnections of the soak benchmark, 0 to skip it", "N" },
+    { null }
+  };
+
+  private static StringBuilder results;
+  private static bool first_result = true;
+
+  private static void record (string benchmark, Shape shape, double value, string unit)
+  {
+    if (!first_result)
+      results.append (",\n");
+    first_result = false;
+    results.append_printf ("    {\"benchmark\": \"%s\", \"shape\": \"%s\", \"nodes\": %d, \"edges\": %d, \"value\": %s, \"unit\": \"%s\"}",
+                           benchmark, shape.name, shape.n_nodes, shape.from.length,
+                           value.to_string (), unit);
+    stderr.printf ("%-14s %-9s %7d nodes  %14.3f %s\n", benchmark, shape.name, shape.n_nodes, value, unit);
+  }
+
+  private static void run (Shape shape) throws GLib.Error
+  {
+    var graph = new GFlow.Graph ();
+    var nodes = new GenericArray<SumNode> ();
+    for (int i = 0; i < shape.n_nodes; i++) {
+      var n = new SumNode ();
+      graph.add_node (n);
+      nodes.add (n);
+    }
+    var sinks = new GenericArray<GFlow.SimpleSink> ();
+    for (int e = 0; e < shape.from.length; e++)
+      sinks.add (nodes[shape.to[e]].add_input ());
+
+    var timer = new Timer ();
+    for (int e = 0; e < shape.from.length; e++)
+      sinks[e].connect (nodes[shape.from[e]].output);
+    timer.stop ();
+    record ("connect", shape, shape.from.length / double.max (timer.elapsed (), 1e-9), "edges/s");
+
+    timer.start ();
+    for (int i = 0; i < repetitions; i++)
+      nodes[0].output.set_value (i + 1);
+    timer.stop ();
+    record ("set-value", shape, timer.elapsed () * 1000 / repetitions, "ms");
+
+    // The check run for every new connection
+    var rand = new Rand.with_seed (42);
+    int queries = 1000;
+    timer.start ();
+    for (int i = 0; i < queries; i++) {
+      var a = nodes[rand.int_range (0, shape.n_nodes)];
+      var b = nodes[rand.int_range (0, shape.n_nodes)];
+      a.is_recursive (b);
+    }
+    timer.stop ();
+    record ("is-recursive", shape, timer.elapsed () * 1000000 / queries, "us");
+
+    timer.start ();
+    for (int e = 0; e < shape.from.length; e++)
+      sinks[e].disconnect (nodes[shape.from[e]].output);
+    timer.stop ();
+    record ("disconnect", shape, shape.from.length / double.max (timer.elapsed (), 1e-9), "edges/s");
+  }
+
+  // The resident set size of this process in KiB, or -1 if unknown
+  private static int64 resident_size ()
+  {
+    string status;
+    try {
+      FileUtils.get_contents ("/proc/self/status", out status);
+    } catch (FileError e) {
+      return -1;
+    }
+    foreach (string line in status.split ("\n")) {
+      if (line.has_prefix ("VmRSS:"))
+        return int64.parse (line.substring (6).strip ().split (" ")[0]);
+    }
+    return -1;
+  }
+
+  /**
+   * Connects and disconnects a sink over and over. Memory and the
+   * latency of updates have to stay flat, so nothing may be left
+   * behind by a connection once it is gone.
+   */
+  private static void run_soak (int cycles) throws GLib.Error
+  {
+    var shape = new Shape ("soak", 2);
+    shape.add_edge (0, 1);
+    var graph = new GFlow.Graph ();
+    var a = new SumNode ();
+    var b = new SumNode ();
+    graph.add_node (a);
+    graph.add_node (b);
+    var snk = b.add_input ();
+    // Keep a few connections around, so updates do some work
+    for (int i = 0; i < 10; i++)
+      graph.add_node (new SumNode ());
+    foreach (Node n in graph.get_nodes ()) {
+      if (n != a && n != b)
+        ((SumNode) n).add_input ().connect (a.output);
+    }
+
+    int blocks = 10;
+    int updates = 1000;
+    var timer = new Timer ();
+    for (int block = 0; block <= blocks; block++) {
+      if (block > 0) {
+        for (int i = 0; i < cycles / blocks; i++) {
+          snk.connect (a.output);
+          snk.disconnect (a.output);
+        }
+      }
+      snk.connect (a.output);
+      timer.start ();
+      for (int i = 0; i < updates; i++)
+        a.output.set_value (i);
+      timer.stop ();
+      snk.disconnect (a.output);
+      shape.name = "soak-%d".printf (block * (cycles / blocks));
+      record ("soak-update", shape, timer.elapsed () * 1000000 / updates, "us");
+      int64 rss = resident_size ();
+      if (rss >= 0)
+        record ("soak-rss", shape, rss, "KiB");
+    }
+  }
+
+  public static int main (string[] args)
+  {
+    try {
+      var context = new OptionContext ("- benchmarks libgflow on synthetic graphs");
+      context.add_main_entries (options, null);
+      context.parse (ref args);
+    } catch (OptionError e) {
+      stderr.printf ("%s\n", e.message);
+      return 1;
+    }
+    int[] n_nodes = { 100, 1000, 10000, 30000 };
+    if (quick) {
+      n_nodes = { 100, 1000 };
+      soak_cycles = int.min (soak_cycles, 200000);
+    }
+    if (sizes != null) {
+      n_nodes = {};
+      foreach (string size in sizes.split (","))
+        n_nodes += int.parse (size);
+    }
+
+    results = new StringBuilder ();
+    results.append ("{\n  \"suite\": \"gflow\",\n");
+    results.append_printf ("  \"timestamp\": \"%s\",\n", new DateTime.now_utc ().format ("%FT%TZ"));
+    results.append ("  \"results\": [\n");
+    try {
+      foreach (int n in n_nodes) {
+        run (Shape.chain (n));
+        run (Shape.fan_out (n));
+        run (Shape.diamonds (n));
+        run (Shape.random_dag (n, 3, 42));
+      }
+      if (soak_cycles > 0)
+        run_soak (soak_cycles);
+    } catch (GLib.Error e) {
+      stderr.printf ("%s\n", e.message);
+      return 1;
+    }
+    results.append ("\n  ]\n}\n");
+
+    if (output == null) {
+      stdout.printf ("%s", results.str);
+      return 0;
+    }
+    try {
+      FileUtils.set_contents (output, results.str);
+    } catch (FileError e) {
+      stderr.printf ("%s\n", e.message);
+      return 1;
+    }
+    return 0;
+  }
+}
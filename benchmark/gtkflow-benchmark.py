@@ -0,0 +1,213 @@
+#!/usr/bin/python3
+"""
+Benchmarks libgtkflow on synthetic graphs
+
+Renders into an offscreen window, so it needs a display. Use
+run_benchmarks.sh to run it in a virtual framebuffer. The results are
+written as JSON in the same format as gflow_benchmark.
+"""
+
+import argparse
+import datetime
+import json
+import random
+import sys
+import time
+
+import gi
+gi.require_version("Gtk", "3.0")
+from gi.repository import Gdk
+from gi.repository import Gtk
+from gi.repository import GtkFlow
+
+import cairo
+
+COLUMNS = 40
+SPACING_X = 220
+SPACING_Y = 140
+FRAME_WIDTH = 1920
+FRAME_HEIGHT = 1080
+
+
+class SumNode(GtkFlow.Node):
+    def __init__(self):
+        GtkFlow.Node.__init__(self)
+        self.output = GtkFlow.Source.new(0)
+        self.output.set_label("sum")
+        self.add_source(self.output)
+        self.inputs = []
+
+    def add_input(self):
+        snk = GtkFlow.Sink.new(0)
+        snk.set_label("in %d" % len(self.inputs))
+        snk.connect("changed", self.do_sum)
+        self.add_sink(snk)
+        self.inputs.append(snk)
+        return snk
+
+    def do_sum(self, dock, val=None):
+        total = 0
+        for snk in self.inputs:
+            try:
+                total += snk.get_value()
+            except Exception:
+                pass
+        self.output.set_value(total)
+
+
+def chain(n):
+    return "chain", n, [(i - 1, i) for i in range(1, n)]
+
+def fan_out(n):
+    return "fan-out", n, [(0, i) for i in range(1, n)]
+
+def diamonds(n):
+    edges = []
+    for a in range(0, n - 3, 3):
+        edges += [(a, a + 1), (a, a + 2), (a + 1, a + 3), (a + 2, a + 3)]
+    return "diamonds", n, edges
+
+def random_dag(n, degree=3, seed=42):
+    rand = random.Random(seed)
+    edges = []
+    for i in range(1, n):
+        for k in range(min(degree, i)):
+            edges.append((rand.randrange(0, i), i))
+    return "random", n, edges
+
+
+def process_events():
+    while Gtk.events_pending():
+        Gtk.main_iteration_do(False)
+
+
+class Benchmark:
+    def __init__(self, repetitions):
+        self.repetitions = repetitions
+        self.results = []
+
+    def record(self, benchmark, shape, value, unit):
+        name, n_nodes, edges = shape
+        self.results.append({
+            "benchmark": benchmark,
+            "shape": name,
+            "nodes": n_nodes,
+            "edges": len(edges),
+            "value": value,
+            "unit": unit,
+        })
+        sys.stderr.write("%-14s %-9s %7d nodes  %14.3f %s\n" % (benchmark, name, n_nodes, value, unit))
+
+    def run(self, shape):
+        name, n_nodes, edges = shape
+        window = Gtk.OffscreenWindow()
+        window.set_default_size(FRAME_WIDTH, FRAME_HEIGHT)
+        nv = GtkFlow.NodeView.new()
+        window.add(nv)
+
+        nodes = [SumNode() for i in range(n_nodes)]
+        sinks = [nodes[b].add_input() for a, b in edges]
+        nv.freeze()
+        for i, node in enumerate(nodes):
+            nv.add(node)
+            node.set_position((i % COLUMNS) * SPACING_X, (i // COLUMNS) * SPACING_Y)
+        nv.thaw()
+        window.show_all()
+        process_events()
+
+        start = time.perf_counter()
+        for (a, b), snk in zip(edges, sinks):
+            nodes[a].output.add_sink(snk)
+        self.record("connect", shape, len(edges) / max(time.perf_counter() - start, 1e-9), "edges/s")
+
+        start = time.perf_counter()
+        for i in range(self.repetitions):
+            nodes[0].output.set_value(i + 1)
+        self.record("set-value", shape, (time.perf_counter() - start) * 1000 / self.repetitions, "ms")
+
+        rand = random.Random(42)
+        queries = 1000
+        start = time.perf_counter()
+        for i in range(queries):
+            rand.choice(nodes).is_recursive(rand.choice(nodes), True)
+        self.record("is-recursive", shape, (time.perf_counter() - start) * 1000000 / queries, "us")
+
+        event = Gdk.Event.new(Gdk.EventType.MOTION_NOTIFY)
+        event.window = nv.get_window()
+        width = min(n_nodes, COLUMNS) * SPACING_X
+        height = (n_nodes // COLUMNS + 1) * SPACING_Y
+        start = time.perf_counter()
+        for i in range(queries):
+            event.x = rand.uniform(0, width)
+            event.y = rand.uniform(0, height)
+            nv.emit("motion-notify-event", event)
+        self.record("hit-test", shape, (time.perf_counter() - start) * 1000000 / queries, "us")
+
+        surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, FRAME_WIDTH, FRAME_HEIGHT)
+        for cached in (False, True):
+            nv.props.cache_node_surfaces = cached
+            cr = cairo.Context(surface)
+            nv.draw(cr)
+            start = time.perf_counter()
+            for i in range(self.repetitions):
+                cr = cairo.Context(surface)
+                nv.draw(cr)
+            frame_time = (time.perf_counter() - start) * 1000 / self.repetitions
+            self.record("draw-cached" if cached else "draw", shape, frame_time, "ms")
+        nv.props.cache_node_surfaces = False
+
+        # A zoomed out overview of the whole graph
+        nv.props.zoom = max(min(FRAME_WIDTH / width, FRAME_HEIGHT / height, 1.0), 0.01)
+        start = time.perf_counter()
+        for i in range(self.repetitions):
+            cr = cairo.Context(surface)
+            nv.draw(cr)
+        self.record("draw-overview", shape, (time.perf_counter() - start) * 1000 / self.repetitions, "ms")
+        nv.props.zoom = 1.0
+
+        start = time.perf_counter()
+        for (a, b), snk in zip(edges, sinks):
+            nodes[a].output.remove_sink(snk)
+        self.record("disconnect", shape, len(edges) / max(time.perf_counter() - start, 1e-9), "edges/s")
+
+        window.destroy()
+        process_events()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks libgtkflow on synthetic graphs")
+    parser.add_argument("-o", "--output", help="Write the results to this file instead of stdout")
+    parser.add_argument("-s", "--sizes", help="Comma separated graph sizes")
+    parser.add_argument("-q", "--quick", action="store_true", help="Only run small graphs")
+    parser.add_argument("-r", "--repetitions", type=int, default=20,
+                        help="Repetitions of the latency measurements")
+    # Accepted so run_benchmarks.sh can pass the same options to both suites
+    parser.add_argument("--soak-cycles", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sizes = [100, 1000, 5000]
+    if args.quick:
+        sizes = [100, 1000]
+    if args.sizes:
+        sizes = [int(n) for n in args.sizes.split(",")]
+
+    benchmark = Benchmark(args.repetitions)
+    for n in sizes:
+        for shape in (chain(n), fan_out(n), diamonds(n), random_dag(n)):
+            benchmark.run(shape)
+
+    results = {
+        "suite": "gtkflow",
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "results": benchmark.results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+#!/bin/bash
+# Runs all benchmarks and stores their results as JSON in $OUT_DIR
+# (benchmark-results by default). Pass --quick to only run small
+# graphs. GtkFlow is rendered in a virtual framebuffer unless
+# there is a display.
+export LD_LIBRARY_PATH=/usr/local/lib
+export GI_TYPELIB_PATH=/usr/local/lib/girepository-1.0/
+
+dir=$(dirname "$0")
+out=${OUT_DIR:-benchmark-results}
+stamp=$(date -u +%Y%m%dT%H%M%SZ)
+mkdir -p "$out"
+
+"$dir/gflow_benchmark" "$@" -o "$out/gflow-$stamp.json" || exit 1
+
+if [ -z "$DISPLAY" ]; then
+    xvfb-run -a python3 "$dir/gtkflow-benchmark.py" "$@" -o "$out/gtkflow-$stamp.json" || exit 1
+else
+    python3 "$dir/gtkflow-benchmark.py" "$@" -o "$out/gtkflow-$stamp.json" || exit 1
+fi
@@ -0,0 +1,146 @@
+/********************************************************************
+# Copyright 2014 Daniel 'grindhold' Brendle, 2015 Daniel Espinosa <esodan@gmail.com>
+#
+# This file is part of libgflow.
+#
+# libgflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+namespace GFlow {
+    /**
+     * The type of the elements of a buffer passed between
+     * {@link BufferSource}s and {@link BufferSink}s
+     */
+    public enum ElementType {
+        UINT8,
+        INT16,
+        INT32,
+        INT64,
+        FLOAT,
+        DOUBLE;
+
+        /**
+         * Returns the size of one element in bytes
+         */
+        public size_t get_size () {
+            switch (this) {
+                case INT16:
+                    return sizeof (int16);
+                case INT32:
+                    return sizeof (int32);
+                case INT64:
+                    return sizeof (int64);
+                case FLOAT:
+                    return sizeof (float);
+                case DOUBLE:
+                    return sizeof (double);
+                default:
+                    return sizeof (uint8);
+            }
+        }
+
+        public string get_type_name () {
+            switch (this) {
+                case INT16:
+                    return "int16[]";
+                case INT32:
+                    return "int32[]";
+                case INT64:
+                    return "int64[]";
+                case FLOAT:
+                    return "float[]";
+                case DOUBLE:
+                    return "double[]";
+                default:
+                    return "uint8[]";
+            }
+        }
+    }
+
+    /**
+     * A source that provides an array of numbers held in a {@link GLib.Bytes}
+     *
+     * The buffer is never copied on its way through the graph: every
+     * connected sink holds a reference to the very same buffer. As
+     * {@link GLib.Bytes} is immutable, set a new buffer instead of
+     * changing the current one.
+     */
+    public class BufferSource : SimpleSource {
+        /**
+         * The type of the elements in the buffer
+         */
+        public ElementType element_type { get; private set; }
+
+        /**
+         * The current buffer
+         */
+        public Bytes buffer { get { return (Bytes) val.get_boxed (); } }
+
+        /**
+         * The number of elements in the current buffer
+         */
+        public size_t n_elements { get { return buffer.get_size () / element_type.get_size (); } }
+
+        public BufferSource (ElementType element_type) {
+            Value initial = Value (typeof (Bytes));
+            initial.set_boxed (new Bytes (null));
+            base (initial);
+            this.element_type = element_type;
+        }
+
+        /**
+         * Sets a new buffer and sends it to the connected sinks
+         */
+        public void set_buffer (Bytes buffer) throws GLib.Error {
+            if (buffer.get_size () % element_type.get_size () != 0)
+                throw new NodeError.INCOMPATIBLE_VALUE (
+                    "A buffer of %s bytes does not hold %s elements".printf (
+                        buffer.get_size ().to_string (), element_type.get_type_name ())
+                );
+            Value v = Value (typeof (Bytes));
+            v.set_boxed (buffer);
+            set_value (v);
+        }
+    }
+
+    /**
+     * A sink that receives the buffer of a {@link BufferSource}
+     * with the same element type
+     */
+    public class BufferSink : SimpleSink {
+        /**
+         * The type of the elements in the buffer
+         */
+        public ElementType element_type { get; private set; }
+
+        /**
+         * The buffer received last
+         */
+        public Bytes buffer { get { return (Bytes) val.get_boxed (); } }
+
+        /**
+         * The number of elements in the buffer received last
+         */
+        public size_t n_elements { get { return buffer.get_size () / element_type.get_size (); } }
+
+        public BufferSink (ElementType element_type) {
+            Value initial = Value (typeof (Bytes));
+            initial.set_boxed (new Bytes (null));
+            base (initial);
+            this.element_type = element_type;
+        }
+    }
+}
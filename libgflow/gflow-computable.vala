@@ -0,0 +1,49 @@
+/********************************************************************
+# Copyright 2014 Daniel 'grindhold' Brendle, 2015 Daniel Espinosa <esodan@gmail.com>
+#
+# This file is part of libgflow.
+#
+# libgflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+namespace GFlow {
+    /**
+     * A {@link Node} that computes its outputs from its inputs without
+     * touching anything else, so a {@link Graph} can run the computation
+     * on a worker thread.
+     *
+     * If the graph has {@link Graph.max_threads} set, it calls
+     * {@link compute} on its thread pool instead of emitting
+     * {@link Node.evaluate} and sets the returned values to the sources
+     * of the node from the main loop once the computation is done.
+     */
+    public interface Computable : Object, Node {
+        /**
+         * Computes the values of the node's sources
+         *
+         * Runs on a worker thread, so it must not access the node, its docks
+         * or any widget. The inputs are copies of the values of the node's
+         * sinks keyed by sink name. Return the outputs keyed by source name;
+         * sources without an output keep their value.
+         *
+         * The cancellable is cancelled when new inputs arrive before the
+         * computation finished. Its result is thrown away in that case,
+         * so long computations should return early.
+         */
+        public abstract HashTable<string, Value?> compute (HashTable<string, Value?> inputs,
+                                                           Cancellable cancellable) throws GLib.Error;
+    }
+}
@@ -0,0 +1,125 @@
+/********************************************************************
+# Copyright 2014 Daniel 'grindhold' Brendle, 2015 Daniel Espinosa <esodan@gmail.com>
+#
+# This file is part of libgflow.
+#
+# libgflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+namespace GFlow {
+    // libgtkflow/conversions.vala holds the same code for the other library,
+    // changes belong in both
+
+    // Pairs of types whose values are converted on connect,
+    // keyed by the quarks of their type names
+    internal HashTable<int64?, bool?>? conversions = null;
+    // Memorized results of can_convert ()
+    internal HashTable<int64?, bool?>? compatibility = null;
+
+    internal int64 conversion_key (Type from, Type to) {
+        return ((int64) from.qname ()) << 32 | (int64) to.qname ();
+    }
+
+    internal void ensure_conversions () {
+        if (conversions != null)
+            return;
+        conversions = new HashTable<int64?, bool?> (int64_hash, int64_equal);
+        compatibility = new HashTable<int64?, bool?> (int64_hash, int64_equal);
+        // Conversions that do not lose information
+        Type[,] defaults = {
+            {typeof (int), typeof (int64)},
+            {typeof (int), typeof (double)},
+            {typeof (uint), typeof (uint64)},
+            {typeof (uint), typeof (double)},
+            {typeof (long), typeof (int64)},
+            {typeof (long), typeof (double)},
+            {typeof (float), typeof (double)},
+            {typeof (int64), typeof (double)},
+            {typeof (uint64), typeof (double)},
+            {typeof (bool), typeof (int)},
+            {typeof (bool), typeof (string)},
+            {typeof (int), typeof (string)},
+            {typeof (uint), typeof (string)},
+            {typeof (int64), typeof (string)},
+            {typeof (uint64), typeof (string)},
+            {typeof (float), typeof (string)},
+            {typeof (double), typeof (string)}
+        };
+        for (int i = 0; i < defaults.length[0]; i++)
+            conversions.insert (conversion_key (defaults[i,0], defaults[i,1]), true);
+    }
+
+    /**
+     * Allows connecting sources of the type from to sinks of the type to.
+     * Values are converted with {@link GLib.Value.transform}, so a
+     * transformation has to be known to GLib, see
+     * {@link GLib.Value.register_transform_func}.
+     *
+     * The conversions only apply to the docks of GFlow. GtkFlow keeps
+     * a registry of its own, register the conversion there as well if
+     * docks of both libraries need it.
+     */
+    public void register_conversion (Type from, Type to) {
+        ensure_conversions ();
+        if (!GLib.Value.type_transformable (from, to)) {
+            warning ("There is no transformation from %s to %s", from.name (), to.name ());
+            return;
+        }
+        conversions.insert (conversion_key (from, to), true);
+        compatibility.remove_all ();
+    }
+
+    /**
+     * Disallows a conversion registered with {@link register_conversion}
+     */
+    public void unregister_conversion (Type from, Type to) {
+        ensure_conversions ();
+        conversions.remove (conversion_key (from, to));
+        compatibility.remove_all ();
+    }
+
+    /**
+     * Returns true if a source of the type from can be
+     * connected to a sink of the type to
+     */
+    public bool can_convert (Type from, Type to) {
+        if (from == to)
+            return true;
+        ensure_conversions ();
+        int64 key = conversion_key (from, to);
+        bool? result = compatibility.lookup (key);
+        if (result == null) {
+            result = GLib.Value.type_compatible (from, to)
+                     || (conversions.contains (key) && GLib.Value.type_transformable (from, to));
+            compatibility.insert (key, result);
+        }
+        return result;
+    }
+
+    /**
+     * Converts the value into the type of dest.
+     * Returns false if the types are not compatible.
+     */
+    public bool convert_value (GLib.Value src, ref GLib.Value dest) {
+        if (!can_convert (src.type (), dest.type ()))
+            return false;
+        if (src.type () == dest.type ()) {
+            src.copy (ref dest);
+            return true;
+        }
+        return src.transform (ref dest);
+    }
+}
@@ -0,0 +1,84 @@
+/********************************************************************
+# Copyright 2014 Daniel 'grindhold' Brendle, 2015 Daniel Espinosa <esodan@gmail.com>
+#
+# This file is part of libgflow.
+#
+# libgflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+namespace GFlow {
+    /**
+     * An insertion ordered set of docks or nodes
+     *
+     * The items are kept in a {@link GLib.Queue}, so they can still be
+     * handed out as a {@link GLib.List}, while a hash table maps every item
+     * to its link. Appending, removing and checking for an item take
+     * constant time.
+     *
+     * GtkFlow and GFlow are built separately and neither links the other,
+     * so both carry a copy of this class. Changes belong in both,
+     * the other copy is libgtkflow/docklist.vala.
+     */
+    internal class DockList<G> : Object {
+        // Holds the references to the items, the queue only points to them
+        private HashTable<G, unowned List<unowned G>> links
+            = new HashTable<G, unowned List<unowned G>>(direct_hash, direct_equal);
+        private Queue<unowned G> queue = new Queue<unowned G>();
+
+        /**
+         * The items in the order they were appended
+         */
+        public unowned List<G> head {
+            get {
+                return (List<G>) this.queue.head;
+            }
+        }
+
+        public uint length {
+            get {
+                return this.queue.length;
+            }
+        }
+
+        public bool contains(G item) {
+            return this.links.contains(item);
+        }
+
+        /**
+         * Appends the item unless it is already contained.
+         * Returns false if it was.
+         */
+        public bool append(G item) {
+            if (this.links.contains(item))
+                return false;
+            this.queue.push_tail(item);
+            this.links.insert(item, this.queue.peek_tail_link());
+            return true;
+        }
+
+        /**
+         * Removes the item. Returns false if it was not contained.
+         */
+        public bool remove(G item) {
+            unowned List<unowned G>? link = this.links.lookup(item);
+            if (link == null)
+                return false;
+            this.queue.delete_link(link);
+            this.links.remove(item);
+            return true;
+        }
+    }
+}
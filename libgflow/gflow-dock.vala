@@ -107,10 +107,7 @@ namespace GFlow {
 
         // FIXME: This could be changed to get_stypestring
         public virtual string determine_typestring () {
-            GLib.TypeQuery tq;
-            this.val.get_gtype().query(out tq);
-            string s = this.val.type_name();
-            return s;
+            return this.val.type_name();
         }
 
         /**
@@ -118,7 +115,7 @@ namespace GFlow {
          * same type
          */
         public virtual bool has_same_type (Dock other) {
-            return this.val.type_name() == other.val.type_name();
+            return this.val.type () == other.val.type ();
         }
     }
 }
@@ -0,0 +1,52 @@
+/********************************************************************
+# Copyright 2014 Daniel 'grindhold' Brendle, 2015 Daniel Espinosa <esodan@gmail.com>
+#
+# This file is part of libgflow.
+#
+# libgflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+namespace GFlow {
+    /**
+     * A connection from a {@link Source} to a {@link Sink} whose
+     * nodes both belong to the same {@link Graph}
+     *
+     * Edges are created and dropped by the graph as docks are connected
+     * and disconnected, see {@link Graph.get_edges}.
+     */
+    public class Edge : Object {
+        /**
+         * The source the connection starts at
+         */
+        public Source source { get; construct; }
+        /**
+         * The sink the connection leads to
+         */
+        public Sink sink { get; construct; }
+        /**
+         * The node of {@link source}
+         */
+        public Node from { get; construct; }
+        /**
+         * The node of {@link sink}
+         */
+        public Node to { get; construct; }
+
+        internal Edge (Source source, Sink sink, Node from, Node to) {
+            Object (source: source, sink: sink, from: from, to: to);
+        }
+    }
+}
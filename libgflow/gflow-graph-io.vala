@@ -0,0 +1,401 @@
+/********************************************************************
+# Copyright 2014 Daniel 'grindhold' Brendle, 2015 Daniel Espinosa <esodan@gmail.com>
+#
+# This file is part of libgflow.
+#
+# libgflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+namespace GFlow {
+    public errordomain FormatError {
+        /**
+         * Throw when the data does not follow the graph format
+         */
+        INVALID_DATA,
+        /**
+         * Throw when the data has been written by a newer version
+         * of the graph format
+         */
+        UNSUPPORTED_VERSION
+    }
+
+    internal const string GRAPH_MAGIC = "gflow-graph";
+    internal const uint GRAPH_FORMAT_VERSION = 1;
+    // Records shared by the text and the binary format
+    internal const string NODE_RECORD = "(ussiiii)";
+    internal const string DOCK_RECORD = "(uubssv)";
+    internal const string EDGE_RECORD = "(uu)";
+    internal const string BINARY_GRAPH = "(sua(ussiiii)a(uubssv)a(uu))";
+
+    internal delegate void RecordFunc (string tag, Variant record) throws GLib.Error;
+
+    /**
+     * Stores values of fundamental types as variants. Values of other
+     * types are stored as unit, their type's default is restored instead.
+     */
+    internal Variant value_to_variant (Value? v) {
+        if (v != null) {
+            Type t = v.type ();
+            if (t == typeof (bool))
+                return new Variant.boolean (v.get_boolean ());
+            if (t == typeof (int))
+                return new Variant.int32 (v.get_int ());
+            if (t == typeof (uint))
+                return new Variant.uint32 (v.get_uint ());
+            if (t == typeof (long))
+                return new Variant.int64 (v.get_long ());
+            if (t == typeof (ulong))
+                return new Variant.uint64 (v.get_ulong ());
+            if (t == typeof (int64))
+                return new Variant.int64 (v.get_int64 ());
+            if (t == typeof (uint64))
+                return new Variant.uint64 (v.get_uint64 ());
+            if (t == typeof (float))
+                return new Variant.double (v.get_float ());
+            if (t == typeof (double))
+                return new Variant.double (v.get_double ());
+            if (t == typeof (string))
+                return new Variant.string (v.get_string () ?? "");
+            if (t.is_enum ())
+                return new Variant.int32 (v.get_enum ());
+            if (t.is_flags ())
+                return new Variant.uint32 (v.get_flags ());
+        }
+        return new Variant.tuple ({});
+    }
+
+    /**
+     * Restores a value of the given type from a variant written by
+     * {@link value_to_variant}
+     */
+    internal Value variant_to_value (Variant data, Type t) {
+        var v = Value (t);
+        if (t == typeof (bool) && data.is_of_type (VariantType.BOOLEAN))
+            v.set_boolean (data.get_boolean ());
+        else if (t == typeof (int) && data.is_of_type (VariantType.INT32))
+            v.set_int (data.get_int32 ());
+        else if (t == typeof (uint) && data.is_of_type (VariantType.UINT32))
+            v.set_uint (data.get_uint32 ());
+        else if (t == typeof (long) && data.is_of_type (VariantType.INT64))
+            v.set_long ((long) data.get_int64 ());
+        else if (t == typeof (ulong) && data.is_of_type (VariantType.UINT64))
+            v.set_ulong ((ulong) data.get_uint64 ());
+        else if (t == typeof (int64) && data.is_of_type (VariantType.INT64))
+            v.set_int64 (data.get_int64 ());
+        else if (t == typeof (uint64) && data.is_of_type (VariantType.UINT64))
+            v.set_uint64 (data.get_uint64 ());
+        else if (t == typeof (float) && data.is_of_type (VariantType.DOUBLE))
+            v.set_float ((float) data.get_double ());
+        else if (t == typeof (double) && data.is_of_type (VariantType.DOUBLE))
+            v.set_double (data.get_double ());
+        else if (t == typeof (string) && data.is_of_type (VariantType.STRING))
+            v.set_string (data.get_string ());
+        else if (t.is_enum () && data.is_of_type (VariantType.INT32))
+            v.set_enum (data.get_int32 ());
+        else if (t.is_flags () && data.is_of_type (VariantType.UINT32))
+            v.set_flags (data.get_uint32 ());
+        return v;
+    }
+
+    /**
+     * Writes the nodes, docks and connections of a {@link Graph}
+     *
+     * The text format holds one record per line: a tag followed by the
+     * record in GVariant text notation. Nodes are written in topological
+     * order, each one followed by its docks and the connections leading
+     * into it, so {@link GraphReader} can restore the graph record by
+     * record without keeping more than a table of the docks in memory.
+     *
+     * The binary format holds the same records in a single serialized
+     * GVariant that can be used straight from a memory mapped file.
+     *
+     * The node records share their layout with the files written by
+     * GtkFlow, which store the position and size of each node. GFlow nodes
+     * have no geometry, so these fields are always 0 and a file written by
+     * GtkFlow loses its layout when it is read and written again by GFlow.
+     *
+     * Initial values are stored for docks of fundamental types only.
+     */
+    public class GraphWriter : Object {
+        /**
+         * Writes the graph in the text format
+         */
+        public void write (Graph g, OutputStream stream,
+                           Cancellable? cancellable = null) throws GLib.Error {
+            var data = new DataOutputStream (stream);
+            data.close_base_stream = false;
+            data.put_string ("%s %u\n".printf (GRAPH_MAGIC, GRAPH_FORMAT_VERSION), cancellable);
+            this.write_records (g, (tag, record) => {
+                data.put_string ("%s %s\n".printf (tag, record.print (true)), cancellable);
+            });
+            data.flush (cancellable);
+        }
+
+        /**
+         * Writes the graph in the binary format
+         *
+         * Unlike {@link write}, this does not stream: a serialized GVariant
+         * can only be written once all of its records are known, so the
+         * whole graph is built up in memory first. Use the text format to
+         * write graphs too large for that.
+         */
+        public void write_binary (Graph g, OutputStream stream,
+                                  Cancellable? cancellable = null) throws GLib.Error {
+            var nodes = new VariantBuilder (new VariantType ("a" + NODE_RECORD));
+            var docks = new VariantBuilder (new VariantType ("a" + DOCK_RECORD));
+            var edges = new VariantBuilder (new VariantType ("a" + EDGE_RECORD));
+            this.write_records (g, (tag, record) => {
+                if (tag == "node")
+                    nodes.add_value (record);
+                else if (tag == "dock")
+                    docks.add_value (record);
+                else
+                    edges.add_value (record);
+            });
+            var data = new Variant.tuple ({
+                new Variant.string (GRAPH_MAGIC),
+                new Variant.uint32 (GRAPH_FORMAT_VERSION),
+                nodes.end (), docks.end (), edges.end ()
+            });
+            // Always little endian, so files can be exchanged
+            if (ByteOrder.HOST == ByteOrder.BIG_ENDIAN)
+                data = data.byteswap ();
+            size_t written;
+            stream.write_all (data.get_data_as_bytes ().get_data (), out written, cancellable);
+        }
+
+        private void write_records (Graph g, RecordFunc func) throws GLib.Error {
+            var dock_ids = new HashTable<Dock, uint> (direct_hash, direct_equal);
+            uint next_dock = 0;
+            GenericArray<Node> nodes = g.get_sorted_nodes ();
+            for (uint i = 0; i < nodes.length; i++) {
+                Node n = nodes[i];
+                func ("node", new Variant (NODE_RECORD, i, n.get_type ().name (),
+                                           n.name ?? "", 0, 0, 0, 0));
+                foreach (Sink s in n.get_sinks ()) {
+                    dock_ids.insert (s, next_dock);
+                    func ("dock", GraphWriter.dock_record (i, next_dock++, s, false));
+                }
+                foreach (Source s in n.get_sources ()) {
+                    dock_ids.insert (s, next_dock);
+                    func ("dock", GraphWriter.dock_record (i, next_dock++, s, true));
+                }
+                // Sources feeding this node have been written before
+                foreach (Sink s in n.get_sinks ()) {
+                    Edge? e = g.get_edge (s);
+                    if (e != null && dock_ids.contains (e.source))
+                        func ("edge", new Variant (EDGE_RECORD, dock_ids.lookup (e.source),
+                                                   dock_ids.lookup (s)));
+                }
+            }
+        }
+
+        private static Variant dock_record (uint node_id, uint dock_id, Dock d, bool is_source) {
+            Value? initial = d.initial;
+            return new Variant (DOCK_RECORD, node_id, dock_id, is_source, d.name ?? "",
+                                initial != null ? initial.type ().name () : "",
+                                value_to_variant (initial));
+        }
+    }
+
+    /**
+     * Restores graphs written by {@link GraphWriter}
+     *
+     * Nodes are created with {@link GLib.Object.new} from their stored
+     * type. Types that can't be instantiated that way are restored as
+     * {@link SimpleNode}s, unless a handler of {@link create_node} provides
+     * a node. Docks a node already has are matched by name, missing ones
+     * are created as {@link SimpleSource}s and {@link SimpleSink}s.
+     *
+     * The graph is frozen while loading, see {@link Graph.freeze}.
+     */
+    public class GraphReader : Object {
+        private Graph? graph = null;
+        private HashTable<uint, Node> nodes = new HashTable<uint, Node> (direct_hash, direct_equal);
+        private HashTable<uint, Dock> docks = new HashTable<uint, Dock> (direct_hash, direct_equal);
+
+        /**
+         * Emitted for every node to be restored. Return a node in order
+         * to restore nodes of your own types, or null to let the reader
+         * create it.
+         */
+        public signal Node? create_node (string type_name);
+
+        /**
+         * Reads a graph in the text format line by line and adds its
+         * nodes to the given graph
+         */
+        public void read (Graph g, InputStream stream,
+                          Cancellable? cancellable = null) throws GLib.Error {
+            var data = new DataInputStream (stream);
+            data.close_base_stream = false;
+            string? header = data.read_line (null, cancellable);
+            string[] fields = (header ?? "").strip ().split (" ");
+            if (fields.length != 2 || fields[0] != GRAPH_MAGIC)
+                throw new FormatError.INVALID_DATA ("This is not a graph");
+            GraphReader.check_version ((uint) uint64.parse (fields[1]));
+            this.begin (g);
+            try {
+                string? line;
+                while ((line = data.read_line (null, cancellable)) != null) {
+                    line = line.strip ();
+                    if (line == "")
+                        continue;
+                    int space = line.index_of_char (' ');
+                    if (space < 0)
+                        throw new FormatError.INVALID_DATA ("Invalid record: %s".printf (line));
+                    string tag = line.substring (0, space);
+                    string type;
+                    if (tag == "node")
+                        type = NODE_RECORD;
+                    else if (tag == "dock")
+                        type = DOCK_RECORD;
+                    else if (tag == "edge")
+                        type = EDGE_RECORD;
+                    else
+                        throw new FormatError.INVALID_DATA ("Unknown record: %s".printf (tag));
+                    this.restore (tag, Variant.parse (new VariantType (type),
+                                                      line.substring (space + 1)));
+                }
+            } finally {
+                this.end ();
+            }
+        }
+
+        /**
+         * Maps a file in the binary format into memory and adds its
+         * nodes to the given graph
+         */
+        public void read_mapped (Graph g, string path) throws GLib.Error {
+            var file = new MappedFile (path, false);
+            var data = new Variant.from_bytes (new VariantType (BINARY_GRAPH),
+                                               file.get_bytes (), false);
+            if (ByteOrder.HOST == ByteOrder.BIG_ENDIAN)
+                data = data.byteswap ();
+            if (data.get_child_value (0).get_string () != GRAPH_MAGIC)
+                throw new FormatError.INVALID_DATA ("This is not a graph");
+            GraphReader.check_version (data.get_child_value (1).get_uint32 ());
+            this.begin (g);
+            try {
+                string[] tags = { "node", "dock", "edge" };
+                for (int i = 0; i < tags.length; i++) {
+                    Variant records = data.get_child_value (i + 2);
+                    for (size_t j = 0; j < records.n_children (); j++)
+                        this.restore (tags[i], records.get_child_value (j));
+                }
+            } finally {
+                this.end ();
+            }
+        }
+
+        private static void check_version (uint version) throws FormatError {
+            if (version == 0 || version > GRAPH_FORMAT_VERSION)
+                throw new FormatError.UNSUPPORTED_VERSION (
+                    "Unsupported graph format version %u".printf (version)
+                );
+        }
+
+        private void begin (Graph g) {
+            this.graph = g;
+            g.freeze ();
+        }
+
+        private void end () {
+            this.graph.thaw ();
+            this.graph = null;
+            this.nodes.remove_all ();
+            this.docks.remove_all ();
+        }
+
+        private void restore (string tag, Variant record) throws GLib.Error {
+            if (tag == "node")
+                this.restore_node (record);
+            else if (tag == "dock")
+                this.restore_dock (record);
+            else
+                this.restore_edge (record);
+        }
+
+        private void restore_node (Variant record) throws GLib.Error {
+            uint id;
+            string type_name;
+            string name;
+            int x, y, width, height;
+            record.get (NODE_RECORD, out id, out type_name, out name,
+                        out x, out y, out width, out height);
+            Node? n = this.create_node (type_name);
+            if (n == null) {
+                Type t = Type.from_name (type_name);
+                if (t != Type.INVALID && t.is_a (typeof (Node))
+                        && t.is_instantiatable () && !t.is_abstract ())
+                    n = Object.new (t) as Node;
+                else
+                    n = new SimpleNode ();
+            }
+            n.name = name;
+            this.graph.add_node (n);
+            this.nodes.insert (id, n);
+        }
+
+        private void restore_dock (Variant record) throws GLib.Error {
+            uint node_id, dock_id;
+            bool is_source;
+            string name;
+            string type_name;
+            Variant initial;
+            record.get (DOCK_RECORD, out node_id, out dock_id, out is_source,
+                        out name, out type_name, out initial);
+            Node? n = this.nodes.lookup (node_id);
+            if (n == null)
+                throw new FormatError.INVALID_DATA (
+                    "Dock %u belongs to unknown node %u".printf (dock_id, node_id)
+                );
+            Dock? d = name != "" ? n.get_dock (name) : null;
+            if (d == null || (d is Source) != is_source) {
+                Type t = Type.from_name (type_name);
+                if (t == Type.INVALID)
+                    throw new FormatError.INVALID_DATA (
+                        "Dock %u has unknown type '%s'".printf (dock_id, type_name)
+                    );
+                Value v = variant_to_value (initial, t);
+                if (is_source) {
+                    var s = new SimpleSource (v);
+                    s.name = name;
+                    n.add_source (s);
+                    d = s;
+                } else {
+                    var s = new SimpleSink (v);
+                    s.name = name;
+                    n.add_sink (s);
+                    d = s;
+                }
+            }
+            this.docks.insert (dock_id, d);
+        }
+
+        private void restore_edge (Variant record) throws GLib.Error {
+            uint source_id, sink_id;
+            record.get (EDGE_RECORD, out source_id, out sink_id);
+            var src = this.docks.lookup (source_id) as Source;
+            var snk = this.docks.lookup (sink_id) as Sink;
+            if (src == null || snk == null)
+                throw new FormatError.INVALID_DATA (
+                    "Invalid connection from dock %u to dock %u".printf (source_id, sink_id)
+                );
+            snk.connect (src);
+        }
+    }
+}
@@ -0,0 +1,1012 @@
+/********************************************************************
+# Copyright 2014 Daniel 'grindhold' Brendle, 2015 Daniel Espinosa <esodan@gmail.com>
+#
+# This file is part of libgflow.
+#
+# libgflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+namespace GFlow {
+    /**
+     * Determines how a {@link Graph} passes values on to its nodes
+     */
+    public enum EvaluationMode {
+        /**
+         * New values are delivered and every affected node is
+         * evaluated in the next update wave
+         */
+        PUSH,
+        /**
+         * New values only mark the sinks downstream as stale. Nodes are
+         * evaluated when a value of theirs is read, and only the part of
+         * the graph the value depends on is evaluated.
+         */
+        PULL
+    }
+
+    /**
+     * A set of {@link Node}s that schedules the propagation of values
+     * between them.
+     *
+     * Calling {@link SimpleSource.set_value} on a source whose node belongs
+     * to a graph does not push the value into the connected sinks right away.
+     * The source is marked as dirty instead, and the affected nodes are
+     * visited in topological order, so every node is evaluated exactly once
+     * per update wave, no matter how many of its inputs changed.
+     *
+     * Use {@link begin} and {@link commit} to coalesce many value changes
+     * into a single update wave, and {@link freeze} and {@link thaw} when
+     * building up a large graph.
+     *
+     * The graph also keeps its nodes in a topological order that is
+     * updated incrementally whenever a connection is established, so
+     * asking whether a new connection would lead to a recursion is cheap.
+     *
+     * Nodes implementing {@link Computable} can be computed on a thread
+     * pool, see {@link max_threads}. Independent nodes are computed in
+     * parallel then, while the main loop stays responsive.
+     *
+     * With {@link memoize} set, the graph remembers the outputs computed
+     * for the values of a computable node's sinks, so a node whose inputs
+     * return to values it has seen before is not computed again.
+     *
+     * In {@link EvaluationMode.PULL} mode new values are not pushed
+     * through the graph. Reading {@link Dock.val} of a stale sink, or of a
+     * source whose node has stale sinks, evaluates what is needed first.
+     */
+    public class Graph : Object {
+        /**
+         * A computation running on the thread pool
+         */
+        private class Job {
+            public Computable node;
+            public Bytes? key = null;
+            public HashTable<string, Value?> inputs;
+            public HashTable<string, Value?>? outputs = null;
+            public GLib.Error? error = null;
+            public Cancellable cancellable = new Cancellable ();
+            public int64 start = 0;
+            public int64 duration = 0;
+            public MainContext context;
+        }
+
+        private DockList<Node> nodes = new DockList<Node> ();
+        // Topological order of the nodes as described by Pearce and Kelly:
+        // every connection leads from a node with a lower to a node with a
+        // higher order. Removing connections never invalidates the order.
+        private HashTable<Node, int> order = new HashTable<Node, int> (direct_hash, direct_equal);
+        private int next_order = 0;
+        // The connections between nodes of this graph, by sink and by node
+        private HashTable<Sink, Edge> edges = new HashTable<Sink, Edge> (direct_hash, direct_equal);
+        private HashTable<Node, GenericArray<Edge>> outgoing
+            = new HashTable<Node, GenericArray<Edge>> (direct_hash, direct_equal);
+        private HashTable<Node, GenericArray<Edge>> incoming
+            = new HashTable<Node, GenericArray<Edge>> (direct_hash, direct_equal);
+        // Sources whose value has not been delivered yet
+        private HashTable<Source, Source> dirty = new HashTable<Source, Source> (direct_hash, direct_equal);
+        // Sinks and nodes whose inputs changed without being evaluated, in pull mode
+        private HashTable<Sink, Sink> stale_sinks = new HashTable<Sink, Sink> (direct_hash, direct_equal);
+        private HashTable<Node, Node> stale_nodes = new HashTable<Node, Node> (direct_hash, direct_equal);
+        private uint transaction_depth = 0;
+        private uint freeze_count = 0;
+        private bool propagating = false;
+        private ThreadPool<Job>? pool = null;
+        // The latest computation of every computable node
+        private HashTable<Node, Job> jobs = new HashTable<Node, Job> (direct_hash, direct_equal);
+        private MemoCache memo = new MemoCache ();
+        private uint _memo_hits = 0;
+        private uint _memo_misses = 0;
+        private uint _memo_uncacheable = 0;
+
+        private int _max_threads = 0;
+        /**
+         * The number of worker threads {@link Computable} nodes are computed
+         * on. If this is 0, they are evaluated on the calling thread like
+         * any other node.
+         */
+        public int max_threads {
+            get { return this._max_threads; }
+            set {
+                this._max_threads = int.max (value, 0);
+                if (this.pool != null && this._max_threads > 0) {
+                    try {
+                        this.pool.set_max_threads (this._max_threads);
+                    } catch (ThreadError e) {
+                        warning ("Could not resize the thread pool: %s", e.message);
+                    }
+                }
+            }
+        }
+
+        /**
+         * The number of computations that have not finished yet
+         */
+        public uint pending_computations { get { return this.jobs.size (); } }
+
+        /**
+         * Whether the outputs of {@link Computable} nodes are remembered
+         * for the values of their sinks. A computable node whose inputs
+         * were seen before gets the remembered outputs instead of being
+         * computed, and sources whose value does not change are not
+         * propagated any further.
+         *
+         * If this is set and {@link max_threads} is 0, computable nodes
+         * are computed on the calling thread instead of being evaluated.
+         * Only nodes whose sinks hold values of fundamental types can
+         * be memoized.
+         */
+        public bool memoize { get; set; default = false; }
+
+        /**
+         * The maximum number of results that are remembered
+         */
+        public uint memo_max_entries {
+            get { return this.memo.max_entries; }
+            set { this.memo.max_entries = value; }
+        }
+
+        /**
+         * The approximate maximum memory in bytes remembered results take.
+         * The least recently used results are dropped first.
+         */
+        public size_t memo_max_bytes {
+            get { return this.memo.max_bytes; }
+            set { this.memo.max_bytes = value; }
+        }
+
+        /**
+         * The number of computations that were answered from memory
+         */
+        public uint memo_hits { get { return this._memo_hits; } }
+
+        /**
+         * The number of computations that had to be run although
+         * their inputs could have been remembered
+         */
+        public uint memo_misses { get { return this._memo_misses; } }
+
+        /**
+         * The number of computations that could not be remembered,
+         * because a sink held a value of a type that is not fundamental
+         */
+        public uint memo_uncacheable { get { return this._memo_uncacheable; } }
+
+        /**
+         * Whether evaluations are recorded by {@link profiler}
+         */
+        public bool profiling { get; set; default = false; }
+
+        /**
+         * Records per node evaluation counts and times
+         * while {@link profiling} is set
+         */
+        public Profiler profiler { get; private set; default = new Profiler (); }
+
+        /**
+         * True while there is a transaction open
+         */
+        public bool in_transaction { get { return this.transaction_depth > 0; } }
+
+        /**
+         * True between {@link freeze} and the matching {@link thaw}
+         */
+        public bool frozen { get { return this.freeze_count > 0; } }
+
+        private EvaluationMode _evaluation_mode = EvaluationMode.PUSH;
+        /**
+         * Whether new values are pushed through the graph or pulled when
+         * they are read. Switching to {@link EvaluationMode.PUSH} brings
+         * all stale docks up to date.
+         */
+        public EvaluationMode evaluation_mode {
+            get { return this._evaluation_mode; }
+            set {
+                if (value == EvaluationMode.PUSH) {
+                    var stale = new GenericArray<Node> ();
+                    foreach (Node n in this.stale_nodes.get_values ())
+                        stale.add (n);
+                    for (int i = 0; i < stale.length; i++)
+                        this.refresh_node (stale[i]);
+                }
+                this._evaluation_mode = value;
+            }
+        }
+
+        /**
+         * Emitted after all pending values have been propagated
+         */
+        public signal void propagated ();
+
+        /**
+         * Emitted on the main loop after the outputs of a computation
+         * have been set to the sources of the node
+         */
+        public signal void computed (Computable n);
+
+        /**
+         * Emitted on the main loop when a computation failed
+         */
+        public signal void computation_failed (Computable n, GLib.Error error);
+
+        ~Graph () {
+            this.cancel_computations ();
+            if (this.pool != null)
+                ThreadPool.free ((owned) this.pool, true, true);
+            // The nodes only hold a weak reference to their graph
+            foreach (unowned Node n in this.nodes.head)
+                n.graph = null;
+        }
+
+        /**
+         * Adds a node to this graph
+         */
+        public void add_node (Node n) throws NodeError {
+            if (n.graph != null)
+                throw new NodeError.NODE_ALREADY_IN_GRAPH ("This node already belongs to a graph");
+            this.nodes.append (n);
+            this.order.insert (n, this.next_order++);
+            this.outgoing.insert (n, new GenericArray<Edge> ());
+            this.incoming.insert (n, new GenericArray<Edge> ());
+            n.graph = this;
+            // Take the connections the node already has into account
+            try {
+                foreach (Sink s in n.get_sinks ()) {
+                    if (s.source != null)
+                        this.add_edge (s.source, s);
+                }
+                foreach (Source s in n.get_sources ()) {
+                    foreach (Sink snk in s.sinks)
+                        this.add_edge (s, snk);
+                }
+            } catch (NodeError e) {
+                this.remove_edges (n);
+                this.nodes.remove (n);
+                this.order.remove (n);
+                n.graph = null;
+                throw e;
+            }
+        }
+
+        /**
+         * Removes a node from this graph
+         */
+        public void remove_node (Node n) throws NodeError {
+            if (n.graph != this)
+                throw new NodeError.NO_SUCH_NODE ("This graph doesn't have this node");
+            foreach (Source s in n.get_sources ())
+                this.dirty.remove (s);
+            foreach (Sink s in n.get_sinks ())
+                this.stale_sinks.remove (s);
+            this.stale_nodes.remove (n);
+            unowned Job? job = this.jobs.lookup (n);
+            if (job != null) {
+                job.cancellable.cancel ();
+                this.jobs.remove (n);
+            }
+            this.memo.forget (n);
+            this.profiler.forget (n);
+            this.remove_edges (n);
+            this.nodes.remove (n);
+            this.order.remove (n);
+            n.graph = null;
+        }
+
+        /**
+         * Drops all edges leading to or from the given node
+         */
+        private void remove_edges (Node n) {
+            unowned GenericArray<Edge>? edges = this.outgoing.lookup (n);
+            while (edges != null && edges.length > 0)
+                this.unindex_edge (edges[edges.length - 1]);
+            edges = this.incoming.lookup (n);
+            while (edges != null && edges.length > 0)
+                this.unindex_edge (edges[edges.length - 1]);
+            this.outgoing.remove (n);
+            this.incoming.remove (n);
+        }
+
+        /**
+         * Returns true if the given node belongs to this graph
+         */
+        public bool has_node (Node n) {
+            return n.graph == this;
+        }
+
+        /**
+         * Returns the nodes of this graph
+         */
+        public unowned List<Node> get_nodes () {
+            return this.nodes.head;
+        }
+
+        /**
+         * Returns the nodes of this graph in topological order, so every
+         * node comes after all nodes that feed values into it
+         */
+        public GenericArray<Node> get_sorted_nodes () {
+            var sorted = new GenericArray<Node> ();
+            foreach (Node n in this.nodes.head)
+                sorted.add (n);
+            sorted.sort_with_data ((a, b) => {
+                return this.order.lookup (a) - this.order.lookup (b);
+            });
+            return sorted;
+        }
+
+        /**
+         * Returns true if there is a path of one or more connections
+         * leading from one node to the other one.
+         *
+         * Whenever the target comes first in the topological order this
+         * is answered in constant time, otherwise only the nodes between
+         * both of them in the order are visited.
+         */
+        public bool is_reachable (Node from, Node to) {
+            if (from.graph != this || to.graph != this || from == to)
+                return false;
+            int upper = this.order.lookup (to);
+            if (this.order.lookup (from) >= upper)
+                return false;
+            var visited = new HashTable<Node, Node> (direct_hash, direct_equal);
+            return !this.collect_forward (from, upper, to, new GenericArray<Node> (), visited);
+        }
+
+        /**
+         * Returns the number of connections between nodes of this graph
+         */
+        public uint n_edges { get { return this.edges.size (); } }
+
+        /**
+         * Returns a snapshot of all connections between nodes of this graph.
+         * Connecting or disconnecting docks afterwards does not change it.
+         */
+        public GenericArray<Edge> get_edges () {
+            var result = new GenericArray<Edge> ();
+            foreach (Edge e in this.edges.get_values ())
+                result.add (e);
+            return result;
+        }
+
+        /**
+         * Returns the connection leading into the given sink, if its
+         * source belongs to a node of this graph
+         */
+        public Edge? get_edge (Sink snk) {
+            return this.edges.lookup (snk);
+        }
+
+        /**
+         * Returns the connections leading from the given node to
+         * other nodes of this graph
+         */
+        public GenericArray<Edge> get_outgoing_edges (Node n) {
+            return Graph.copy_edges (this.outgoing.lookup (n));
+        }
+
+        /**
+         * Returns the connections leading from other nodes of this
+         * graph to the given node
+         */
+        public GenericArray<Edge> get_incoming_edges (Node n) {
+            return Graph.copy_edges (this.incoming.lookup (n));
+        }
+
+        /**
+         * Returns all connections leading from or to the given node
+         */
+        public GenericArray<Edge> get_node_edges (Node n) {
+            var result = Graph.copy_edges (this.incoming.lookup (n));
+            unowned GenericArray<Edge>? edges = this.outgoing.lookup (n);
+            if (edges != null) {
+                for (int i = 0; i < edges.length; i++)
+                    result.add (edges[i]);
+            }
+            return result;
+        }
+
+        /**
+         * Returns the nodes the given node feeds values into, each one once
+         */
+        public GenericArray<Node> get_successors (Node n) {
+            return Graph.collect_nodes (this.outgoing.lookup (n), false);
+        }
+
+        /**
+         * Returns the nodes that feed values into the given node, each one once
+         */
+        public GenericArray<Node> get_predecessors (Node n) {
+            return Graph.collect_nodes (this.incoming.lookup (n), true);
+        }
+
+        private static GenericArray<Edge> copy_edges (GenericArray<Edge>? edges) {
+            var result = new GenericArray<Edge> ();
+            if (edges != null) {
+                for (int i = 0; i < edges.length; i++)
+                    result.add (edges[i]);
+            }
+            return result;
+        }
+
+        private static GenericArray<Node> collect_nodes (GenericArray<Edge>? edges, bool upstream) {
+            var result = new GenericArray<Node> ();
+            if (edges == null)
+                return result;
+            var seen = new HashTable<Node, Node> (direct_hash, direct_equal);
+            for (int i = 0; i < edges.length; i++) {
+                Node m = upstream ? edges[i].from : edges[i].to;
+                if (seen.add (m))
+                    result.add (m);
+            }
+            return result;
+        }
+
+        /**
+         * Records a new connection between the given docks and updates
+         * the topological order for it.
+         */
+        internal void add_edge (Source src, Sink snk) throws NodeError {
+            Node? from = src.node;
+            Node? to = snk.node;
+            if (from == null || to == null || from.graph != this || to.graph != this)
+                return;
+            if (from == to)
+                throw new NodeError.RECURSIVE_CONNECTION ("Can't connect a node to itself");
+            int lower = this.order.lookup (to);
+            int upper = this.order.lookup (from);
+            if (upper >= lower) {
+                var visited = new HashTable<Node, Node> (direct_hash, direct_equal);
+                var forward = new GenericArray<Node> ();
+                if (!this.collect_forward (to, upper, from, forward, visited))
+                    throw new NodeError.RECURSIVE_CONNECTION ("This connection would lead to a recursion");
+                var backward = new GenericArray<Node> ();
+                this.collect_backward (from, lower, backward, visited);
+                this.reorder (backward, forward);
+            }
+            Edge? old = this.edges.lookup (snk);
+            if (old != null) {
+                if (old.source == src && old.from == from && old.to == to)
+                    return;
+                this.unindex_edge (old);
+            }
+            var e = new Edge (src, snk, from, to);
+            this.edges.insert (snk, e);
+            this.outgoing.lookup (from).add (e);
+            this.incoming.lookup (to).add (e);
+        }
+
+        /**
+         * Drops the connection between the given docks
+         */
+        internal void remove_edge (Source src, Sink snk) {
+            Edge? e = this.edges.lookup (snk);
+            if (e != null && e.source == src)
+                this.unindex_edge (e);
+        }
+
+        private void unindex_edge (Edge e) {
+            this.edges.remove (e.sink);
+            uint i;
+            unowned GenericArray<Edge>? edges = this.outgoing.lookup (e.from);
+            if (edges != null && edges.find (e, out i))
+                edges.remove_index_fast (i);
+            edges = this.incoming.lookup (e.to);
+            if (edges != null && edges.find (e, out i))
+                edges.remove_index_fast (i);
+        }
+
+        /**
+         * Collects the nodes reachable from start whose order is lower than
+         * upper. Returns false as soon as target is found.
+         */
+        private bool collect_forward (Node start, int upper, Node target,
+                                      GenericArray<Node> result, HashTable<Node, Node> visited) {
+            var stack = new GenericArray<Node> ();
+            stack.add (start);
+            visited.add (start);
+            while (stack.length > 0) {
+                Node n = stack[stack.length - 1];
+                stack.remove_index (stack.length - 1);
+                result.add (n);
+                unowned GenericArray<Edge> edges = this.outgoing.lookup (n);
+                for (int i = 0; i < edges.length; i++) {
+                    Node m = edges[i].to;
+                    if (m == target)
+                        return false;
+                    if (!visited.contains (m) && this.order.lookup (m) < upper) {
+                        visited.add (m);
+                        stack.add (m);
+                    }
+                }
+            }
+            return true;
+        }
+
+        /**
+         * Collects the nodes that reach start whose order is higher than lower
+         */
+        private void collect_backward (Node start, int lower,
+                                       GenericArray<Node> result, HashTable<Node, Node> visited) {
+            var stack = new GenericArray<Node> ();
+            stack.add (start);
+            visited.add (start);
+            while (stack.length > 0) {
+                Node n = stack[stack.length - 1];
+                stack.remove_index (stack.length - 1);
+                result.add (n);
+                unowned GenericArray<Edge> edges = this.incoming.lookup (n);
+                for (int i = 0; i < edges.length; i++) {
+                    Node m = edges[i].from;
+                    if (!visited.contains (m) && this.order.lookup (m) > lower) {
+                        visited.add (m);
+                        stack.add (m);
+                    }
+                }
+            }
+        }
+
+        /**
+         * Moves the backward nodes in front of the forward nodes reusing
+         * the positions they occupied so far.
+         */
+        private void reorder (GenericArray<Node> backward, GenericArray<Node> forward) {
+            CompareDataFunc<Node> by_order = (a, b) => {
+                return this.order.lookup (a) - this.order.lookup (b);
+            };
+            backward.sort_with_data (by_order);
+            forward.sort_with_data (by_order);
+            // Both lists are sorted, merge their positions
+            int[] pool = new int[backward.length + forward.length];
+            int i = 0, j = 0;
+            for (int k = 0; k < pool.length; k++) {
+                if (j >= forward.length || (i < backward.length
+                        && this.order.lookup (backward[i]) < this.order.lookup (forward[j])))
+                    pool[k] = this.order.lookup (backward[i++]);
+                else
+                    pool[k] = this.order.lookup (forward[j++]);
+            }
+            int p = 0;
+            for (i = 0; i < backward.length; i++)
+                this.order.insert (backward[i], pool[p++]);
+            for (j = 0; j < forward.length; j++)
+                this.order.insert (forward[j], pool[p++]);
+        }
+
+        /**
+         * Opens a transaction. Value changes will not be propagated
+         * until the matching {@link commit} is called. Transactions
+         * can be nested.
+         */
+        public void begin () {
+            this.transaction_depth++;
+        }
+
+        /**
+         * Closes a transaction opened by {@link begin}. When the
+         * outermost transaction is closed, all values changed in the
+         * meantime are propagated in a single update wave.
+         */
+        public void commit () {
+            if (this.transaction_depth == 0) {
+                warning ("Graph.commit() called without matching begin()");
+                return;
+            }
+            this.transaction_depth--;
+            if (this.transaction_depth == 0)
+                this.propagate ();
+        }
+
+        /**
+         * Prepares the graph for adding many nodes and connections at once.
+         *
+         * Opens a transaction like {@link begin} does. Additionally, new
+         * connections do not push the current value of their source into
+         * the sink. Instead, the sources are scheduled and all values are
+         * delivered in a single update wave by the matching {@link thaw}.
+         * Calls can be nested.
+         */
+        public void freeze () {
+            this.freeze_count++;
+            this.begin ();
+        }
+
+        /**
+         * Ends a bulk update started by {@link freeze}
+         */
+        public void thaw () {
+            if (this.freeze_count == 0) {
+                warning ("Graph.thaw() called without matching freeze()");
+                return;
+            }
+            this.freeze_count--;
+            this.commit ();
+        }
+
+        /**
+         * Marks the given source as dirty. Its value will be
+         * delivered in the next update wave.
+         */
+        internal void schedule (Source s) {
+            this.dirty.add (s);
+            if (this.transaction_depth == 0)
+                this.propagate ();
+        }
+
+        private void propagate () {
+            // Sources set by nodes evaluated in the current wave are picked
+            // up by the wave itself, see run_wave ()
+            if (this.propagating)
+                return;
+            this.propagating = true;
+            if (this.profiling)
+                this.profiler.begin_propagation ();
+            while (this.dirty.size () > 0) {
+                if (this._evaluation_mode == EvaluationMode.PULL)
+                    this.mark_stale ();
+                else
+                    this.run_wave ();
+            }
+            if (this.profiling)
+                this.profiler.end_propagation ();
+            this.propagating = false;
+            this.propagated ();
+        }
+
+        /**
+         * Marks everything downstream of the dirty sources as stale
+         * instead of evaluating it
+         */
+        private void mark_stale () {
+            var stack = new GenericArray<Source> ();
+            foreach (Source s in this.dirty.get_keys ())
+                stack.add (s);
+            HashTable<Source, Source> marked = (owned) this.dirty;
+            this.dirty = new HashTable<Source, Source> (direct_hash, direct_equal);
+            while (stack.length > 0) {
+                Source s = stack[stack.length - 1];
+                stack.remove_index (stack.length - 1);
+                foreach (Sink snk in s.sinks) {
+                    Node? n = snk.node;
+                    if (n == null || n.graph != this) {
+                        snk.val = s.val;
+                        continue;
+                    }
+                    // Everything downstream of a stale sink is stale already
+                    if (!this.stale_sinks.add (snk))
+                        continue;
+                    snk.invalidate ();
+                    if (!this.stale_nodes.add (n))
+                        continue;
+                    foreach (Source src in n.get_sources ())
+                        stack.add (src);
+                }
+            }
+            foreach (Source s in marked.get_keys ())
+                s.updated ();
+        }
+
+        /**
+         * Brings the value of a stale sink up to date, evaluating
+         * the nodes upstream of it first
+         */
+        internal void refresh_sink (Sink snk) {
+            if (this.stale_sinks.size () == 0 || !this.stale_sinks.contains (snk))
+                return;
+            Source? src = snk.source;
+            // Keep the sink marked meanwhile, so evaluating upstream
+            // does not mark its node stale again
+            if (src != null && src.node != null)
+                this.refresh_node (src.node);
+            this.stale_sinks.remove (snk);
+            if (src != null)
+                snk.val = src.val;
+        }
+
+        /**
+         * Evaluates the node if some of its sinks are stale
+         */
+        internal void refresh_node (Node n) {
+            if (this.stale_nodes.size () == 0 || !this.stale_nodes.remove (n))
+                return;
+            foreach (Sink snk in n.get_sinks ())
+                this.refresh_sink (snk);
+            if (n is Computable && (this._max_threads > 0 || this.memoize))
+                this.compute_node (n as Computable, true);
+            else
+                this.evaluate_node (n);
+        }
+
+        /**
+         * Returns the nodes of this graph that are downstream of the
+         * currently dirty sources, sorted topologically.
+         */
+        private GenericArray<Node> sort_affected (HashTable<Node, Node> affected) {
+            var stack = new GenericArray<Node> ();
+            foreach (Source s in this.dirty.get_keys ()) {
+                foreach (Sink snk in s.sinks) {
+                    Node? n = snk.node;
+                    if (n != null && n.graph == this && !affected.contains (n)) {
+                        affected.add (n);
+                        stack.add (n);
+                    }
+                }
+            }
+            while (stack.length > 0) {
+                Node n = stack[stack.length - 1];
+                stack.remove_index (stack.length - 1);
+                unowned GenericArray<Edge> edges = this.outgoing.lookup (n);
+                for (int i = 0; i < edges.length; i++) {
+                    Node m = edges[i].to;
+                    if (!affected.contains (m)) {
+                        affected.add (m);
+                        stack.add (m);
+                    }
+                }
+            }
+            // Kahn's algorithm restricted to the affected subgraph
+            var in_degree = new HashTable<Node, int> (direct_hash, direct_equal);
+            foreach (Node n in affected.get_keys ()) {
+                unowned GenericArray<Edge> edges = this.outgoing.lookup (n);
+                for (int i = 0; i < edges.length; i++) {
+                    Node m = edges[i].to;
+                    in_degree.insert (m, in_degree.lookup (m) + 1);
+                }
+            }
+            var order = new GenericArray<Node> ();
+            foreach (Node n in affected.get_keys ()) {
+                if (in_degree.lookup (n) == 0)
+                    order.add (n);
+            }
+            for (int i = 0; i < order.length; i++) {
+                unowned GenericArray<Edge> edges = this.outgoing.lookup (order[i]);
+                for (int j = 0; j < edges.length; j++) {
+                    Node m = edges[j].to;
+                    int d = in_degree.lookup (m) - 1;
+                    in_degree.insert (m, d);
+                    if (d == 0)
+                        order.add (m);
+                }
+            }
+            if (order.length != affected.size ())
+                warning ("Graph contains a recursion. Some nodes will not be evaluated");
+            return order;
+        }
+
+        private void run_wave () {
+            var affected = new HashTable<Node, Node> (direct_hash, direct_equal);
+            GenericArray<Node> order = this.sort_affected (affected);
+            for (int i = 0; i < order.length; i++) {
+                Node n = order[i];
+                bool changed = false;
+                foreach (Sink snk in n.get_sinks ()) {
+                    Source? src = snk.source;
+                    if (src != null && this.dirty.contains (src)) {
+                        snk.val = src.val;
+                        changed = true;
+                    }
+                }
+                if (!changed)
+                    continue;
+                if (n is Computable && (this._max_threads > 0 || this.memoize))
+                    this.compute_node (n as Computable);
+                else
+                    this.evaluate_node (n);
+            }
+            // Deliver values to sinks outside of the evaluated nodes. Sources
+            // that feed nodes not visited in this wave are kept for the next one.
+            HashTable<Source, Source> wave = (owned) this.dirty;
+            this.dirty = new HashTable<Source, Source> (direct_hash, direct_equal);
+            foreach (Source src in wave.get_keys ()) {
+                bool pending = false;
+                foreach (Sink snk in src.sinks) {
+                    Node? n = snk.node;
+                    if (n != null && n.graph == this) {
+                        if (!affected.contains (n))
+                            pending = true;
+                    } else {
+                        snk.val = src.val;
+                    }
+                }
+                if (pending)
+                    this.dirty.add (src);
+                else
+                    src.updated ();
+            }
+        }
+
+        /**
+         * Cancels all running computations. Their results are thrown away.
+         */
+        public void cancel_computations () {
+            foreach (Job job in this.jobs.get_values ())
+                job.cancellable.cancel ();
+            this.jobs.remove_all ();
+        }
+
+        /**
+         * Drops all remembered results and resets the counters
+         */
+        public void clear_memo () {
+            this.memo.clear ();
+            this._memo_hits = 0;
+            this._memo_misses = 0;
+            this._memo_uncacheable = 0;
+        }
+
+        /**
+         * Answers the computation from memory if possible, and computes
+         * the node on the thread pool or right away otherwise
+         */
+        private void compute_node (Computable n, bool synchronous = false) {
+            Bytes? key = null;
+            if (this.memoize) {
+                key = MemoCache.make_key (n);
+                HashTable<string, Value?>? outputs = key != null ? this.memo.lookup (n, key) : null;
+                if (key == null) {
+                    this._memo_uncacheable++;
+                } else if (outputs != null) {
+                    this._memo_hits++;
+                    unowned Job? previous = this.jobs.lookup (n);
+                    if (previous != null) {
+                        previous.cancellable.cancel ();
+                        this.jobs.remove (n);
+                    }
+                    this.set_outputs (n, outputs);
+                    return;
+                } else {
+                    this._memo_misses++;
+                }
+            }
+            if (this._max_threads > 0 && !synchronous) {
+                this.dispatch (n, key);
+                return;
+            }
+            try {
+                if (this.profiling)
+                    this.profiler.begin_evaluation (n);
+                HashTable<string, Value?> outputs;
+                try {
+                    outputs = n.compute (this.get_inputs (n), new Cancellable ());
+                } finally {
+                    if (this.profiling)
+                        this.profiler.end_evaluation (n);
+                }
+                if (key != null)
+                    this.memo.insert (n, key, outputs);
+                this.set_outputs (n, outputs);
+                this.computed (n);
+            } catch (GLib.Error e) {
+                this.computation_failed (n, e);
+            }
+        }
+
+        private void evaluate_node (Node n) {
+            if (!this.profiling) {
+                n.evaluate ();
+                return;
+            }
+            this.profiler.begin_evaluation (n);
+            n.evaluate ();
+            this.profiler.end_evaluation (n);
+        }
+
+        private HashTable<string, Value?> get_inputs (Computable n) {
+            var inputs = new HashTable<string, Value?> (str_hash, str_equal);
+            foreach (Sink snk in n.get_sinks ()) {
+                if (snk.name != null && snk.val != null)
+                    inputs.insert (snk.name, snk.val);
+            }
+            return inputs;
+        }
+
+        /**
+         * Hands a snapshot of the node's inputs to the thread pool,
+         * superseding the computation that may still be running
+         */
+        private void dispatch (Computable n, Bytes? key) {
+            unowned Job? previous = this.jobs.lookup (n);
+            if (previous != null)
+                previous.cancellable.cancel ();
+            var job = new Job ();
+            job.node = n;
+            job.key = key;
+            job.context = MainContext.ref_thread_default ();
+            job.inputs = this.get_inputs (n);
+            this.jobs.insert (n, job);
+            try {
+                if (this.pool == null)
+                    this.pool = new ThreadPool<Job>.with_owned_data (Graph.run_job,
+                                                                      this._max_threads, false);
+                this.pool.add (job);
+            } catch (ThreadError e) {
+                warning ("Could not compute on a worker thread: %s", e.message);
+                this.jobs.remove (n);
+                this.evaluate_node (n);
+            }
+        }
+
+        // Runs on a worker thread
+        private static void run_job (owned Job job) {
+            if (!job.cancellable.is_cancelled ()) {
+                job.start = get_monotonic_time ();
+                try {
+                    job.outputs = job.node.compute (job.inputs, job.cancellable);
+                } catch (GLib.Error e) {
+                    job.error = e;
+                }
+                job.duration = get_monotonic_time () - job.start;
+            }
+            var idle = new IdleSource ();
+            idle.set_callback (() => {
+                Graph? graph = job.node.graph;
+                if (graph != null)
+                    graph.finish (job);
+                return false;
+            });
+            idle.attach (job.context);
+        }
+
+        private void finish (Job job) {
+            // Superseded by a newer computation or cancelled
+            if (this.jobs.lookup (job.node) != job || job.cancellable.is_cancelled ())
+                return;
+            this.jobs.remove (job.node);
+            if (this.profiling)
+                this.profiler.add_evaluation (job.node, job.start, job.duration, job.duration);
+            if (job.error != null) {
+                this.computation_failed (job.node, job.error);
+                return;
+            }
+            if (job.outputs == null)
+                return;
+            if (job.key != null)
+                this.memo.insert (job.node, job.key, job.outputs);
+            this.begin ();
+            this.set_outputs (job.node, job.outputs);
+            this.commit ();
+            this.computed (job.node);
+        }
+
+        /**
+         * Sets the outputs of a computation to the sources of the node.
+         * Sources that already hold the value are left alone, so nothing
+         * downstream of them is evaluated again.
+         */
+        private void set_outputs (Computable n, HashTable<string, Value?> outputs) {
+            foreach (Source s in n.get_sources ()) {
+                Value? v = s.name != null ? outputs.lookup (s.name) : null;
+                if (v == null || Graph.values_equal (s.val, v))
+                    continue;
+                try {
+                    if (s is SimpleSource) {
+                        (s as SimpleSource).set_value (v);
+                    } else {
+                        s.val = v;
+                        this.schedule (s);
+                    }
+                } catch (GLib.Error e) {
+                    warning ("Could not set the output '%s': %s", s.name, e.message);
+                }
+            }
+        }
+
+        private static bool values_equal (Value? a, Value? b) {
+            if (a == null || b == null || a.type () != b.type ())
+                return false;
+            Variant va = value_to_variant (a);
+            return !va.is_of_type (VariantType.UNIT) && va.equal (value_to_variant (b));
+        }
+    }
+}
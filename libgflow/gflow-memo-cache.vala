@@ -0,0 +1,143 @@
+/********************************************************************
+# Copyright 2014 Daniel 'grindhold' Brendle, 2015 Daniel Espinosa <esodan@gmail.com>
+#
+# This file is part of libgflow.
+#
+# libgflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+namespace GFlow {
+    /**
+     * Remembers the outputs {@link Computable} nodes computed for the
+     * values of their sinks, evicting the least recently used results
+     * once either the number of entries or their size exceeds a limit
+     */
+    internal class MemoCache : Object {
+        // Rough per entry bookkeeping cost in bytes
+        private const size_t ENTRY_OVERHEAD = 64;
+
+        private class Entry {
+            public unowned Node node;
+            public Bytes key;
+            public HashTable<string, Value?> outputs;
+            public size_t size;
+
+            public static uint hash (Entry e) {
+                return direct_hash (e.node) ^ e.key.hash ();
+            }
+
+            public static bool equal (Entry a, Entry b) {
+                return a.node == b.node && a.key.compare (b.key) == 0;
+            }
+        }
+
+        // Holds the entries, the queue only points to them. The most
+        // recently used entry is at the head of the queue.
+        private HashTable<Entry, unowned List<unowned Entry>> links
+            = new HashTable<Entry, unowned List<unowned Entry>> (Entry.hash, Entry.equal);
+        private Queue<unowned Entry> queue = new Queue<unowned Entry> ();
+
+        public uint max_entries { get; set; default = 256; }
+        public size_t max_bytes { get; set; default = 16 * 1024 * 1024; }
+        public size_t size { get; private set; default = 0; }
+        public uint length { get { return this.queue.length; } }
+
+        /**
+         * Builds the cache key from the values of the node's sinks.
+         * Returns null if one of them cannot be serialized.
+         */
+        public static Bytes? make_key (Node n) {
+            Variant[] children = {};
+            foreach (Sink snk in n.get_sinks ()) {
+                if (snk.val == null) {
+                    children += new Variant.maybe (VariantType.VARIANT, null);
+                    continue;
+                }
+                Variant v = value_to_variant (snk.val);
+                if (v.is_of_type (VariantType.UNIT))
+                    return null;
+                children += new Variant.maybe (null, new Variant.variant (v));
+            }
+            return new Variant.tuple (children).get_data_as_bytes ();
+        }
+
+        /**
+         * Returns the outputs stored for the key and marks them
+         * as the most recently used ones
+         */
+        public HashTable<string, Value?>? lookup (Node n, Bytes key) {
+            var probe = new Entry ();
+            probe.node = n;
+            probe.key = key;
+            unowned Entry? e = null;
+            unowned List<unowned Entry>? link = null;
+            if (!this.links.lookup_extended (probe, out e, out link))
+                return null;
+            this.queue.delete_link (link);
+            this.queue.push_head (e);
+            this.links.insert (e, this.queue.peek_head_link ());
+            return e.outputs;
+        }
+
+        public void insert (Node n, Bytes key, HashTable<string, Value?> outputs) {
+            var e = new Entry ();
+            e.node = n;
+            e.key = key;
+            e.outputs = outputs;
+            e.size = ENTRY_OVERHEAD + key.get_size ();
+            outputs.foreach ((name, v) => {
+                e.size += name.length + value_to_variant (v).get_size ();
+            });
+            this.remove_entry (e);
+            if (e.size > this.max_bytes)
+                return;
+            this.queue.push_head (e);
+            this.links.insert (e, this.queue.peek_head_link ());
+            this.size += e.size;
+            while (this.queue.length > this.max_entries || this.size > this.max_bytes)
+                this.remove_entry (this.queue.peek_tail ());
+        }
+
+        /**
+         * Drops all results of the given node
+         */
+        public void forget (Node n) {
+            var stale = new GenericArray<unowned Entry> ();
+            foreach (unowned Entry e in this.queue.head) {
+                if (e.node == n)
+                    stale.add (e);
+            }
+            for (int i = 0; i < stale.length; i++)
+                this.remove_entry (stale[i]);
+        }
+
+        public void clear () {
+            this.queue.clear ();
+            this.links.remove_all ();
+            this.size = 0;
+        }
+
+        private void remove_entry (Entry probe) {
+            unowned Entry? e = null;
+            unowned List<unowned Entry>? link = null;
+            if (!this.links.lookup_extended (probe, out e, out link))
+                return;
+            this.size -= e.size;
+            this.queue.delete_link (link);
+            this.links.remove (e);
+        }
+    }
+}
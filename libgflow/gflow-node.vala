@@ -62,7 +62,22 @@ namespace GFlow {
          * Throw when the user tries to remove a dock from a node
          * that hasn't yet been added to the node
          */
-        NO_SUCH_DOCK
+        NO_SUCH_DOCK,
+        /**
+         * Throw when the user tries to add a node to a graph
+         * while it already belongs to a graph
+         */
+        NODE_ALREADY_IN_GRAPH,
+        /**
+         * Throw when the user tries to remove a node from a graph
+         * that hasn't yet been added to the graph
+         */
+        NO_SUCH_NODE,
+        /**
+         * Throw when the user tries to establish a connection
+         * that would lead to a recursion
+         */
+        RECURSIVE_CONNECTION
     }
     /**
      * Represents an element that can generate, process or receive data
@@ -71,17 +86,30 @@ namespace GFlow {
     public interface Node : GLib.Object {
         public signal void sinks_changed ();
         public signal void sources_changed ();
+        /**
+         * Emitted once per update wave of the {@link Graph} this node
+         * belongs to, after all of its {@link Sink}s received their new
+         * values. Connect to this signal instead of {@link Dock.changed}
+         * in order to compute the node's outputs only once, no matter
+         * how many of its inputs changed.
+         */
+        public signal void evaluate ();
         public abstract string name { get; set; }
+        /**
+         * The {@link Graph} this node has been added to, if any
+         */
+        public abstract weak Graph? graph { get; set; }
         public abstract void disconnect_all ();
         public abstract bool is_recursive (Node from, bool initial=false);
         public abstract Dock? get_dock (string name);
         public abstract bool has_dock(Dock d);
         public abstract unowned List<Source> get_sources ();
-        public abstract void add_source (Source source);
-        public abstract void remove_source (Source source);
+        public abstract unowned List<Sink> get_sinks ();
+        public abstract void add_source (Source source) throws GLib.Error;
+        public abstract void remove_source (Source source) throws GLib.Error;
         public abstract bool has_source (Source s);
-        public abstract void add_sink (Sink sink);
+        public abstract void add_sink (Sink sink) throws GLib.Error;
         public abstract bool has_sink (Sink s);
-        public abstract void remove_sink (Sink sink);
+        public abstract void remove_sink (Sink sink) throws GLib.Error;
     }
 }
@@ -0,0 +1,234 @@
+/********************************************************************
+# Copyright 2014 Daniel 'grindhold' Brendle, 2015 Daniel Espinosa <esodan@gmail.com>
+#
+# This file is part of libgflow.
+#
+# libgflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+namespace GFlow {
+    /**
+     * What a {@link Profiler} measured for a single node
+     */
+    public class NodeStats : Object {
+        /**
+         * How often the node has been evaluated
+         */
+        public uint evaluations { get; internal set; default = 0; }
+        /**
+         * The time spent evaluating the node in microseconds, not counting
+         * the time spent in other nodes evaluated meanwhile
+         */
+        public int64 evaluation_time { get; internal set; default = 0; }
+        /**
+         * The longest single evaluation in microseconds
+         */
+        public int64 max_evaluation_time { get; internal set; default = 0; }
+    }
+
+    /**
+     * Records where a {@link Graph} spends its time
+     *
+     * Set {@link Graph.profiling} to start recording. Besides the
+     * per node statistics, the profiler keeps a trace of the evaluations
+     * that {@link write_trace} exports in the trace event format, which
+     * can be loaded into chrome://tracing, Perfetto or Sysprof.
+     */
+    public class Profiler : Object {
+        private class Frame {
+            public unowned Node node;
+            public int64 start;
+            public int64 children = 0;
+        }
+
+        private class TraceEvent {
+            public string name;
+            public string category;
+            public int64 start;
+            public int64 duration;
+        }
+
+        private HashTable<Node, NodeStats> stats = new HashTable<Node, NodeStats> (direct_hash, direct_equal);
+        private GenericArray<Frame> frames = new GenericArray<Frame> ();
+        private GenericArray<TraceEvent> trace = new GenericArray<TraceEvent> ();
+        private int64 propagation_start = 0;
+        private uint fan_out = 0;
+        private uint propagation_depth = 0;
+
+        /**
+         * The number of propagations recorded
+         */
+        public uint propagations { get; private set; default = 0; }
+
+        /**
+         * The number of nodes evaluated by the last propagation
+         */
+        public uint last_fan_out { get; private set; default = 0; }
+
+        /**
+         * The largest number of nodes evaluated by a single propagation
+         */
+        public uint max_fan_out { get; private set; default = 0; }
+
+        /**
+         * The number of trace events kept. Older events are dropped.
+         * If this is 0, no trace is recorded.
+         */
+        public uint max_trace_events { get; set; default = 100000; }
+
+        /**
+         * Emitted after a node has been evaluated, with the
+         * evaluation time in microseconds
+         */
+        public signal void node_evaluated (Node n, int64 duration);
+
+        /**
+         * Emitted after a propagation finished, with the
+         * number of nodes it evaluated
+         */
+        public signal void propagated (uint fan_out);
+
+        /**
+         * Returns the statistics of the given node, or null
+         * if it has not been evaluated yet
+         */
+        public NodeStats? get_stats (Node n) {
+            return this.stats.lookup (n);
+        }
+
+        /**
+         * Returns the nodes that have statistics
+         */
+        public List<weak Node> get_nodes () {
+            return this.stats.get_keys ();
+        }
+
+        /**
+         * Forgets everything recorded so far
+         */
+        public void reset () {
+            this.stats.remove_all ();
+            this.trace = new GenericArray<TraceEvent> ();
+            this.propagations = 0;
+            this.last_fan_out = 0;
+            this.max_fan_out = 0;
+        }
+
+        internal void forget (Node n) {
+            this.stats.remove (n);
+        }
+
+        internal void begin_evaluation (Node n) {
+            var frame = new Frame ();
+            frame.node = n;
+            frame.start = get_monotonic_time ();
+            this.frames.add (frame);
+        }
+
+        internal void end_evaluation (Node n) {
+            if (this.frames.length == 0 || this.frames[this.frames.length - 1].node != n)
+                return;
+            Frame frame = this.frames[this.frames.length - 1];
+            this.frames.remove_index (this.frames.length - 1);
+            int64 duration = get_monotonic_time () - frame.start;
+            if (this.frames.length > 0)
+                this.frames[this.frames.length - 1].children += duration;
+            this.add_evaluation (n, frame.start, duration, duration - frame.children);
+        }
+
+        /**
+         * Records an evaluation that ran elsewhere, e.g. on a worker thread
+         */
+        internal void add_evaluation (Node n, int64 start, int64 duration, int64 exclusive) {
+            NodeStats? s = this.stats.lookup (n);
+            if (s == null) {
+                s = new NodeStats ();
+                this.stats.insert (n, s);
+            }
+            s.evaluations++;
+            s.evaluation_time += exclusive;
+            if (exclusive > s.max_evaluation_time)
+                s.max_evaluation_time = exclusive;
+            if (this.propagation_depth > 0)
+                this.fan_out++;
+            this.add_trace_event (n.name ?? n.get_type ().name (), "evaluate", start, duration);
+            this.node_evaluated (n, exclusive);
+        }
+
+        internal void begin_propagation () {
+            if (this.propagation_depth++ > 0)
+                return;
+            this.propagation_start = get_monotonic_time ();
+            this.fan_out = 0;
+        }
+
+        internal void end_propagation () {
+            if (this.propagation_depth == 0 || --this.propagation_depth > 0)
+                return;
+            this.propagations++;
+            this.last_fan_out = this.fan_out;
+            if (this.fan_out > this.max_fan_out)
+                this.max_fan_out = this.fan_out;
+            this.add_trace_event ("propagate", "propagate", this.propagation_start,
+                                  get_monotonic_time () - this.propagation_start);
+            this.propagated (this.fan_out);
+        }
+
+        private void add_trace_event (string name, string category, int64 start, int64 duration) {
+            if (this.max_trace_events == 0)
+                return;
+            // Drop the older half at once, so recording stays cheap
+            if (this.trace.length >= this.max_trace_events)
+                this.trace.remove_range (0, this.trace.length - this.max_trace_events / 2);
+            var e = new TraceEvent ();
+            e.name = name;
+            e.category = category;
+            e.start = start;
+            e.duration = duration;
+            this.trace.add (e);
+        }
+
+        private static string escape (string s) {
+            var escaped = new StringBuilder ();
+            for (int i = 0; i < s.length; i++) {
+                char c = s[i];
+                if (c == '"' || c == '\\')
+                    escaped.append_c ('\\').append_c (c);
+                else if ((uchar) c < 0x20)
+                    escaped.append_printf ("\\u%04x", (uint) c);
+                else
+                    escaped.append_c (c);
+            }
+            return escaped.str;
+        }
+
+        /**
+         * Writes the recorded trace in the JSON trace event format
+         */
+        public void write_trace (OutputStream stream, Cancellable? cancellable = null) throws GLib.Error {
+            var data = new DataOutputStream (stream);
+            data.close_base_stream = false;
+            data.put_string ("{\"traceEvents\": [\n", cancellable);
+            for (int i = 0; i < this.trace.length; i++) {
+                TraceEvent e = this.trace[i];
+                data.put_string ("{\"name\": \"%s\", \"cat\": \"%s\", \"ph\": \"X\", \"ts\": %s, \"dur\": %s, \"pid\": 1, \"tid\": 1}%s\n".printf (
+                    Profiler.escape (e.name), e.category, e.start.to_string (), e.duration.to_string (),
+                    i < this.trace.length - 1 ? "," : ""), cancellable);
+            }
+            data.put_string ("]}\n", cancellable);
+        }
+    }
+}
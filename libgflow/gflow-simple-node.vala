@@ -27,58 +27,83 @@ namespace GFlow {
      */
     public class SimpleNode : Object, Node
     {
-        private List<Source> sources = new List<Source>();
-        private List<Sink> sinks = new List<Sink>();
+        private DockList<Source> sources = new DockList<Source>();
+        private DockList<Sink> sinks = new DockList<Sink>();
 
         public string name { get; set; default="SimpleNode";}
+        public weak Graph? graph { get; set; default=null; }
         /**
          * FIXME:*
          */
         public void add_source(Source s) throws NodeError {
-            if (s.get_node() != null)
+            if (s.node != null)
                 throw new NodeError.DOCK_ALREADY_BOUND_TO_NODE("This Source is already bound");
-            if (this.sources.index(s) != -1)
+            if (this.sources.contains(s))
                 throw new NodeError.ALREADY_HAS_DOCK("This node already has this source");
             sources.append(s);
-            s.set_node(this);
-            s.update_layout();
+            s.node = this;
+            if (this.graph != null) {
+                try {
+                    foreach (Sink snk in s.sinks)
+                        this.graph.add_edge (s, snk);
+                } catch (NodeError e) {
+                    sources.remove(s);
+                    s.node = null;
+                    throw e;
+                }
+            }
             sources_changed ();
         }
         /**
          * FIXME:*
          */
         public void add_sink (Sink s) throws NodeError {
-            if (s.get_node() != null)
+            if (s.node != null)
                 throw new NodeError.DOCK_ALREADY_BOUND_TO_NODE("This Sink is already bound" );
-            if (this.sinks.index(s) != -1)
+            if (this.sinks.contains(s))
                 throw new NodeError.ALREADY_HAS_DOCK("This node already has this sink");
             sinks.append(s);
-            s.set_node(this); // FIXME: send a signal to update_layout and recalculate_size
+            s.node = this;
+            if (this.graph != null && s.source != null) {
+                try {
+                    this.graph.add_edge (s.source, s);
+                } catch (NodeError e) {
+                    sinks.remove(s);
+                    s.node = null;
+                    throw e;
+                }
+            }
             sinks_changed ();
         }
 
         public void remove_source(Source s) throws NodeError {
-            if (this.sources.index(s) == -1)
+            if (!this.sources.contains(s))
                 throw new NodeError.NO_SUCH_DOCK("This node doesn't have this source");
+            if (this.graph != null) {
+                foreach (Sink snk in s.sinks)
+                    this.graph.remove_edge (s, snk);
+            }
             sources.remove(s);
-            s.set_node(null); // FIXME: send a signal to update_layout and recalculate_size
+            s.node = null;
             sources_changed ();
         }
 
         public void remove_sink(Sink s) throws NodeError {
-            if (this.sinks.index(s) == -1)
+            if (!this.sinks.contains(s))
                 throw new NodeError.NO_SUCH_DOCK("This node doesn't have this sink");
+            if (this.graph != null && s.source != null)
+                this.graph.remove_edge (s.source, s);
             sinks.remove(s);
-            s.set_node(null); // FIXME: send a signal to update_layout and recalculate_size
+            s.node = null;
             sinks_changed ();
         }
 
         public bool has_sink(Sink s) {
-            return this.sinks.index(s) != -1;
+            return this.sinks.contains(s);
         }
 
         public bool has_source(Source s) {
-            return this.sources.index(s) != -1;
+            return this.sources.contains(s);
         }
 
         public bool has_dock(Dock d) {
@@ -88,24 +113,64 @@ namespace GFlow {
                 return this.has_sink(d as Sink);
         }
 
+        /**
+         * Returns the dock with the given name, if any
+         */
+        public Dock? get_dock (string name) {
+            foreach (Sink s in this.sinks.head) {
+                if (s.name == name)
+                    return s;
+            }
+            foreach (Source s in this.sources.head) {
+                if (s.name == name)
+                    return s;
+            }
+            return null;
+        }
+
         /**
          * Returns the sources of this node
          */
         public unowned List<Source> get_sources() {
-            return this.sources;
+            return this.sources.head;
+        }
+
+        /**
+         * Returns the sinks of this node
+         */
+        public unowned List<Sink> get_sinks() {
+            return this.sinks.head;
         }
 
         /**
          * This method checks whether a connection from the given from-Node
          * to this Node would lead to a recursion
+         *
+         * If both nodes belong to the same {@link Graph} its topological
+         * order is used, otherwise the downstream nodes are visited once.
+         * Unless initial is true, a node also counts as recursive with itself.
          */
-        public bool is_recursive(Node from, bool initial=true) {
+        public bool is_recursive(Node from, bool initial=false) {
             if (!initial && this == from)
                 return true;
-            foreach (Source source in this.get_sources()) {
-                foreach (Sink sink in source.get_sinks()) {
-                    if (sink.get_node().is_recursive(from, false))
-                        return true;
+            if (this.graph != null && this.graph == from.graph)
+                return this.graph.is_reachable(this, from);
+            var visited = new HashTable<Node, Node>(direct_hash, direct_equal);
+            var stack = new GenericArray<Node>();
+            stack.add(this);
+            while (stack.length > 0) {
+                Node n = stack[stack.length - 1];
+                stack.remove_index(stack.length - 1);
+                foreach (Source source in n.get_sources()) {
+                    foreach (Sink sink in source.sinks) {
+                        Node? m = sink.node;
+                        if (m == null || visited.contains(m))
+                            continue;
+                        if (m == from)
+                            return true;
+                        visited.add(m);
+                        stack.add(m);
+                    }
                 }
             }
             return false;
@@ -115,11 +180,16 @@ namespace GFlow {
          * Disconnect all connections from and to this node
          */
         public void disconnect_all() {
-            foreach (Source s in this.sources) {
-                s.remove_sinks();
-            }
-            foreach (Sink s in this.sinks) {
-                s.unset_source();
+            try {
+                foreach (Source s in this.sources.head) {
+                    s.disconnect_all();
+                }
+                foreach (Sink s in this.sinks.head) {
+                    if (s.source != null)
+                        s.disconnect(s.source);
+                }
+            } catch (GLib.Error e) {
+                warning("Could not disconnect all docks: %s", e.message);
             }
         }
   }
@@ -42,13 +42,22 @@ namespace GFlow {
                 return this._source;
             }
         }
+        // The handler of the source's changed signal, dropped on disconnect
+        private ulong source_changed_handler = 0;
         public GLib.Value? val {
           get {
+            if (node != null && node.graph != null)
+              node.graph.refresh_sink (this);
             return _val;
           }
           set {
-            if (!_val.holds (value.type ())) return;
-            _val = value;
+            if (_val.holds (value.type ())) {
+              _val = value;
+            } else {
+              Value converted = Value (_val.type ());
+              if (!convert_value (value, ref converted)) return;
+              _val = converted;
+            }
             // FIXME: This properly is read-only then may let implementators to define how "Change a Value"
             //this.valid = true;
             changed ();
@@ -59,6 +68,10 @@ namespace GFlow {
           _val = _initial = initial;
         }
 
+        ~SimpleSink () {
+          unset_source ();
+        }
+
         /**
          * Returns true if this sink is connected to a source
          */
@@ -77,27 +90,51 @@ namespace GFlow {
         }
         public new void disconnect (Dock dock) throws GLib.Error
         {
-          if (!dock.is_connected_to (this)) return;
-          if (dock is Source) {
-            if (source != null) {
-              source.disconnect (this);
-            }
-            _source = null;
-            disconnected (dock);
-          }
+          if (!(dock is Source) || _source != dock) return;
+          unset_source ();
+          // Whoever started the disconnect, both sides let go
+          if (dock.is_connected_to (this))
+            dock.disconnect (this);
+          disconnected (dock);
         }
         public new void connect (Dock dock) throws GLib.Error
         {
-          if (dock.is_connected_to (this)) return;
-          if (dock is Source) {
-            if (source != null) ((Dock) source).disconnect (this);
-            dock.connect (this);
-            _source = (Source) dock;
-            _source.changed.connect (() =>{
-              val = _source.val;
-            });
+          if (!(dock is Source) || _source == dock) return;
+          if (_source != null) disconnect (_source);
+          set_source ((Source) dock);
+          if (!dock.is_connected_to (this)) {
+            try {
+              dock.connect (this);
+            } catch (GLib.Error e) {
+              unset_source ();
+              throw e;
+            }
           }
         }
+        private void set_source (Source s)
+        {
+          _source = s;
+          source_changed_handler = s.changed.connect (source_changed);
+          s.weak_ref (source_finalized);
+        }
+        private void unset_source ()
+        {
+          if (_source == null) return;
+          SignalHandler.disconnect (_source, source_changed_handler);
+          _source.weak_unref (source_finalized);
+          source_changed_handler = 0;
+          _source = null;
+        }
+        // The handler went away with the source
+        private void source_finalized (Object source)
+        {
+          source_changed_handler = 0;
+          _source = null;
+        }
+        private void source_changed ()
+        {
+          val = _source.val;
+        }
         // FIXME This oeverrides Dock.changed signals and set a value but this should not be the case
         // FIXME when change_value is callled it sets its value and send this signal
 /*        public virtual signal void changed (GLib.Value v) {
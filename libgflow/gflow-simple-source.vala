@@ -34,7 +34,11 @@ namespace GFlow {
         public bool active {get; set; default=false;}
         public weak Node? node { get; set; }
         public GLib.Value? val {
-          get { return _val; }
+          get {
+            if (node != null && node.graph != null)
+              node.graph.refresh_node (node);
+            return _val;
+          }
           set {
             if (!_val.holds (value.type ())) return;
             _val = value;
@@ -48,28 +52,68 @@ namespace GFlow {
         public GLib.Value? initial { get { return _initial; } }
         public bool valid { get { return _valid; } }
         // Source interface
-        private List<Sink> _sinks = new List<Sink> ();
-        public List<Sink> sinks { get { return _sinks; } }
+        private DockList<Sink> _sinks = new DockList<Sink> ();
+        public List<Sink> sinks { get { return _sinks.head; } }
+
+        // The main loop source that delivers a delayed value
+        private uint delivery_id = 0;
+        // Monotonic time of the last delivery in microseconds
+        private int64 last_delivery = 0;
+
+        /**
+         * Determines when values set with {@link set_value} are
+         * passed on to the sinks
+         *
+         * A value that is held back keeps the source alive
+         * until it has been passed on.
+         */
+        public UpdatePolicy update_policy { get; set; default = UpdatePolicy.IMMEDIATE; }
+
+        /**
+         * The interval in milliseconds used by {@link UpdatePolicy.THROTTLE}
+         * and {@link UpdatePolicy.DEBOUNCE}
+         */
+        public uint update_interval { get; set; default = 16; }
 
         protected void add_sink (Sink s) throws Error
         {
-            if (this.val.type() != s.val.type()) {
+            if (!can_convert (_val.type (), s.val.type ())) {
                 throw new NodeError.INCOMPATIBLE_SINKTYPE(
                     "Can't connect. Sink has type %s while Source has type %s".printf(
                         s.val.type().name(), this.val.type().name()
                     )
                 );
             }
-            this.sinks.append (s);
+            if ((this is StreamSource) != (s is StreamSink)) {
+                throw new NodeError.INCOMPATIBLE_SINKTYPE(
+                    "Can't connect. Streams can only be connected to streams"
+                );
+            }
+            if (this is BufferSource && s is BufferSink
+                && ((BufferSource) this).element_type != ((BufferSink) s).element_type) {
+                throw new NodeError.INCOMPATIBLE_SINKTYPE(
+                    "Can't connect. Sink holds %s while Source holds %s".printf(
+                        ((BufferSink) s).element_type.get_type_name (),
+                        ((BufferSource) this).element_type.get_type_name ()
+                    )
+                );
+            }
+            if (this.node != null && this.node.graph != null)
+                this.node.graph.add_edge (this, s);
+            this._sinks.append (s);
             if (this.valid) {
-                s.val = this.val;
+                if (this.node != null && this.node.graph != null && this.node.graph.frozen)
+                    this.node.graph.schedule (this);
+                else
+                    s.val = this.val;
             }
             connected ((Dock) s);
         }
         protected void remove_sink (Sink s) throws GLib.Error
         {
-            if (this.sinks.index(s) != -1)
-                this.sinks.remove(s);
+            if (this.node != null && this.node.graph != null)
+                this.node.graph.remove_edge (this, s);
+            this._sinks.remove (s);
             if (s.is_connected_to(this))
                 s.disconnect (this);
             this.disconnected(s);
@@ -83,47 +127,111 @@ namespace GFlow {
          */
         public bool is_connected_to (Dock dock) {
             if (!(dock is Sink)) return false;
-            return this.sinks.index((Sink) dock) != -1;
+            return this._sinks.contains ((Sink) dock);
         }
 
         /**
          * Returns true if this Source is connected to one or more Sinks
          */
         public bool is_connected () {
-            return this.sinks.length () > 0;
+            return this._sinks.length > 0;
         }
         // FIXME: Added to implement the one on Dock - Review
         public void invalidate () { _valid = false; }
         // FIXME Added to simplify Source interface
         public new void disconnect (Dock dock) throws GLib.Error
         {
-          if (!dock.is_connected_to (this)) return;
+          if (!is_connected_to (dock)) return;
           if (dock is Sink) {
             remove_sink ((Sink) dock);
-            if (sinks.length () == 0) disconnected (dock);
+            if (_sinks.length == 0) disconnected (dock);
           }
         }
         public new void connect (Dock dock) throws GLib.Error
         {
-          if (dock.is_connected_to (this)) return;
+          if (is_connected_to (dock)) return;
           if (dock is Sink) {
             add_sink ((Sink) dock);
+            // Let the sink know when the connection was made from this side
+            if (!dock.is_connected_to (this))
+              dock.connect (this);
             connected (dock);
           }
         }
         /**
+         * Sets the value of this source and sends it to the connected sinks.
+         *
+         * If the node of this source belongs to a {@link Graph}, the value
+         * is delivered by the graph in its next update wave.
+         * When the value is delivered depends on {@link update_policy}.
+         *
          * FIXME This could be removed and make connected Dock to lisen updated () signal
          */
         public void set_value (GLib.Value v) throws GLib.Error
         {
-            if (this.val.type() != v.type())
+            if (_val.type() != v.type())
                 throw new NodeError.INCOMPATIBLE_VALUE(
                     "Cannot set a %s value to this %s Source".printf(
-                        v.type().name(),this.val.type().name())
+                        v.type().name(),_val.type().name())
                 );
-            this.val = v;
+            _val = v;
+            switch (update_policy) {
+                case UpdatePolicy.COALESCE:
+                    if (delivery_id == 0)
+                        delivery_id = GLib.Idle.add (deliver_delayed);
+                    break;
+                case UpdatePolicy.THROTTLE:
+                    if (delivery_id != 0)
+                        break;
+                    int64 wait = last_delivery + update_interval * 1000
+                                 - GLib.get_monotonic_time ();
+                    if (wait <= 0)
+                        deliver ();
+                    else
+                        delivery_id = GLib.Timeout.add ((uint) ((wait + 999) / 1000),
+                                                        deliver_delayed);
+                    break;
+                case UpdatePolicy.DEBOUNCE:
+                    if (delivery_id != 0)
+                        GLib.Source.remove (delivery_id);
+                    delivery_id = GLib.Timeout.add (update_interval, deliver_delayed);
+                    break;
+                default:
+                    deliver ();
+                    break;
+            }
+        }
+
+        /**
+         * Passes a value that has been held back by the
+         * {@link update_policy} on to the sinks right away
+         */
+        public void flush ()
+        {
+            if (delivery_id == 0)
+                return;
+            GLib.Source.remove (delivery_id);
+            deliver_delayed ();
+        }
+
+        private bool deliver_delayed ()
+        {
+            delivery_id = 0;
+            deliver ();
+            return false;
+        }
+
+        private void deliver ()
+        {
+            last_delivery = GLib.get_monotonic_time ();
+            Graph? graph = this.node != null ? this.node.graph : null;
+            if (graph != null) {
+                graph.schedule (this);
+                return;
+            }
+            changed ();
             foreach (Sink s in this.sinks)
-                s.val = v;
+                s.val = _val;
             updated ();
         }
     }
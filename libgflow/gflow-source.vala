@@ -20,6 +20,31 @@
 *********************************************************************/
 
 namespace GFlow {
+    /**
+     * Determines when a {@link SimpleSource} passes new values on to its sinks
+     */
+    public enum UpdatePolicy {
+        /**
+         * Every value is passed on right away
+         */
+        IMMEDIATE,
+        /**
+         * Only the latest value set during a main loop iteration
+         * is passed on, once the main loop is idle
+         */
+        COALESCE,
+        /**
+         * Values are passed on at most once per update interval.
+         * The latest value is passed on at the end of the interval.
+         */
+        THROTTLE,
+        /**
+         * A value is passed on after no new value has been set
+         * for an update interval
+         */
+        DEBOUNCE
+    }
+
     /**
      * The Source is a special Type of Dock that provides data.
      * A Source could be used by multitude of Sinks as a source of data. // FIXME Is this correct?
@@ -35,7 +60,7 @@ namespace GFlow {
 
         public virtual void disconnect_all () throws GLib.Error
         {
-            foreach (Sink s in this.sinks)
+            foreach (Sink s in this.sinks.copy ())
                 this.disconnect (s);
         }
     }
@@ -0,0 +1,254 @@
+/********************************************************************
+# Copyright 2014 Daniel 'grindhold' Brendle, 2015 Daniel Espinosa <esodan@gmail.com>
+#
+# This file is part of libgflow.
+#
+# libgflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+namespace GFlow {
+    /**
+     * A source that streams chunks of data to its sinks
+     *
+     * Instead of a single latest value, every connected {@link StreamSink}
+     * holds a bounded queue of chunks. Data written to the source is split
+     * into chunks of at most {@link chunk_size} bytes, and every sink gets
+     * a reference to the same chunks. A producer that writes faster than
+     * the slowest sink reads is held back: {@link try_write} fails and
+     * {@link write_async} waits until there is room in all sinks.
+     */
+    public class StreamSource : SimpleSource {
+        /**
+         * The maximum size of a chunk in bytes. Larger writes are split.
+         * If this is 0, writes are never split.
+         */
+        public size_t chunk_size { get; set; default = 4096; }
+
+        /**
+         * True once {@link close} has been called
+         */
+        public bool closed { get; private set; default = false; }
+
+        /**
+         * Emitted when a sink made room for new chunks, when a sink
+         * has been disconnected and when the stream has been closed
+         */
+        public signal void writable ();
+
+        public StreamSource () {
+            Value initial = Value (typeof (Bytes));
+            initial.set_boxed (new Bytes (null));
+            base (initial);
+            // A full sink that goes away no longer holds back the writers
+            this.disconnected.connect (() => { this.writable (); });
+        }
+
+        /**
+         * Returns true if every connected sink has room
+         * for the given number of chunks
+         */
+        public bool has_room (uint n_chunks = 1) {
+            foreach (Sink s in this.sinks) {
+                var stream = s as StreamSink;
+                if (stream != null && stream.length + n_chunks > stream.capacity)
+                    return false;
+            }
+            return true;
+        }
+
+        /**
+         * Writes the data if all sinks have room for it.
+         * Returns false and writes nothing otherwise.
+         */
+        public bool try_write (Bytes data) throws GLib.Error {
+            GenericArray<Bytes> chunks = this.split (data);
+            if (!this.has_room (chunks.length))
+                return false;
+            for (int i = 0; i < chunks.length; i++)
+                this.deliver_chunk (chunks[i]);
+            return true;
+        }
+
+        /**
+         * Writes the data, waiting for the sinks to make room
+         * for every chunk first. Fails with {@link GLib.IOError.CLOSED}
+         * if the stream is closed while waiting.
+         */
+        public async void write_async (Bytes data, Cancellable? cancellable = null) throws GLib.Error {
+            GenericArray<Bytes> chunks = this.split (data);
+            for (int i = 0; i < chunks.length; i++) {
+                while (!this.has_room ()) {
+                    bool woken = false;
+                    ulong handler = this.writable.connect (() => {
+                        if (woken)
+                            return;
+                        woken = true;
+                        Idle.add (write_async.callback);
+                    });
+                    ulong cancel_handler = 0;
+                    if (cancellable != null) {
+                        cancel_handler = cancellable.connect (() => {
+                            if (woken)
+                                return;
+                            woken = true;
+                            Idle.add (write_async.callback);
+                        });
+                    }
+                    yield;
+                    SignalHandler.disconnect (this, handler);
+                    if (cancellable != null) {
+                        cancellable.disconnect (cancel_handler);
+                        cancellable.set_error_if_cancelled ();
+                    }
+                    if (this.closed)
+                        throw new IOError.CLOSED ("The stream has been closed");
+                }
+                this.deliver_chunk (chunks[i]);
+            }
+        }
+
+        /**
+         * Ends the stream. The sinks return the chunks they hold
+         * and report the end of the stream afterwards.
+         */
+        public void close () {
+            this.closed = true;
+            foreach (Sink s in this.sinks) {
+                if (s is StreamSink)
+                    ((StreamSink) s).end_stream ();
+            }
+            // Wake up the writers waiting for room
+            this.writable ();
+        }
+
+        private GenericArray<Bytes> split (Bytes data) throws GLib.Error {
+            if (this.closed)
+                throw new IOError.CLOSED ("The stream has been closed");
+            var chunks = new GenericArray<Bytes> ();
+            size_t size = data.get_size ();
+            if (this.chunk_size == 0 || size <= this.chunk_size) {
+                chunks.add (data);
+                return chunks;
+            }
+            for (size_t offset = 0; offset < size; offset += this.chunk_size)
+                chunks.add (data.slice ((int) offset, (int) size_t.min (offset + this.chunk_size, size)));
+            return chunks;
+        }
+
+        private void deliver_chunk (Bytes chunk) {
+            _val = Value (typeof (Bytes));
+            _val.set_boxed (chunk);
+            foreach (Sink s in this.sinks) {
+                if (s is StreamSink)
+                    ((StreamSink) s).push_chunk (chunk);
+            }
+            updated ();
+        }
+    }
+
+    /**
+     * A sink that queues the chunks of a {@link StreamSource}
+     * until they are read
+     */
+    public class StreamSink : SimpleSink {
+        private Queue<Bytes> chunks = new Queue<Bytes> ();
+
+        /**
+         * The maximum number of chunks held before the source is held back
+         */
+        public uint capacity { get; set; default = 16; }
+
+        /**
+         * The number of chunks waiting to be read
+         */
+        public uint length { get { return this.chunks.length; } }
+
+        /**
+         * True once the source closed the stream and all chunks were read
+         */
+        public bool at_end { get { return this.ended && this.chunks.is_empty (); } }
+
+        private bool ended = false;
+
+        /**
+         * Emitted when a new chunk has been queued
+         */
+        public signal void chunk_available ();
+
+        public StreamSink () {
+            Value initial = Value (typeof (Bytes));
+            initial.set_boxed (new Bytes (null));
+            base (initial);
+        }
+
+        /**
+         * Returns the oldest chunk, or null if there is none queued
+         */
+        public Bytes? pop () {
+            Bytes? chunk = this.chunks.pop_head ();
+            if (chunk != null) {
+                _val = Value (typeof (Bytes));
+                _val.set_boxed (chunk);
+                var stream = this.source as StreamSource;
+                if (stream != null)
+                    stream.writable ();
+            }
+            return chunk;
+        }
+
+        /**
+         * Returns the oldest chunk, waiting for one if none is queued.
+         * Returns null at the end of the stream.
+         */
+        public async Bytes? read_async (Cancellable? cancellable = null) throws GLib.Error {
+            while (this.chunks.is_empty () && !this.ended) {
+                bool woken = false;
+                ulong handler = this.chunk_available.connect (() => {
+                    if (woken)
+                        return;
+                    woken = true;
+                    Idle.add (read_async.callback);
+                });
+                ulong cancel_handler = 0;
+                if (cancellable != null) {
+                    cancel_handler = cancellable.connect (() => {
+                        if (woken)
+                            return;
+                        woken = true;
+                        Idle.add (read_async.callback);
+                    });
+                }
+                yield;
+                SignalHandler.disconnect (this, handler);
+                if (cancellable != null) {
+                    cancellable.disconnect (cancel_handler);
+                    cancellable.set_error_if_cancelled ();
+                }
+            }
+            return this.pop ();
+        }
+
+        internal void push_chunk (Bytes chunk) {
+            this.chunks.push_tail (chunk);
+            this.chunk_available ();
+        }
+
+        internal void end_stream () {
+            this.ended = true;
+            this.chunk_available ();
+        }
+    }
+}
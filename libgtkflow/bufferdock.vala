@@ -0,0 +1,207 @@
+/********************************************************************
+# Copyright 2014 Daniel 'grindhold' Brendle
+#
+# This file is part of libgtkflow.
+#
+# libgtkflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+namespace GtkFlow {
+    /**
+     * The type of the elements of a buffer passed between
+     * {@link BufferSource}s and {@link BufferSink}s
+     */
+    public enum ElementType {
+        UINT8,
+        INT16,
+        INT32,
+        INT64,
+        FLOAT,
+        DOUBLE;
+
+        /**
+         * Returns the size of one element in bytes
+         */
+        public size_t get_size() {
+            switch (this) {
+                case INT16:
+                    return sizeof(int16);
+                case INT32:
+                    return sizeof(int32);
+                case INT64:
+                    return sizeof(int64);
+                case FLOAT:
+                    return sizeof(float);
+                case DOUBLE:
+                    return sizeof(double);
+                default:
+                    return sizeof(uint8);
+            }
+        }
+
+        public string get_type_name() {
+            switch (this) {
+                case INT16:
+                    return "int16[]";
+                case INT32:
+                    return "int32[]";
+                case INT64:
+                    return "int64[]";
+                case FLOAT:
+                    return "float[]";
+                case DOUBLE:
+                    return "double[]";
+                default:
+                    return "uint8[]";
+            }
+        }
+    }
+
+    /**
+     * Returns the address of the data of a buffer and its size in bytes,
+     * so bindings can wrap the memory without copying it. The address
+     * is valid as long as the buffer is alive.
+     */
+    public uintptr get_buffer_address(GLib.Bytes buffer, out size_t size) {
+        unowned uint8[]? data = buffer.get_data();
+        size = buffer.get_size();
+        return (uintptr)(void*)data;
+    }
+
+    /**
+     * Returns a new buffer holding a copy of size bytes at the given
+     * address, so bindings can fill a buffer from memory they own with
+     * a single copy. The memory has to stay alive during the call.
+     */
+    public GLib.Bytes copy_buffer(uintptr address, size_t size) {
+        unowned uint8[] data = (uint8[])(void*)address;
+        data.length = (int)size;
+        return new GLib.Bytes(data);
+    }
+
+    /**
+     * A Source that provides an array of numbers held in a {@link GLib.Bytes}
+     *
+     * The buffer is never copied on its way to the sinks: every connected
+     * sink holds a reference to the very same buffer. As {@link GLib.Bytes}
+     * is immutable, set a new buffer instead of changing the current one.
+     */
+    public class BufferSource : Source {
+        /**
+         * The type of the elements in the buffer
+         */
+        public ElementType element_type {get; private set;}
+
+        /**
+         * The current buffer
+         */
+        public GLib.Bytes buffer {
+            get {
+                return (GLib.Bytes) this.val.get_boxed();
+            }
+        }
+
+        /**
+         * The number of elements in the current buffer
+         */
+        public size_t n_elements {
+            get {
+                return this.buffer.get_size() / this.element_type.get_size();
+            }
+        }
+
+        public BufferSource(ElementType element_type) {
+            GLib.Value initial = GLib.Value(typeof(GLib.Bytes));
+            initial.set_boxed(new GLib.Bytes(null));
+            base(initial);
+            this.element_type = element_type;
+            this.typestring = element_type.get_type_name();
+        }
+
+        /**
+         * Sets a new buffer and passes it on to the connected sinks
+         */
+        public void set_buffer(GLib.Bytes buffer) throws NodeError {
+            if (buffer.get_size() % this.element_type.get_size() != 0)
+                throw new NodeError.INCOMPATIBLE_VALUE(
+                    "A buffer of %s bytes does not hold %s elements".printf(
+                        buffer.get_size().to_string(), this.element_type.get_type_name())
+                );
+            GLib.Value v = GLib.Value(typeof(GLib.Bytes));
+            v.set_boxed(buffer);
+            this.set_value(v);
+        }
+
+        public override void add_sink(Sink s) throws NodeError {
+            if (s is BufferSink && ((BufferSink) s).element_type != this.element_type)
+                throw new NodeError.INCOMPATIBLE_SINKTYPE(
+                    "Can't connect. Sink holds %s while Source holds %s".printf(
+                        ((BufferSink) s).element_type.get_type_name(),
+                        this.element_type.get_type_name()
+                    )
+                );
+            base.add_sink(s);
+        }
+    }
+
+    /**
+     * A Sink that receives the buffer of a {@link BufferSource}
+     * with the same element type
+     */
+    public class BufferSink : Sink {
+        /**
+         * The type of the elements in the buffer
+         */
+        public ElementType element_type {get; private set;}
+
+        /**
+         * The buffer received last
+         */
+        public GLib.Bytes buffer {
+            get {
+                return (GLib.Bytes) this.val.get_boxed();
+            }
+        }
+
+        /**
+         * The number of elements in the buffer received last
+         */
+        public size_t n_elements {
+            get {
+                return this.buffer.get_size() / this.element_type.get_size();
+            }
+        }
+
+        public BufferSink(ElementType element_type) {
+            GLib.Value initial = GLib.Value(typeof(GLib.Bytes));
+            initial.set_boxed(new GLib.Bytes(null));
+            base(initial);
+            this.element_type = element_type;
+            this.typestring = element_type.get_type_name();
+        }
+
+        public override void set_source(Source s) throws NodeError {
+            if (s is BufferSource && ((BufferSource) s).element_type != this.element_type)
+                throw new NodeError.INCOMPATIBLE_SOURCETYPE(
+                    "Can't connect. Source holds %s while Sink holds %s".printf(
+                        ((BufferSource) s).element_type.get_type_name(),
+                        this.element_type.get_type_name()
+                    )
+                );
+            base.set_source(s);
+        }
+    }
+}
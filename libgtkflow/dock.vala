@@ -82,10 +82,7 @@ namespace GtkFlow {
         public abstract void invalidate();
 
         protected string determine_typestring() {
-            GLib.TypeQuery tq;
-            this.val.get_gtype().query(out tq);
-            string s = this.val.type_name();
-            return s;
+            return this.val.type_name();
         }
 
         /**
@@ -100,7 +97,10 @@ namespace GtkFlow {
          */
         public virtual void set_label (string label) {
             this.label = label;
-            this.update_layout();
+            if (this.node != null && this.node.frozen)
+                this.node.defer_dock_layout();
+            else
+                this.update_layout();
             if (this.node != null)
                 this.node.queue_draw();
         }
@@ -110,7 +110,7 @@ namespace GtkFlow {
          * same type
          */
         public bool has_same_type(Dock other) {
-            return this.val.type_name() == other.val.type_name();
+            return this.val.type() == other.val.type();
         }
 
         /**
@@ -120,6 +120,13 @@ namespace GtkFlow {
             return this.label;
         }
 
+        /**
+         * Returns the initial value of this dock
+         */
+        public GLib.Value get_initial() {
+            return this.initial;
+        }
+
         /**
          * Initialize this with a value
          */
@@ -162,6 +169,31 @@ namespace GtkFlow {
             return this.node;
         }
 
+        /**
+         * Tells the NodeView this dock is shown in that the connectors
+         * of its node have to be measured again
+         */
+        internal void invalidate_connectors() {
+            if (this.node == null)
+                return;
+            NodeView? nv = this.node.get_node_view();
+            if (nv != null)
+                nv.invalidate_connectors(this.node);
+        }
+
+        /**
+         * Returns the profiler of the NodeView this dock is shown in,
+         * or null if that view is not profiling
+         */
+        internal Profiler? get_profiler() {
+            if (this.node == null)
+                return null;
+            NodeView? nv = this.node.get_node_view();
+            if (nv == null || !nv.profiling)
+                return null;
+            return nv.profiler;
+        }
+
         /**
          * Get the minimum width for this dock
          */
@@ -0,0 +1,114 @@
+/********************************************************************
+# Copyright 2014 Daniel 'grindhold' Brendle
+#
+# This file is part of libgtkflow.
+#
+# libgtkflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+namespace GtkFlow {
+    /**
+     * Holds icons that are drawn onto nodes as ready-to-paint cairo surfaces
+     *
+     * Surfaces are keyed by icon name, size and scale factor and stay valid
+     * until the icon theme or the scale factor changes. Every
+     * {@link NodeView} keeps one for the icons of its nodes.
+     */
+    public class IconCache : Object {
+        private HashTable<string, Cairo.Surface?> surfaces
+            = new HashTable<string, Cairo.Surface?>(str_hash, str_equal);
+        private ulong theme_changed_handler = 0;
+
+        private Gtk.IconTheme? _icon_theme = null;
+        /**
+         * The theme icons are loaded from
+         */
+        public Gtk.IconTheme? icon_theme {
+            get {
+                return this._icon_theme;
+            }
+            set {
+                if (this._icon_theme == value)
+                    return;
+                if (this._icon_theme != null)
+                    SignalHandler.disconnect(this._icon_theme, this.theme_changed_handler);
+                this._icon_theme = value;
+                if (this._icon_theme != null)
+                    this.theme_changed_handler = this._icon_theme.changed.connect(
+                        this.invalidate
+                    );
+                this.invalidate();
+            }
+        }
+
+        private int _scale = 1;
+        /**
+         * The scale factor of the window icons are drawn onto
+         */
+        public int scale {
+            get {
+                return this._scale;
+            }
+            set {
+                if (this._scale == value)
+                    return;
+                this._scale = value;
+                this.invalidate();
+            }
+        }
+
+        /**
+         * Triggered when all cached icons have been dropped, so anything
+         * that has been rendered with them should be redrawn
+         */
+        public signal void invalidated();
+
+        ~IconCache() {
+            if (this._icon_theme != null)
+                SignalHandler.disconnect(this._icon_theme, this.theme_changed_handler);
+        }
+
+        /**
+         * Returns the icon with the given name and size in user space units
+         * or null if the icon theme does not provide it. Icons that failed
+         * to load are remembered, so they are not looked up again.
+         */
+        public Cairo.Surface? get_surface(string name, int size, Gdk.Window? window) {
+            string key = "%s@%d@%d".printf(name, size, this._scale);
+            if (this.surfaces.contains(key))
+                return this.surfaces.lookup(key);
+            Cairo.Surface? surface = null;
+            Gtk.IconTheme it = this._icon_theme ?? Gtk.IconTheme.get_default();
+            try {
+                Gdk.Pixbuf? pix = it.load_icon_for_scale(name, size, this._scale, 0);
+                if (pix != null)
+                    surface = Gdk.cairo_surface_create_from_pixbuf(pix, this._scale, window);
+            } catch (GLib.Error e) {
+                warning("Could not load icon '%s': %s", name, e.message);
+            }
+            this.surfaces.insert(key, surface);
+            return surface;
+        }
+
+        /**
+         * Drops all cached icons
+         */
+        public void invalidate() {
+            this.surfaces.remove_all();
+            this.invalidated();
+        }
+    }
+}
@@ -0,0 +1,184 @@
+/********************************************************************
+# Copyright 2014 Daniel 'grindhold' Brendle
+#
+# This file is part of libgtkflow.
+#
+# libgtkflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+namespace GtkFlow {
+    /**
+     * A small overview of a whole {@link NodeView}
+     *
+     * Draws all nodes of the view scaled down to fit, the same cheap way
+     * the view itself draws them below {@link NodeView.detail_zoom}, and
+     * marks the part that is currently visible in the view. Clicking or
+     * dragging scrolls the view to the pointed at location.
+     */
+    public class Minimap : Gtk.DrawingArea {
+        // Space between the border of the widget and the overview
+        private const int PADDING = 4;
+        // Shortest time in milliseconds between two redraws
+        private const uint REDRAW_INTERVAL = 50;
+
+        private ulong draw_handler = 0;
+        private ulong destroy_handler = 0;
+        private uint redraw_id = 0;
+        private double scale = 1.0;
+        private double offset_x = 0;
+        private double offset_y = 0;
+
+        // The view does not own the minimap, so neither may the minimap
+        // own the view. It lets go of it when the view is destroyed.
+        private weak NodeView? _nodeview = null;
+        /**
+         * The view this minimap gives an overview of
+         */
+        public NodeView? nodeview {
+            get {
+                return this._nodeview;
+            }
+            set {
+                if (this._nodeview == value)
+                    return;
+                if (this._nodeview != null) {
+                    SignalHandler.disconnect(this._nodeview, this.draw_handler);
+                    SignalHandler.disconnect(this._nodeview, this.destroy_handler);
+                    this.draw_handler = 0;
+                    this.destroy_handler = 0;
+                }
+                this._nodeview = value;
+                // Whatever changes the view also changes the overview
+                if (this._nodeview != null) {
+                    this.draw_handler = this._nodeview.draw.connect(() => {
+                        this.schedule_redraw();
+                        return false;
+                    });
+                    this.destroy_handler = this._nodeview.destroy.connect(() => {
+                        this.nodeview = null;
+                    });
+                }
+                this.queue_draw();
+            }
+        }
+
+        public Minimap(NodeView? nodeview = null) {
+            Object();
+            this.set_size_request(200, 150);
+            this.add_events(Gdk.EventMask.BUTTON_PRESS_MASK
+                          | Gdk.EventMask.BUTTON_MOTION_MASK);
+            this.nodeview = nodeview;
+        }
+
+        public override void dispose() {
+            this.nodeview = null;
+            if (this.redraw_id != 0) {
+                GLib.Source.remove(this.redraw_id);
+                this.redraw_id = 0;
+            }
+            base.dispose();
+        }
+
+        /**
+         * Redraws the overview at most every {@link REDRAW_INTERVAL}
+         * milliseconds instead of with every frame of the view
+         */
+        private void schedule_redraw() {
+            if (this.redraw_id != 0)
+                return;
+            this.redraw_id = GLib.Timeout.add(Minimap.REDRAW_INTERVAL, () => {
+                this.redraw_id = 0;
+                this.queue_draw();
+                return false;
+            });
+        }
+
+        /**
+         * Fits the area spanned by the nodes and the visible part of
+         * the view into this widget
+         */
+        private void update_transform() {
+            NodeView nv = this._nodeview;
+            double view_w = nv.get_allocated_width() / nv.zoom;
+            double view_h = nv.get_allocated_height() / nv.zoom;
+            double x0 = Math.fmin(nv.hadjustment.lower, nv.hadjustment.value);
+            double y0 = Math.fmin(nv.vadjustment.lower, nv.vadjustment.value);
+            double x1 = Math.fmax(nv.hadjustment.upper, nv.hadjustment.value + view_w);
+            double y1 = Math.fmax(nv.vadjustment.upper, nv.vadjustment.value + view_h);
+            double w = this.get_allocated_width() - 2 * Minimap.PADDING;
+            double h = this.get_allocated_height() - 2 * Minimap.PADDING;
+            this.scale = Math.fmin(w / Math.fmax(x1 - x0, 1), h / Math.fmax(y1 - y0, 1));
+            this.offset_x = Minimap.PADDING - x0 * this.scale;
+            this.offset_y = Minimap.PADDING - y0 * this.scale;
+        }
+
+        public override bool draw(Cairo.Context cr) {
+            Gtk.StyleContext sc = this.get_style_context();
+            sc.render_background(cr, 0, 0, this.get_allocated_width(),
+                                 this.get_allocated_height());
+            if (this._nodeview == null)
+                return true;
+            NodeView nv = this._nodeview;
+            this.update_transform();
+
+            cr.save();
+            cr.translate(this.offset_x, this.offset_y);
+            cr.scale(this.scale, this.scale);
+            nv.draw_outlines(cr, int.MIN / 2, int.MIN / 2, int.MAX, int.MAX);
+            cr.restore();
+
+            // Mark the visible part of the view
+            Gdk.RGBA fg = sc.get_color(Gtk.StateFlags.NORMAL);
+            cr.set_source_rgba(fg.red, fg.green, fg.blue, fg.alpha);
+            cr.set_line_width(2);
+            cr.rectangle(this.offset_x + nv.hadjustment.value * this.scale,
+                         this.offset_y + nv.vadjustment.value * this.scale,
+                         nv.get_allocated_width() / nv.zoom * this.scale,
+                         nv.get_allocated_height() / nv.zoom * this.scale);
+            cr.stroke();
+            return true;
+        }
+
+        /**
+         * Scrolls the view so that the given point of this widget
+         * ends up in its center
+         */
+        private void scroll_to(double x, double y) {
+            if (this._nodeview == null)
+                return;
+            NodeView nv = this._nodeview;
+            this.update_transform();
+            nv.hadjustment.value = (x - this.offset_x) / this.scale
+                                 - nv.get_allocated_width() / nv.zoom / 2;
+            nv.vadjustment.value = (y - this.offset_y) / this.scale
+                                 - nv.get_allocated_height() / nv.zoom / 2;
+        }
+
+        public override bool button_press_event(Gdk.EventButton e) {
+            if (e.button != Gdk.BUTTON_PRIMARY)
+                return false;
+            this.scroll_to(e.x, e.y);
+            return true;
+        }
+
+        public override bool motion_notify_event(Gdk.EventMotion e) {
+            if ((e.state & Gdk.ModifierType.BUTTON1_MASK) == 0)
+                return false;
+            this.scroll_to(e.x, e.y);
+            return true;
+        }
+    }
+}
@@ -62,7 +62,12 @@ namespace GtkFlow {
          * Throw when the user tries to remove a dock from a node
          * that hasn't yet been added to the node
          */
-        NO_SUCH_DOCK
+        NO_SUCH_DOCK,
+        /**
+         * Throw when the user tries to establish a connection
+         * that would lead to a recursion
+         */
+        RECURSIVE_CONNECTION
     }
 
     public interface INode : GLib.Object {
@@ -79,6 +84,7 @@ namespace GtkFlow {
         public abstract void set_node_view(NodeView? n);
         public abstract void set_position(int x, int y);
         public abstract unowned List<Source> get_sources();
+        public abstract unowned List<Sink> get_sinks();
         public abstract Gdk.Point get_dock_position(Dock d) throws NodeError;
     }
 
@@ -93,12 +99,48 @@ namespace GtkFlow {
         private const int TITLE_SPACING = 15;
         private const int DELETE_BTN_SIZE = 16;
         private const int RESIZE_HANDLE_SIZE = 10;
-        private List<Source> sources = new List<Source>();
-        private List<Sink> sinks = new List<Sink>();
+        private DockList<Source> sources = new DockList<Source>();
+        private DockList<Sink> sinks = new DockList<Sink>();
+
+        // Position of this node in the topological order of all nodes as
+        // described by Pearce and Kelly: every connection leads from a node
+        // with a lower to a node with a higher order. It is updated in
+        // add_edge () and stays valid when connections are removed.
+        private static int next_order = 0;
+        private int order;
 
         private NodeView? node_view = null;
 
+        // Geometry of the title and the docks, built lazily by
+        // ensure_geometry () and dropped by invalidate_geometry ()
+        private bool geometry_valid = false;
+        // The docks in the order they are drawn (sinks first) along with the
+        // offset of each of them below the title line
+        private GenericArray<Dock> dock_rows = new GenericArray<Dock>();
+        private int[] dock_row_offsets = {0};
+        private HashTable<Dock, int> dock_row_index
+            = new HashTable<Dock, int>(direct_hash, direct_equal);
+        private int title_line_height = 0;
+        // Width needed by the title line and the widest dock
+        private int content_min_width = 0;
+
+        // Rendering of this node without its child widget, see draw_node ()
+        private Cairo.Surface? render_cache = null;
+        // The zoom factor of the view the cached rendering was made for
+        private double render_cache_zoom = 1.0;
+
         private Gtk.Allocation node_allocation;
+        // Set when recalculate_size () was called while the node was frozen
+        private bool layout_pending = false;
+        // Set when docks have to be laid out again once the node is thawed
+        private bool dock_layout_pending = false;
+        // Set while flush_layout () lays out all docks at once
+        private bool relayouting = false;
+        // Calls to freeze () without a matching thaw ()
+        private uint freeze_count = 0;
+        // Sources holding back values until this node is thawed
+        private HashTable<Source, Source> deferred_sources
+            = new HashTable<Source, Source>(direct_hash, direct_equal);
 
         private string title = "";
         private Pango.Layout layout;
@@ -106,17 +148,55 @@ namespace GtkFlow {
         public bool show_types {get; set; default=false;}
 
         public Node () {
+            Object();
+        }
+
+        construct {
+            this.order = Node.next_order++;
             this.node_allocation = {0,0,0,0};
             this.set_border_width(RESIZE_HANDLE_SIZE);
             this.recalculate_size();
+            this.notify["show-types"].connect(this.show_types_changed);
+        }
+
+        private void show_types_changed() {
+            if (this.frozen) {
+                this.dock_layout_pending = true;
+            } else {
+                foreach (Dock d in this.sinks.head)
+                    d.update_layout();
+                foreach (Dock d in this.sources.head)
+                    d.update_layout();
+            }
+            this.invalidate_geometry();
+            this.recalculate_size();
+            if (this.node_view != null)
+                this.node_view.request_redraw();
+        }
+
+        /**
+         * Returns the title of this node
+         */
+        public string get_title() {
+            return this.title;
+        }
+
+        /**
+         * Returns the position of this node in the topological order
+         * of all nodes, see {@link add_edge}
+         */
+        internal int get_order() {
+            return this.order;
         }
 
         public void set_title(string title) {
             this.title = title;
             this.layout = this.create_pango_layout("");
             this.layout.set_markup("<b>%s</b>".printf(this.title),-1);
+            this.invalidate_geometry();
             this.recalculate_size();
-            this.node_view.queue_draw();
+            if (this.node_view != null)
+                this.node_view.request_redraw();
         }
 
         public void set_node_allocation(Gtk.Allocation alloc) {
@@ -124,13 +204,21 @@ namespace GtkFlow {
                 alloc.width = (int)this.get_min_width();
             if (alloc.height < (int)this.get_min_height())
                 alloc.height = (int)this.get_min_height();
+            if (alloc.width != this.node_allocation.width
+                    || alloc.height != this.node_allocation.height)
+                this.invalidate_render_cache();
             this.node_allocation = alloc;
+            if (this.node_view != null)
+                this.node_view.node_allocation_changed(this);
         }
 
         public void set_position(int x, int y) {
             this.node_allocation.x = x;
             this.node_allocation.y = y;
-            this.node_view.queue_draw();
+            if (this.node_view != null) {
+                this.node_view.node_allocation_changed(this);
+                this.node_view.request_redraw();
+            }
         }
 
         public void get_node_allocation(out Gtk.Allocation alloc) {
@@ -144,61 +232,103 @@ namespace GtkFlow {
         public override void add(Gtk.Widget w) {
             w.set_parent(this);
             base.add(w);
+            this.invalidate_render_cache();
         }
 
         public override void remove(Gtk.Widget w) {
             w.unparent();
             base.remove(w);
+            this.invalidate_render_cache();
         }
 
         public void add_source(Source s) throws NodeError {
             if (s.get_node() != null)
                 throw new NodeError.DOCK_ALREADY_BOUND_TO_NODE("This Source is already bound");
-            if (this.sources.index(s) != -1)
+            if (this.sources.contains(s))
                 throw new NodeError.ALREADY_HAS_DOCK("This node already has this source");
             sources.append(s);
             s.set_node(this);
-            s.update_layout();
+            try {
+                foreach (Sink snk in s.get_sinks())
+                    if (snk.get_node() != null)
+                        Node.add_edge(this, snk.get_node());
+            } catch (NodeError e) {
+                sources.remove(s);
+                s.set_node(null);
+                throw e;
+            }
+            if (this.frozen)
+                this.dock_layout_pending = true;
+            else
+                s.update_layout();
+            this.invalidate_geometry();
             this.recalculate_size();
-            s.size_changed.connect(this.recalculate_size);
+            s.size_changed.connect(this.dock_size_changed);
+            s.notify.connect(this.dock_notify);
+            s.connected.connect(this.dock_connection_changed);
+            s.disconnected.connect(this.dock_connection_changed);
         }
 
         public void add_sink(Sink s) throws NodeError {
             if (s.get_node() != null)
                 throw new NodeError.DOCK_ALREADY_BOUND_TO_NODE("This Sink is already bound" );
-            if (this.sinks.index(s) != -1)
+            if (this.sinks.contains(s))
                 throw new NodeError.ALREADY_HAS_DOCK("This node already has this sink");
             sinks.append(s);
             s.set_node(this);
-            s.update_layout();
+            if (s.source != null && s.source.get_node() != null) {
+                try {
+                    Node.add_edge(s.source.get_node(), this);
+                } catch (NodeError e) {
+                    sinks.remove(s);
+                    s.set_node(null);
+                    throw e;
+                }
+            }
+            if (this.frozen)
+                this.dock_layout_pending = true;
+            else
+                s.update_layout();
+            this.invalidate_geometry();
             this.recalculate_size();
-            s.size_changed.connect(this.recalculate_size);
+            s.size_changed.connect(this.dock_size_changed);
+            s.notify.connect(this.dock_notify);
+            s.connected.connect(this.dock_connection_changed);
+            s.disconnected.connect(this.dock_connection_changed);
         }
 
         public void remove_source(Source s) throws NodeError {
-            if (this.sources.index(s) == -1)
+            if (!this.sources.contains(s))
                 throw new NodeError.NO_SUCH_DOCK("This node doesn't have this source");
             sources.remove(s);
             s.set_node(null);
+            this.invalidate_geometry();
             this.recalculate_size();
-            s.size_changed.disconnect(this.recalculate_size);
+            s.size_changed.disconnect(this.dock_size_changed);
+            s.notify.disconnect(this.dock_notify);
+            s.connected.disconnect(this.dock_connection_changed);
+            s.disconnected.disconnect(this.dock_connection_changed);
         }
 
         public void remove_sink(Sink s) throws NodeError {
-            if (this.sinks.index(s) == -1)
+            if (!this.sinks.contains(s))
                 throw new NodeError.NO_SUCH_DOCK("This node doesn't have this sink");
             sinks.remove(s);
             s.set_node(null);
+            this.invalidate_geometry();
             this.recalculate_size();
-            s.size_changed.disconnect(this.recalculate_size);
+            s.size_changed.disconnect(this.dock_size_changed);
+            s.notify.disconnect(this.dock_notify);
+            s.connected.disconnect(this.dock_connection_changed);
+            s.disconnected.disconnect(this.dock_connection_changed);
         }
 
         public bool has_sink(Sink s) {
-            return this.sinks.index(s) != -1;
+            return this.sinks.contains(s);
         }
 
         public bool has_source(Source s) {
-            return this.sources.index(s) != -1;
+            return this.sources.contains(s);
         }
 
         public bool has_dock(Dock d) {
@@ -212,7 +342,14 @@ namespace GtkFlow {
          * Returns the sources of this node
          */
         public unowned List<Source> get_sources() {
-            return this.sources;
+            return this.sources.head;
+        }
+
+        /**
+         * Returns the sinks of this node
+         */
+        public unowned List<Sink> get_sinks() {
+            return this.sinks.head;
         }
 
         public new void set_border_width(uint border_width) {
@@ -221,28 +358,139 @@ namespace GtkFlow {
                 return;
             }
             base.set_border_width(border_width);
+            this.invalidate_geometry();
             this.recalculate_size();
-            this.node_view.queue_draw();
+            if (this.node_view != null)
+                this.node_view.request_redraw();
         }
 
         public void set_node_view(NodeView? n) {
             this.node_view = n;
+            // Catch up on what has been held back while the old view was frozen
+            if (!this.frozen) {
+                this.flush_layout();
+                this.flush_values();
+            }
+        }
+
+        internal unowned NodeView? get_node_view() {
+            return this.node_view;
         }
 
         /**
          * This method checks whether a connection from the given from-Node
          * to this Node would lead to a recursion
+         *
+         * Whenever the from-Node comes first in the topological order this
+         * is answered in constant time, otherwise only the nodes between
+         * both of them in the order are visited. Unless initial is true,
+         * a node also counts as recursive with itself.
          */
-        public bool is_recursive(Node from, bool initial=true) {
+        public bool is_recursive(Node from, bool initial=false) {
             if (!initial && this == from)
                 return true;
-            foreach (Source source in this.get_sources()) {
-                foreach (Sink sink in source.get_sinks()) {
-                    if (sink.get_node().is_recursive(from, false))
-                        return true;
+            if (this == from || this.order >= from.order)
+                return false;
+            var visited = new HashTable<Node, Node>(direct_hash, direct_equal);
+            return !Node.collect_forward(this, from.order, from, new GenericArray<Node>(), visited);
+        }
+
+        /**
+         * Updates the topological order for a new connection leading
+         * from one node to another one.
+         */
+        internal static void add_edge(Node from, Node to) throws NodeError {
+            if (from == to)
+                throw new NodeError.RECURSIVE_CONNECTION("Can't connect a node to itself");
+            int lower = to.order;
+            int upper = from.order;
+            if (upper < lower)
+                return;
+            var visited = new HashTable<Node, Node>(direct_hash, direct_equal);
+            var forward = new GenericArray<Node>();
+            if (!Node.collect_forward(to, upper, from, forward, visited))
+                throw new NodeError.RECURSIVE_CONNECTION("This connection would lead to a recursion");
+            var backward = new GenericArray<Node>();
+            Node.collect_backward(from, lower, backward, visited);
+            Node.reorder(backward, forward);
+        }
+
+        /**
+         * Collects the nodes reachable from start whose order is lower than
+         * upper. Returns false as soon as target is found.
+         */
+        private static bool collect_forward(Node start, int upper, Node target,
+                                            GenericArray<Node> result, HashTable<Node, Node> visited) {
+            var stack = new GenericArray<Node>();
+            stack.add(start);
+            visited.add(start);
+            while (stack.length > 0) {
+                Node n = stack[stack.length - 1];
+                stack.remove_index(stack.length - 1);
+                result.add(n);
+                foreach (Source s in n.sources.head) {
+                    foreach (Sink snk in s.get_sinks()) {
+                        Node? m = snk.get_node();
+                        if (m == null)
+                            continue;
+                        if (m == target)
+                            return false;
+                        if (!visited.contains(m) && m.order < upper) {
+                            visited.add(m);
+                            stack.add(m);
+                        }
+                    }
+                }
+            }
+            return true;
+        }
+
+        /**
+         * Collects the nodes that reach start whose order is higher than lower
+         */
+        private static void collect_backward(Node start, int lower,
+                                             GenericArray<Node> result, HashTable<Node, Node> visited) {
+            var stack = new GenericArray<Node>();
+            stack.add(start);
+            visited.add(start);
+            while (stack.length > 0) {
+                Node n = stack[stack.length - 1];
+                stack.remove_index(stack.length - 1);
+                result.add(n);
+                foreach (Sink snk in n.sinks.head) {
+                    if (snk.source == null)
+                        continue;
+                    Node? m = snk.source.get_node();
+                    if (m != null && !visited.contains(m) && m.order > lower) {
+                        visited.add(m);
+                        stack.add(m);
+                    }
                 }
             }
-            return false;
+        }
+
+        /**
+         * Moves the backward nodes in front of the forward nodes reusing
+         * the positions they occupied so far.
+         */
+        private static void reorder(GenericArray<Node> backward, GenericArray<Node> forward) {
+            backward.sort((a, b) => { return a.order - b.order; });
+            forward.sort((a, b) => { return a.order - b.order; });
+            // Both lists are sorted, merge their positions
+            int[] pool = new int[backward.length + forward.length];
+            int i = 0, j = 0;
+            for (int k = 0; k < pool.length; k++) {
+                if (j >= forward.length || (i < backward.length
+                        && backward[i].order < forward[j].order))
+                    pool[k] = backward[i++].order;
+                else
+                    pool[k] = forward[j++].order;
+            }
+            int p = 0;
+            for (i = 0; i < backward.length; i++)
+                backward[i].order = pool[p++];
+            for (j = 0; j < forward.length; j++)
+                forward[j].order = pool[p++];
         }
 
         /**
@@ -254,36 +502,85 @@ namespace GtkFlow {
          * TODO: find better solution
          */
         public Gdk.Point get_dock_position(Dock d) throws NodeError {
-            int i = 0;
-            Gdk.Point p = {0,0};
+            this.ensure_geometry();
+            int i;
+            if (!this.dock_row_index.lookup_extended(d, null, out i))
+                throw new NodeError.NO_SUCH_DOCK("There is no such dock in this node");
 
+            Gdk.Point p = {0,0};
             if (this.node_view != null) {
                 p.x -= (int)this.node_view.hadjustment.get_value();
                 p.y -= (int)this.node_view.vadjustment.get_value();
             }
 
-            uint title_offset = this.get_title_line_height();
+            if (d is Sink)
+                p.x += (int)(this.node_allocation.x + this.border_width + Dock.HEIGHT/2);
+            else
+                p.x += (int)(this.node_allocation.x - this.border_width
+                          + this.node_allocation.width - Dock.HEIGHT/2);
+            p.y += (int)(this.node_allocation.y + this.border_width + this.title_line_height
+                      + Dock.HEIGHT/2 + this.dock_row_offsets[i]);
+            return p;
+        }
 
-            foreach (Dock s in this.sinks) {
-                if (s == d) {
-                    p.x += (int)(this.node_allocation.x + this.border_width + Dock.HEIGHT/2);
-                    p.y += (int)(this.node_allocation.y + this.border_width + title_offset
-                              + Dock.HEIGHT/2 + i * s.get_min_height());
-                    return p;
-                }
-                i++;
+        private void dock_size_changed() {
+            this.invalidate_geometry();
+            this.recalculate_size();
+        }
+
+        private void dock_notify(Object o, ParamSpec p) {
+            if (p.name == "highlight" || p.name == "pressed")
+                this.invalidate_render_cache();
+        }
+
+        private void dock_connection_changed(Dock d) {
+            // Connected docks are drawn checked
+            this.invalidate_render_cache();
+        }
+
+        /**
+         * Drops the cached geometry and rendering of this node
+         */
+        private void invalidate_geometry() {
+            this.geometry_valid = false;
+            this.invalidate_render_cache();
+            if (this.node_view != null)
+                this.node_view.invalidate_connectors(this);
+        }
+
+        private void ensure_geometry() {
+            if (this.geometry_valid)
+                return;
+            int width = 0;
+            int height = 0;
+            if (this.title != "")
+                this.layout.get_pixel_size(out width, out height);
+            this.title_line_height = (int)Math.fmax(height, DELETE_BTN_SIZE) + Node.TITLE_SPACING;
+            this.content_min_width = this.title != "" ? width + TITLE_SPACING + DELETE_BTN_SIZE : 0;
+
+            this.dock_rows = new GenericArray<Dock>();
+            this.dock_row_index.remove_all();
+            this.dock_row_offsets = new int[this.sinks.length + this.sources.length + 1];
+            int i = 0;
+            int offset = 0;
+            foreach (Dock d in this.sinks.head) {
+                this.add_dock_row(d, i++, ref offset);
             }
-            foreach (Dock s in this.sources) {
-                if (s == d) {
-                    p.x += (int)(this.node_allocation.x - this.border_width
-                              + this.node_allocation.width - Dock.HEIGHT/2);
-                    p.y += (int)(this.node_allocation.y + this.border_width + title_offset
-                              + Dock.HEIGHT/2 + i * s.get_min_height());
-                    return p;
-                }
-                i++;
+            foreach (Dock d in this.sources.head) {
+                this.add_dock_row(d, i++, ref offset);
             }
-            throw new NodeError.NO_SUCH_DOCK("There is no such dock in this node");
+            this.dock_row_offsets[i] = offset;
+            this.geometry_valid = true;
+        }
+
+        private void add_dock_row(Dock d, int i, ref int offset) {
+            this.dock_rows.add(d);
+            this.dock_row_index.insert(d, i);
+            this.dock_row_offsets[i] = offset;
+            offset += d.get_min_height();
+            int w = d.get_min_width();
+            if (w > this.content_min_width)
+                this.content_min_width = w;
         }
 
         /**
@@ -291,6 +588,11 @@ namespace GtkFlow {
          * size requirements
          */
         public void recalculate_size() {
+            if (this.frozen || this.relayouting) {
+                this.layout_pending = true;
+                return;
+            }
+            this.layout_pending = false;
             Gtk.Allocation alloc;
             this.get_node_allocation(out alloc);
             uint mw = this.get_min_width();
@@ -303,47 +605,120 @@ namespace GtkFlow {
         }
 
         /**
-         * Returns the minimum height this node has to have
+         * True while this node or its {@link NodeView} is frozen
          */
-        public uint get_min_height() {
-            uint mw = this.border_width*2;
-            mw += this.get_title_line_height();
-            foreach (Dock d in this.sinks) {
-                mw += d.get_min_height();
+        public bool frozen {
+            get {
+                return this.freeze_count > 0
+                       || (this.node_view != null && this.node_view.frozen);
+            }
+        }
+
+        /**
+         * Stops this node from laying out its docks, from resizing itself
+         * and from passing values on to its sinks and from its sources until
+         * {@link thaw} is called. Use this when adding many docks or
+         * connections to a node that is not part of a {@link NodeView} yet.
+         * Calls can be nested.
+         *
+         * Signals such as {@link Dock.connected} are still emitted right away.
+         */
+        public void freeze() {
+            this.freeze_count++;
+        }
+
+        /**
+         * Ends a bulk update started by {@link freeze}. Once neither this
+         * node nor its view are frozen anymore, the docks are laid out, the
+         * node is resized and the latest values held back are passed on.
+         */
+        public void thaw() {
+            if (this.freeze_count == 0) {
+                warning("Node.thaw() called without matching freeze()");
+                return;
+            }
+            if (--this.freeze_count > 0 || this.frozen)
+                return;
+            this.flush_layout();
+            this.flush_values();
+        }
+
+        /**
+         * Catches up on the layout deferred while the node was frozen
+         */
+        internal void flush_layout() {
+            if (this.dock_layout_pending) {
+                this.dock_layout_pending = false;
+                // Every dock reports its new size, resize only once afterwards
+                this.relayouting = true;
+                foreach (Dock d in this.sinks.head)
+                    d.update_layout();
+                foreach (Dock d in this.sources.head)
+                    d.update_layout();
+                this.relayouting = false;
+                this.invalidate_geometry();
+                this.layout_pending = true;
             }
-            foreach (Dock d in this.sources) {
-                mw += d.get_min_height();
+            if (this.layout_pending)
+                this.recalculate_size();
+        }
+
+        /**
+         * Has to be called by docks whose label changed
+         * while the node was frozen
+         */
+        internal void defer_dock_layout() {
+            this.dock_layout_pending = true;
+        }
+
+        /**
+         * Has to be called by sources that hold back a value for
+         * this node while it is frozen
+         */
+        internal void defer_source(Source s) {
+            this.deferred_sources.add(s);
+        }
+
+        /**
+         * Passes on the values held back while the node was frozen
+         */
+        internal void flush_values() {
+            if (this.deferred_sources.size() == 0)
+                return;
+            HashTable<Source, Source> sources = this.deferred_sources;
+            this.deferred_sources = new HashTable<Source, Source>(direct_hash, direct_equal);
+            foreach (unowned Source s in sources.get_keys()) {
+                try {
+                    s.flush_deferred();
+                } catch (NodeError e) {
+                    warning("Could not pass on value: %s", e.message);
+                }
             }
+        }
+
+        /**
+         * Returns the minimum height this node has to have
+         */
+        public uint get_min_height() {
+            this.ensure_geometry();
+            uint mh = this.border_width*2;
+            mh += this.title_line_height;
+            mh += this.dock_row_offsets[this.dock_rows.length];
             Gtk.Widget child = this.get_child();
             if (child != null) {
                 int child_height, _;
                 child.get_preferred_height(out child_height, out _);
-                mw += child_height;
+                mh += child_height;
             }
-            return mw;
+            return mh;
         }
 
         /**
          * Returns the minimum width this node has to have
          */
         public uint get_min_width() {
-            uint mw = 0;
-            int t = 0;
-            if (this.title != "") {
-                int width, height;
-                this.layout.get_pixel_size(out width, out height);
-                mw = width + TITLE_SPACING + DELETE_BTN_SIZE;
-            }
-            foreach (Dock d in this.sinks) {
-                t = d.get_min_width();
-                if (t > mw)
-                    mw = t;
-            }
-            foreach (Dock d in this.sources) {
-                t = d.get_min_width();
-                if (t > mw)
-                    mw = t;
-            }
+            this.ensure_geometry();
+            uint mw = this.content_min_width;
             Gtk.Widget child = this.get_child();
             if (child != null) {
                 int child_width, _;
@@ -355,13 +730,8 @@ namespace GtkFlow {
         }
 
         private uint get_title_line_height() {
-            int width, height;
-            if (this.title == "") {
-                 width = height = 0;
-            } else {
-                this.layout.get_pixel_size(out width, out height);
-            }
-            return (uint)Math.fmax(height, DELETE_BTN_SIZE) + Node.TITLE_SPACING;
+            this.ensure_geometry();
+            return this.title_line_height;
         }
 
         /**
@@ -374,30 +744,38 @@ namespace GtkFlow {
             double scroll_x = this.node_view != null ? this.node_view.hadjustment.value : 0;
             double scroll_y = this.node_view != null ? this.node_view.vadjustment.value : 0;
 
-            int i = 0;
+            this.ensure_geometry();
+            if (this.dock_rows.length == 0)
+                return null;
+
+            int rows_top = this.node_allocation.y + (int)this.border_width
+                           + (int)this.get_title_line_height() - (int)scroll_y;
+            int rel_y = y - rows_top;
+            if (rel_y <= 0 || rel_y >= this.dock_row_offsets[this.dock_rows.length])
+                return null;
+
+            // Find the last row starting above the pointer
+            int lo = 0;
+            int hi = this.dock_rows.length - 1;
+            while (lo < hi) {
+                int mid = (lo + hi + 1) / 2;
+                if (this.dock_row_offsets[mid] < rel_y)
+                    lo = mid;
+                else
+                    hi = mid - 1;
+            }
+            if (rel_y >= this.dock_row_offsets[lo] + Dock.HEIGHT)
+                return null;
 
-            int dock_x, dock_y;
-            uint title_offset;
-            title_offset = this.get_title_line_height();
-            foreach (Dock s in this.sinks) {
+            Dock d = this.dock_rows[lo];
+            int dock_x;
+            if (d is Sink)
                 dock_x = this.node_allocation.x + (int)this.border_width - (int)scroll_x;
-                dock_y = this.node_allocation.y + (int)this.border_width + (int)title_offset
-                         + i * s.get_min_height() - (int)scroll_y;
-                if (x > dock_x && x < dock_x + Dock.HEIGHT
-                        && y > dock_y && y < dock_y + Dock.HEIGHT )
-                    return s;
-                i++;
-            }
-            foreach (Dock s in this.sources) {
+            else
                 dock_x = this.node_allocation.x + this.node_allocation.width
                          - (int)this.border_width - Dock.HEIGHT - (int)scroll_x;
-                dock_y = this.node_allocation.y + (int)this.border_width + (int)title_offset
-                         + i * s.get_min_height() - (int)scroll_y;
-                if (x > dock_x && x < dock_x + Dock.HEIGHT
-                        && y > dock_y && y < dock_y + Dock.HEIGHT )
-                    return s;
-                i++;
-            }
+            if (x > dock_x && x < dock_x + Dock.HEIGHT)
+                return d;
             return null;
         }
 
@@ -444,10 +822,10 @@ namespace GtkFlow {
          * Disconnect all connections from and to this node
          */
         public void disconnect_all() {
-            foreach (Source s in this.sources) {
+            foreach (Source s in this.sources.head) {
                 s.remove_sinks();
             }
-            foreach (Sink s in this.sinks) {
+            foreach (Sink s in this.sinks.head) {
                 s.unset_source();
             }
         }
@@ -455,6 +833,10 @@ namespace GtkFlow {
 
         /**
          * Draw this node on the given cairo context
+         *
+         * If the {@link NodeView} caches node surfaces, everything but the
+         * child widget is rendered into an offscreen surface once and only
+         * painted from there until {@link invalidate_render_cache} is called.
          */
         public void draw_node(Cairo.Context cr) {
             Gtk.Allocation alloc;
@@ -465,6 +847,69 @@ namespace GtkFlow {
                 alloc.y -= (int)this.node_view.vadjustment.get_value();
             }
 
+            if (this.node_view != null && this.node_view.cache_node_surfaces) {
+                // Rendered at the zoom factor of the view to stay sharp
+                double zoom = this.node_view.zoom;
+                if (this.render_cache_zoom != zoom)
+                    this.invalidate_render_cache();
+                if (this.render_cache == null) {
+                    this.render_cache = cr.get_target().create_similar(
+                        Cairo.Content.COLOR_ALPHA,
+                        (int)Math.ceil(alloc.width * zoom), (int)Math.ceil(alloc.height * zoom)
+                    );
+                    this.render_cache_zoom = zoom;
+                    var cache_cr = new Cairo.Context(this.render_cache);
+                    cache_cr.scale(zoom, zoom);
+                    Gtk.Allocation cache_alloc = {0, 0, alloc.width, alloc.height};
+                    this.render_node(cache_cr, cache_alloc);
+                }
+                cr.save();
+                cr.translate(alloc.x, alloc.y);
+                cr.scale(1 / zoom, 1 / zoom);
+                cr.set_source_surface(this.render_cache, 0, 0);
+                cr.paint();
+                cr.restore();
+            } else {
+                this.render_node(cr, alloc);
+            }
+
+            Gtk.Widget child = this.get_child();
+            if (child != null) {
+                this.ensure_geometry();
+                int y_offset = (int)this.get_title_line_height()
+                               + this.dock_row_offsets[this.dock_rows.length];
+                Gtk.Allocation child_alloc = {0,0,0,0};
+                child_alloc.x = alloc.x + (int)border_width;
+                child_alloc.y = alloc.y + (int)border_width + y_offset;
+                child_alloc.width = alloc.width - 2 * (int)border_width;
+                child_alloc.height = alloc.height - 2 * (int)border_width - y_offset;
+                child.size_allocate(child_alloc);
+
+                this.propagate_draw(child, cr);
+            }
+            this.draw_resize_handle(cr, alloc);
+        }
+
+        /**
+         * True while this node is painted from a cached rendering,
+         * see {@link NodeView.cache_node_surfaces}
+         */
+        public bool render_cached {
+            get { return this.render_cache != null; }
+        }
+
+        /**
+         * Drops the cached rendering of this node, so it will be
+         * rendered from scratch the next time it is drawn
+         */
+        public void invalidate_render_cache() {
+            this.render_cache = null;
+        }
+
+        /**
+         * Renders the node without its child widget and resize handle into the given allocation
+         */
+        private void render_node(Cairo.Context cr, Gtk.Allocation alloc) {
             Gtk.StyleContext sc = this.get_style_context();
             sc.save();
             sc.add_class(Gtk.STYLE_CLASS_BUTTON);
@@ -487,47 +932,39 @@ namespace GtkFlow {
                 sc.restore();
             }
             if (this.node_view != null && this.node_view.editable) {
-                Gtk.IconTheme it = Gtk.IconTheme.get_default();
-                try {
+                Cairo.Surface? icon = this.node_view.get_icon_surface(
+                    "edit-delete", DELETE_BTN_SIZE
+                );
+                if (icon != null) {
                     cr.save();
-                    Gdk.Pixbuf icon_pix = it.load_icon("edit-delete", DELETE_BTN_SIZE, 0);
-                    Gdk.cairo_set_source_pixbuf(
-                        cr, icon_pix,
+                    cr.set_source_surface(
+                        icon,
                         alloc.x+alloc.width-DELETE_BTN_SIZE-border_width,
                         alloc.y+border_width
                     );
                     cr.paint();
-                } catch (GLib.Error e) {
-                    warning("Could not load close-node-icon 'edit-delete'");
-                } finally {
                     cr.restore();
                 }
             }
-            y_offset += (int)this.get_title_line_height();
-
-            foreach (Sink s in this.sinks) {
-                s.draw_sink(cr, alloc.x + (int)this.border_width,
-                                alloc.y+y_offset + (int) this.border_width);
-                y_offset += s.get_min_height();
+            this.ensure_geometry();
+            y_offset += this.title_line_height;
+
+            for (int i = 0; i < this.dock_rows.length; i++) {
+                Dock d = this.dock_rows[i];
+                int dock_y = alloc.y + y_offset + this.dock_row_offsets[i] + (int)this.border_width;
+                if (d is Sink)
+                    (d as Sink).draw_sink(cr, alloc.x + (int)this.border_width, dock_y);
+                else
+                    (d as Source).draw_source(cr, alloc.x - (int)this.border_width,
+                                              dock_y, alloc.width);
             }
-            foreach (Source s in this.sources) {
-                s.draw_source(cr, alloc.x-(int)this.border_width,
-                                  alloc.y+y_offset + (int) this.border_width, alloc.width);
-                y_offset += s.get_min_height();
-            }
-
-            Gtk.Widget child = this.get_child();
-            if (child != null) {
-                Gtk.Allocation child_alloc = {0,0,0,0};
-                child_alloc.x = alloc.x + (int)border_width;
-                child_alloc.y = alloc.y + (int)border_width + y_offset;
-                child_alloc.width = alloc.width - 2 * (int)border_width;
-                child_alloc.height = alloc.height - 2 * (int)border_width - y_offset;
-                child.size_allocate(child_alloc);
+        }
 
-                this.propagate_draw(child, cr);
-            }
-            // Draw resize handle
+        /**
+         * Draws the resize handle on top of the node and its child
+         */
+        private void draw_resize_handle(Cairo.Context cr, Gtk.Allocation alloc) {
+            Gtk.StyleContext sc = this.get_style_context();
             sc.save();
             cr.save();
             cr.set_source_rgba(0.5,0.5,0.5,0.5);
@@ -25,8 +25,26 @@ namespace GtkFlow {
      * It also lets the user edit said connections.
      */
     public class NodeView : Gtk.Container, Gtk.Scrollable {
-        private List<INode> nodes = new List<INode>();
+        private DockList<INode> nodes = new DockList<INode>();
+        // Lets us find the node below the mouse pointer quickly
+        private SpatialIndex node_index = new SpatialIndex();
+        // Icons drawn onto the nodes, e.g. the delete button
+        private IconCache icon_cache = new IconCache();
    
+        // Extra space around damaged areas to cover frames and line widths
+        private const int DAMAGE_MARGIN = 4;
+
+        /**
+         * The smallest zoom factor a view can be set to
+         */
+        public const double MIN_ZOOM = 0.01;
+        /**
+         * The largest zoom factor a view can be set to
+         */
+        public const double MAX_ZOOM = 4.0;
+        // How much one step of the mouse wheel zooms in or out
+        private const double ZOOM_STEP = 1.1;
+
         // The node that is currently being dragged around
         private const int DRAG_THRESHOLD = 3;
         private INode? drag_node = null;
@@ -56,6 +74,24 @@ namespace GtkFlow {
         // The connector that is being used to draw a non-established connection
         private Gtk.Allocation? temp_connector = null;
 
+        // Where a connection starts and ends in node coordinates
+        private class Connector {
+            public Source source;
+            public Sink sink;
+            public Node source_node;
+            public Node sink_node;
+            public int x0;
+            public int y0;
+            public int x1;
+            public int y1;
+        }
+        // The connectors of all established connections, keyed by their sink
+        private HashTable<Sink, Connector> connectors
+            = new HashTable<Sink, Connector>(direct_hash, direct_equal);
+        // Nodes whose connectors have to be measured again before they are drawn
+        private HashTable<INode, INode> stale_connector_nodes
+            = new HashTable<INode, INode>(direct_hash, direct_equal);
+
         public Gtk.Adjustment _hadjustment = null;
         public Gtk.Adjustment hadjustment {
             get {
@@ -89,11 +125,112 @@ namespace GtkFlow {
          */
         public bool editable {get; set; default=true;}
 
+        /**
+         * Determines whether nodes are rendered into offscreen surfaces once
+         * and only painted from there afterwards, which makes scrolling and
+         * dragging around other nodes cheap. Set this to false to fall back
+         * to rendering every node from scratch on every frame.
+         */
+        public bool cache_node_surfaces {get; set; default=false;}
+
+        /**
+         * Determines whether the evaluation and drawing of the displayed
+         * nodes is recorded by {@link profiler}
+         */
+        public bool profiling {get; set; default=false;}
+
+        /**
+         * Records evaluation and drawing times while {@link profiling} is set
+         */
+        public Profiler profiler {get; private set; default=new Profiler();}
+
+        /**
+         * Determines whether nodes are tinted from green to red by the
+         * cost that {@link profiler} recorded for them
+         */
+        public bool show_cost_overlay {get; set; default=false;}
+
+        private double _zoom = 1.0;
+        /**
+         * The factor nodes and connectors are scaled by when drawn.
+         * Scrolling still happens in unzoomed coordinates.
+         */
+        public double zoom {
+            get {
+                return this._zoom;
+            }
+            set {
+                double z = value.clamp(NodeView.MIN_ZOOM, NodeView.MAX_ZOOM);
+                if (z == this._zoom)
+                    return;
+                this._zoom = z;
+                this.queue_draw();
+            }
+        }
+
+        /**
+         * Below this zoom factor, nodes are drawn as plain rectangles without
+         * title, docks or child widgets and connectors as straight lines,
+         * one per pair of connected nodes. This keeps overviews of huge
+         * graphs fast.
+         */
+        public double detail_zoom {get; set; default=0.5;}
+
+        private uint freeze_count = 0;
+        /**
+         * True between {@link freeze} and the matching {@link thaw}
+         */
+        public bool frozen { get { return this.freeze_count > 0; } }
+
         public NodeView() {
             Object();
             this.vadjustment = new Gtk.Adjustment(0, 0, 100, 50, 100, 100);
             this.hadjustment = new Gtk.Adjustment(0, 0, 100, 50, 100, 100);
             this.set_size_request(100,100);
+            this.notify["editable"].connect(this.invalidate_render_caches);
+            this.notify["cache-node-surfaces"].connect(this.invalidate_render_caches);
+            this.notify["scale-factor"].connect(this.invalidate_render_caches);
+            this.notify["scale-factor"].connect(() => {
+                this.icon_cache.scale = this.get_scale_factor();
+            });
+            this.icon_cache.scale = this.get_scale_factor();
+            this.icon_cache.icon_theme = Gtk.IconTheme.get_for_screen(this.get_screen());
+            this.icon_cache.invalidated.connect(this.invalidate_render_caches);
+            this.notify["show-cost-overlay"].connect(this.request_redraw);
+            this.notify["detail-zoom"].connect(this.request_redraw);
+            this.profiler.propagated.connect(() => {
+                if (this.show_cost_overlay)
+                    this.request_redraw();
+            });
+        }
+
+        public override void screen_changed(Gdk.Screen? previous_screen) {
+            base.screen_changed(previous_screen);
+            this.icon_cache.icon_theme = Gtk.IconTheme.get_for_screen(this.get_screen());
+        }
+
+        /**
+         * Returns the named icon ready to be painted onto a node, or null
+         * if it is not available in the current icon theme
+         */
+        internal Cairo.Surface? get_icon_surface(string name, int size) {
+            return this.icon_cache.get_surface(name, size, this.get_window());
+        }
+
+        /**
+         * Drops the cached renderings of all nodes
+         */
+        private void invalidate_render_caches() {
+            foreach (INode n in this.nodes.head) {
+                if (n is Node)
+                    (n as Node).invalidate_render_cache();
+            }
+            this.queue_draw();
+        }
+
+        public override void style_updated() {
+            base.style_updated();
+            this.invalidate_render_caches();
         }
 
         public override void add(Gtk.Widget w) {
@@ -114,44 +251,238 @@ namespace GtkFlow {
             w.unparent();
         }
 
+        /**
+         * Returns the nodes of this view
+         */
+        public unowned List<INode> get_nodes() {
+            return this.nodes.head;
+        }
+
         private void add_node(INode n) {
-            if (this.nodes.index(n) == -1) {
-                this.nodes.insert(n,0);
+            if (this.nodes.append(n)) {
+                this.node_index.insert(n);
+                this.stale_connector_nodes.add(n);
                 n.set_node_view(this);
                 this.add(n as Gtk.Widget);
             }
-            this.queue_draw();
+            this.request_redraw();
         }
 
         private void remove_node(INode n) {
-            if (this.nodes.index(n) != -1) {
-                this.nodes.remove(n);
+            if (this.nodes.remove(n)) {
+                this.node_index.remove(n);
+                this.forget_connectors(n);
+                this.profiler.forget(n);
                 n.set_node_view(null);
                 this.remove(n as Gtk.Widget);
             }
+            this.request_redraw();
+        }
+
+        /**
+         * Stops this view from redrawing itself and freezes all of its
+         * nodes, see {@link Node.freeze}, until {@link thaw} is called.
+         * Use this when adding many nodes, docks or connections at once.
+         * Calls can be nested.
+         *
+         * Signals such as {@link Dock.connected} are still emitted right away.
+         */
+        public void freeze() {
+            this.freeze_count++;
+        }
+
+        /**
+         * Ends a bulk update started by {@link freeze}. When the outermost
+         * call returns, the nodes have been laid out, the values held back
+         * have been passed on and a redraw is queued.
+         */
+        public void thaw() {
+            if (this.freeze_count == 0) {
+                warning("NodeView.thaw() called without matching freeze()");
+                return;
+            }
+            if (--this.freeze_count > 0)
+                return;
+            var thawed = new GenericArray<Node>();
+            foreach (INode n in this.nodes.head) {
+                if (n is Node && !(n as Node).frozen)
+                    thawed.add(n as Node);
+            }
+            for (int i = 0; i < thawed.length; i++)
+                thawed[i].flush_layout();
+            // In topological order, so that nodes receive their new inputs
+            // before the values they computed from them are passed on
+            thawed.sort_with_data((a, b) => {
+                return a.get_order() - b.get_order();
+            });
+            for (int i = 0; i < thawed.length; i++)
+                thawed[i].flush_values();
+            this.recalculate_size();
             this.queue_draw();
         }
 
-        private INode? get_node_on_position(double x,double y) {
-            Gtk.Allocation alloc;
+        /**
+         * Queues a redraw of the whole view unless it is frozen
+         */
+        internal void request_redraw() {
+            if (this.freeze_count == 0)
+                this.queue_draw();
+        }
+
+        /**
+         * Has to be called by the nodes of this view whenever
+         * their allocation changed
+         */
+        internal void node_allocation_changed(INode n) {
+            this.node_index.update(n);
+            this.stale_connector_nodes.add(n);
+        }
+
+        /**
+         * Has to be called by the nodes of this view whenever their docks
+         * moved within the node or have been connected or disconnected
+         */
+        internal void invalidate_connectors(INode n) {
+            this.stale_connector_nodes.add(n);
+        }
+
+        /**
+         * Drops the connectors leading from and to a node that
+         * leaves this view, so they don't keep it alive
+         */
+        private void forget_connectors(INode n) {
+            this.stale_connector_nodes.remove(n);
+            Node? node = n as Node;
+            if (node == null)
+                return;
+            var iter = HashTableIter<Sink, Connector>(this.connectors);
+            unowned Sink sink;
+            unowned Connector c;
+            while (iter.next(out sink, out c)) {
+                if (c.source_node == node || c.sink_node == node)
+                    iter.remove();
+            }
+        }
+
+        /**
+         * Measures the connector leading into the given sink again
+         */
+        private void update_connector(Sink sink) {
+            Source? source = sink.source;
+            Node? source_node = source != null ? source.get_node() : null;
+            Node? sink_node = sink.get_node();
+            if (source_node == null || sink_node == null
+                    || source_node.get_node_view() != this
+                    || sink_node.get_node_view() != this) {
+                this.connectors.remove(sink);
+                return;
+            }
+            Gdk.Point source_pos, sink_pos;
+            try {
+                source_pos = source_node.get_dock_position(source);
+                sink_pos = sink_node.get_dock_position(sink);
+            } catch (NodeError e) {
+                warning("No dock on position. Ommiting connector");
+                this.connectors.remove(sink);
+                return;
+            }
+            Connector? c = this.connectors.lookup(sink);
+            if (c == null) {
+                c = new Connector();
+                c.sink = sink;
+                this.connectors.insert(sink, c);
+            }
+            c.source = source;
+            c.source_node = source_node;
+            c.sink_node = sink_node;
+            // Dock positions are given in widget coordinates
+            c.x0 = source_pos.x + (int)this.hadjustment.value;
+            c.y0 = source_pos.y + (int)this.vadjustment.value;
+            c.x1 = sink_pos.x + (int)this.hadjustment.value;
+            c.y1 = sink_pos.y + (int)this.vadjustment.value;
+        }
+
+        /**
+         * Measures the connectors of all nodes that moved or changed
+         * their connections since the last frame
+         */
+        private void update_connectors() {
+            if (this.stale_connector_nodes.size() == 0)
+                return;
+            foreach (unowned INode n in this.stale_connector_nodes.get_keys()) {
+                foreach (Sink sink in n.get_sinks())
+                    this.update_connector(sink);
+                foreach (Source source in n.get_sources())
+                    foreach (Sink sink in source.get_sinks())
+                        this.update_connector(sink);
+            }
+            this.stale_connector_nodes.remove_all();
+        }
+
+        /**
+         * Sets a new zoom factor, keeping the point at the given widget
+         * coordinates in place
+         */
+        public void zoom_at(double zoom, double x, double y) {
+            double node_x = x / this.zoom + this.hadjustment.value;
+            double node_y = y / this.zoom + this.vadjustment.value;
+            this.zoom = zoom;
+            this.hadjustment.value = node_x - x / this.zoom;
+            this.vadjustment.value = node_y - y / this.zoom;
+        }
+
+        public override bool scroll_event(Gdk.EventScroll e) {
+            if ((e.state & Gdk.ModifierType.CONTROL_MASK) == 0)
+                return false;
+            double factor;
+            switch (e.direction) {
+                case Gdk.ScrollDirection.UP:
+                    factor = NodeView.ZOOM_STEP;
+                    break;
+                case Gdk.ScrollDirection.DOWN:
+                    factor = 1.0 / NodeView.ZOOM_STEP;
+                    break;
+                case Gdk.ScrollDirection.SMOOTH:
+                    factor = Math.pow(NodeView.ZOOM_STEP, -e.delta_y);
+                    break;
+                default:
+                    return false;
+            }
+            this.zoom_at(this.zoom * factor, e.x, e.y);
+            return true;
+        }
+
+        /**
+         * Returns the nodes intersecting the given rectangle in node
+         * coordinates, ordered from bottom to top
+         */
+        public List<INode> get_nodes_in_area(int x, int y, int width, int height) {
+            var result = new List<INode>();
+            GenericArray<INode> found = this.node_index.query(x, y, width, height);
+            for (int i = found.length - 1; i >= 0; i--)
+                result.prepend(found[i]);
+            return result;
+        }
+
+        /**
+         * Returns the topmost node on the given position in widget
+         * coordinates at a zoom of 1.0, or null if there is none
+         */
+        public INode? get_node_on_position(double x,double y) {
             x += this.hadjustment.value;
             y += this.vadjustment.value;
-            foreach (INode n in this.nodes) {
-                n.get_node_allocation(out alloc);
-                if ( x >= alloc.x && y >= alloc.y &&
-                         x <= alloc.x + alloc.width && y <= alloc.y + alloc.height ) {
-                    return n;
-                }
-            }
-            return null;
+            return this.node_index.lookup(x, y);
         }
 
         public override bool button_press_event(Gdk.EventButton e) {
             if (!this.editable)
                 return false;
-            INode? n = this.get_node_on_position(e.x, e.y);
+            // Work in the coordinates the view would have at a zoom of 1.0
+            double x = e.x / this.zoom;
+            double y = e.y / this.zoom;
+            INode? n = this.get_node_on_position(x, y);
             Dock? targeted_dock = null;
-            Gdk.Point pos = {(int)e.x,(int)e.y};
+            Gdk.Point pos = {(int)x,(int)y};
             if (n != null) {
                 if (n.is_on_closebutton(pos))
                     this.close_button_pressed = true;
@@ -170,7 +501,7 @@ namespace GtkFlow {
                             return false;
                         }
                         this.temp_connector = {startpos.x, startpos.y,
-                                               (int)e.x-startpos.x, (int)e.y-startpos.y};
+                                               (int)x-startpos.x, (int)y-startpos.y};
                     } else {
                         try {
                             startpos = n.get_dock_position(this.drag_dock);
@@ -198,8 +529,8 @@ namespace GtkFlow {
                 } else {
                     return false;
                 }
-                this.drag_start_x = e.x;
-                this.drag_start_y = e.y;
+                this.drag_start_x = x;
+                this.drag_start_y = y;
                 this.drag_diff_x = (int)this.drag_start_x - alloc.x;
                 this.drag_diff_y = (int)this.drag_start_y - alloc.y;
             }
@@ -209,11 +540,14 @@ namespace GtkFlow {
         public override bool button_release_event(Gdk.EventButton e) {
             if (!this.editable)
                 return false;
+            // Work in the coordinates the view would have at a zoom of 1.0
+            double x = e.x / this.zoom;
+            double y = e.y / this.zoom;
             // Determine if this was a closebutton press
             if (this.close_button_pressed) {
-                INode? n = this.get_node_on_position(e.x, e.y);
+                INode? n = this.get_node_on_position(x, y);
                 if (n != null) {
-                    Gdk.Point pos = {(int)e.x,(int)e.y};
+                    Gdk.Point pos = {(int)x,(int)y};
                     if (n.is_on_closebutton(pos)) {
                         n.disconnect_all();
                         assert (n is Gtk.Widget);
@@ -289,13 +623,16 @@ namespace GtkFlow {
         public override bool motion_notify_event(Gdk.EventMotion e) {
             if (!this.editable)
                 return false;
+            // Work in the coordinates the view would have at a zoom of 1.0
+            double x = e.x / this.zoom;
+            double y = e.y / this.zoom;
             // Check if we are on a node. If yes, check if we are
             // currently pointing on a dock. if this is true, we
             // Want to draw a new connector instead of dragging the node
-            INode? n = this.get_node_on_position(e.x, e.y);
+            INode? n = this.get_node_on_position(x, y);
             Dock? targeted_dock = null;
             if (n != null) {
-                Gdk.Point pos = {(int)e.x, (int)e.y};
+                Gdk.Point pos = {(int)x, (int)y};
                 if (!n.is_on_closebutton(pos))
                     this.close_button_pressed = false;
                 // Update cursor if we are on the resize area
@@ -315,10 +652,11 @@ namespace GtkFlow {
             } else {
                 // If we are leaving the node we will also have to
                 // un-highlight the last hovered dock
-                if (this.hovered_dock != null)
+                if (this.hovered_dock != null) {
                     this.hovered_dock.highlight = false;
+                    this.queue_draw_dock(this.hovered_dock);
+                }
                 this.hovered_dock = null;
-                this.queue_draw();
                 // Update cursor to be default as we are guaranteed not on any
                 // resize handle outside of any node.
                 // The check for resize node is a cosmetical fix. If there is a
@@ -330,8 +668,8 @@ namespace GtkFlow {
             // Check if the cursor has been dragged a few pixels (defined by DRAG_THRESHOLD)
             // If yes, actually start dragging
             if ( ( this.drag_node != null || this.drag_dock != null || this.resize_node != null)
-                    && (Math.fabs(drag_start_x - e.x) > NodeView.DRAG_THRESHOLD
-                    ||  Math.fabs(drag_start_y - e.y) > NodeView.DRAG_THRESHOLD )) {
+                    && (Math.fabs(drag_start_x - x) > NodeView.DRAG_THRESHOLD
+                    ||  Math.fabs(drag_start_y - y) > NodeView.DRAG_THRESHOLD )) {
                 this.drag_threshold_fulfilled = true;
             }
 
@@ -340,33 +678,36 @@ namespace GtkFlow {
                 if (this.drag_node != null) {
                     // Actually move the node
                     Gtk.Allocation alloc;
+                    this.queue_draw_node(this.drag_node);
                     this.drag_node.get_node_allocation(out alloc);
-                    alloc.x = (int)e.x - this.drag_diff_x;
-                    alloc.y = (int)e.y - this.drag_diff_y;
+                    alloc.x = (int)x - this.drag_diff_x;
+                    alloc.y = (int)y - this.drag_diff_y;
                     this.drag_node.set_node_allocation(alloc);
                     this.recalculate_size();
-                    this.queue_draw();
+                    this.queue_draw_node(this.drag_node);
                 }
                 if (this.drag_dock != null) {
                     // Manipulate the temporary connector
-                    this.temp_connector.width = (int)e.x-this.temp_connector.x;
-                    this.temp_connector.height = (int)e.y-this.temp_connector.y;
+                    this.queue_draw_temp_connector();
+                    this.temp_connector.width = (int)x-this.temp_connector.x;
+                    this.temp_connector.height = (int)y-this.temp_connector.y;
                     if (targeted_dock == null) {
                         this.set_drop_dock(null);
                     }
                     else if (this.is_suitable_target(this.drag_dock, targeted_dock))
                         this.set_drop_dock(targeted_dock);
 
-                    this.queue_draw();
+                    this.queue_draw_temp_connector();
                 }
                 if (this.resize_node != null) {
                     // resize the node
                     Gtk.Allocation alloc;
+                    this.queue_draw_node(this.resize_node);
                     this.resize_node.get_node_allocation(out alloc);
-                    alloc.width =  resize_start_x + (int)e.x - (int)this.drag_start_x;
-                    alloc.height = resize_start_y + (int)e.y - (int)this.drag_start_y;
+                    alloc.width =  resize_start_x + (int)x - (int)this.drag_start_x;
+                    alloc.height = resize_start_y + (int)y - (int)this.drag_start_y;
                     this.resize_node.set_node_allocation(alloc);
-                    this.queue_draw();
+                    this.queue_draw_node(this.resize_node);
                 }
             }
             return false;
@@ -375,7 +716,7 @@ namespace GtkFlow {
         private void recalculate_size() {
             double x_min = 0, x_max = 0, y_min = 0, y_max = 0;
             Gtk.Allocation alloc;
-            foreach (INode n in this.nodes) {
+            foreach (INode n in this.nodes.head) {
                 n.get_node_allocation(out alloc);
                 x_min = Math.fmin(x_min, alloc.x);
                 x_max = Math.fmax(x_max, alloc.x+alloc.width);
@@ -392,8 +733,16 @@ namespace GtkFlow {
          * Determines wheter one dock can be dropped on another
          */
         private bool is_suitable_target (Dock from, Dock to) {
-            // Check whether the docks have the same type
-            if (!from.has_same_type(to))
+            // Check whether the value of the source can be fed into the sink
+            Dock src = from;
+            Dock snk = to;
+            if (to is Source) {
+                src = to;
+                snk = from;
+            } else if (from is Sink && ((Sink) from).source != null) {
+                src = ((Sink) from).source;
+            }
+            if (!can_convert(src.val.type(), snk.val.type()))
                 return false;
             // Check if the target would lead to a recursion
             if (   from.get_node().is_recursive(to.get_node())
@@ -425,24 +774,189 @@ namespace GtkFlow {
          * a connector on
          */
         private void set_drop_dock(Dock? d) {
-            if (this.drop_dock != null)
+            if (this.drop_dock == d)
+                return;
+            if (this.drop_dock != null) {
                 this.drop_dock.pressed = false;
+                this.queue_draw_dock(this.drop_dock);
+            }
             this.drop_dock = d;
-            if (this.drop_dock != null)
+            if (this.drop_dock != null) {
                 this.drop_dock.pressed = true;
-            this.queue_draw();
+                this.queue_draw_dock(this.drop_dock);
+            }
         }
 
         /**
          * Sets the dock that is currently being hovered over
          */
         private void set_hovered_dock(Dock? d) {
-            if (this.hovered_dock != null)
+            if (this.hovered_dock != null) {
                 this.hovered_dock.highlight = false;
+                this.queue_draw_dock(this.hovered_dock);
+            }
             this.hovered_dock = d;
-            if (this.hovered_dock != null)
+            if (this.hovered_dock != null) {
                 this.hovered_dock.highlight = true;
-            this.queue_draw();
+                this.queue_draw_dock(this.hovered_dock);
+            }
+        }
+
+        /**
+         * Invalidates the rectangle spanned by two points given in
+         * widget coordinates at a zoom of 1.0
+         */
+        private void queue_draw_rect(int x0, int y0, int x1, int y1) {
+            double x = (int.min(x0, x1) - NodeView.DAMAGE_MARGIN) * this.zoom;
+            double y = (int.min(y0, y1) - NodeView.DAMAGE_MARGIN) * this.zoom;
+            double w = ((x0 - x1).abs() + 2 * NodeView.DAMAGE_MARGIN) * this.zoom;
+            double h = ((y0 - y1).abs() + 2 * NodeView.DAMAGE_MARGIN) * this.zoom;
+            this.queue_draw_area((int)Math.floor(x), (int)Math.floor(y),
+                                 (int)Math.ceil(w) + 1, (int)Math.ceil(h) + 1);
+        }
+
+        /**
+         * Invalidates the area covered by the connector between the given docks
+         */
+        private void queue_draw_connector(Source source, Sink sink) {
+            Node? source_node = source.get_node();
+            Node? sink_node = sink.get_node();
+            if (source_node == null || sink_node == null)
+                return;
+            try {
+                Gdk.Point a = source_node.get_dock_position(source);
+                Gdk.Point b = sink_node.get_dock_position(sink);
+                this.queue_draw_rect(a.x, a.y, b.x, b.y);
+            } catch (NodeError e) {
+                this.queue_draw();
+            }
+        }
+
+        /**
+         * Invalidates the area covered by a node and by all of
+         * the connectors leading from and to it
+         */
+        private void queue_draw_node(INode n) {
+            Gtk.Allocation alloc;
+            n.get_node_allocation(out alloc);
+            int x = alloc.x - (int)this.hadjustment.value;
+            int y = alloc.y - (int)this.vadjustment.value;
+            this.queue_draw_rect(x, y, x + alloc.width, y + alloc.height);
+            foreach (Source source in n.get_sources())
+                foreach (Sink sink in source.get_sinks())
+                    this.queue_draw_connector(source, sink);
+            foreach (Sink sink in n.get_sinks())
+                if (sink.source != null)
+                    this.queue_draw_connector(sink.source, sink);
+        }
+
+        /**
+         * Invalidates the node a dock resides in
+         */
+        private void queue_draw_dock(Dock d) {
+            Node? n = d.get_node();
+            if (n == null) {
+                this.queue_draw();
+                return;
+            }
+            Gtk.Allocation alloc;
+            n.get_node_allocation(out alloc);
+            int x = alloc.x - (int)this.hadjustment.value;
+            int y = alloc.y - (int)this.vadjustment.value;
+            this.queue_draw_rect(x, y, x + alloc.width, y + alloc.height);
+        }
+
+        /**
+         * Invalidates the area covered by the temporary connector
+         */
+        private void queue_draw_temp_connector() {
+            if (this.temp_connector == null)
+                return;
+            this.queue_draw_rect(this.temp_connector.x, this.temp_connector.y,
+                                 this.temp_connector.x + this.temp_connector.width,
+                                 this.temp_connector.y + this.temp_connector.height);
+        }
+
+        private void draw_cost_overlay(Cairo.Context cr, INode n) {
+            double cost = this.profiler.get_cost(n);
+            if (cost < 0)
+                return;
+            Gtk.Allocation alloc;
+            n.get_node_allocation(out alloc);
+            cr.save();
+            cr.set_source_rgba(cost, 1.0 - cost, 0.0, 0.35);
+            cr.rectangle(alloc.x - (int)this.hadjustment.value,
+                         alloc.y - (int)this.vadjustment.value,
+                         alloc.width, alloc.height);
+            cr.fill();
+            cr.restore();
+        }
+
+        /**
+         * Draws the nodes within the given area as plain rectangles and
+         * the connections between them as straight lines, one per pair
+         * of connected nodes. Only connections with at least one node in
+         * the area are drawn. The context has to be set up to draw in
+         * node coordinates. Returns the nodes that have been drawn.
+         */
+        internal GenericArray<INode> draw_outlines(Cairo.Context cr, int x, int y, int w, int h) {
+            Gtk.StyleContext sc = this.get_style_context();
+            Gdk.RGBA fg = sc.get_color(Gtk.StateFlags.NORMAL);
+            // Keep lines one device pixel wide, whatever the scale
+            double line_width = 1.0, unused = 0.0;
+            cr.device_to_user_distance(ref line_width, ref unused);
+            cr.save();
+            cr.set_line_width(line_width);
+
+            GenericArray<INode> visible_nodes = this.node_index.query(x, y, w, h);
+            var visible = new HashTable<INode, INode>(direct_hash, direct_equal);
+            Gtk.Allocation alloc;
+            for (int i = 0; i < visible_nodes.length; i++) {
+                visible.add(visible_nodes[i]);
+                visible_nodes[i].get_node_allocation(out alloc);
+                cr.rectangle(alloc.x, alloc.y, alloc.width, alloc.height);
+            }
+            cr.set_source_rgba(fg.red, fg.green, fg.blue, fg.alpha * 0.15);
+            cr.fill_preserve();
+            cr.set_source_rgba(fg.red, fg.green, fg.blue, fg.alpha * 0.6);
+            cr.stroke();
+
+            // Nodes already connected to the current one by a line
+            var drawn = new HashTable<INode, INode>(direct_hash, direct_equal);
+            for (int i = 0; i < visible_nodes.length; i++) {
+                INode n = visible_nodes[i];
+                drawn.remove_all();
+                foreach (Source source in n.get_sources()) {
+                    foreach (Sink sink in source.get_sinks()) {
+                        Node? sink_node = sink.get_node();
+                        if (sink_node == null || sink_node in drawn)
+                            continue;
+                        drawn.add(sink_node);
+                        this.outline_connection(cr, n, sink_node);
+                    }
+                }
+                // Lines from visible nodes have been drawn with them
+                drawn.remove_all();
+                foreach (Sink sink in n.get_sinks()) {
+                    Node? source_node = sink.source != null ? sink.source.get_node() : null;
+                    if (source_node == null || source_node in visible || source_node in drawn)
+                        continue;
+                    drawn.add(source_node);
+                    this.outline_connection(cr, source_node, n);
+                }
+            }
+            cr.set_source_rgba(fg.red, fg.green, fg.blue, fg.alpha * 0.5);
+            cr.stroke();
+            cr.restore();
+            return visible_nodes;
+        }
+
+        private void outline_connection(Cairo.Context cr, INode source_node, INode sink_node) {
+            Gtk.Allocation source_alloc, sink_alloc;
+            source_node.get_node_allocation(out source_alloc);
+            sink_node.get_node_allocation(out sink_alloc);
+            cr.move_to(source_alloc.x + source_alloc.width, source_alloc.y + source_alloc.height / 2);
+            cr.line_to(sink_alloc.x, sink_alloc.y + sink_alloc.height / 2);
         }
 
         public override bool draw(Cairo.Context cr) {
@@ -450,52 +964,96 @@ namespace GtkFlow {
             Gdk.RGBA bg = sc.get_background_color(Gtk.StateFlags.NORMAL);
             cr.set_source_rgba(bg.red, bg.green, bg.blue, bg.alpha);
             cr.paint();
-            // Draw nodes
-            this.nodes.reverse();
-            foreach (INode n in this.nodes)
-                n.draw_node(cr);
-            this.nodes.reverse();
-            // Draw connectors
-            foreach (INode n in this.nodes) {
-                foreach(Source source in n.get_sources()) {
-                    Gdk.Point source_pos = {0,0};
-                    try {
-                        source_pos = n.get_dock_position(source);
-                    } catch (NodeError e) {
-                        warning("No dock on position. Ommiting connector");
-                        continue;
-                    }
-                    foreach(Sink sink in source.get_sinks()) {
-                        // Don't draw the connection to a sink if we are dragging it
-                        if (sink == this.drag_dock)
-                            continue;
-                        Node? sink_node = sink.get_node();
-                        Gdk.Point sink_pos = {0,0};
-                        try {
-                            sink_pos = sink_node.get_dock_position(sink);
-                        } catch (NodeError e) {
-                            warning("No dock on position. Ommiting connector");
-                            continue;
-                        }
-                        int w = sink_pos.x - source_pos.x;
-                        int h = sink_pos.y - source_pos.y;
-                        cr.move_to(source_pos.x, source_pos.y);
-                        cr.rel_curve_to(w,0,0,h,w,h);
-                        cr.stroke();
-                    }
+            // Everything below is drawn in unzoomed coordinates
+            cr.scale(this.zoom, this.zoom);
+
+            // Only draw what lies within the damaged area. The area is
+            // translated into node coordinates, i.e. the scroll offset is added
+            double clip_x1, clip_y1, clip_x2, clip_y2;
+            cr.clip_extents(out clip_x1, out clip_y1, out clip_x2, out clip_y2);
+            int scroll_x = (int)this.hadjustment.value;
+            int scroll_y = (int)this.vadjustment.value;
+            int visible_x = (int)Math.floor(clip_x1) + scroll_x;
+            int visible_y = (int)Math.floor(clip_y1) + scroll_y;
+            int visible_w = (int)Math.ceil(clip_x2 - clip_x1);
+            int visible_h = (int)Math.ceil(clip_y2 - clip_y1);
+
+            if (this.zoom < this.detail_zoom) {
+                cr.save();
+                cr.translate(-scroll_x, -scroll_y);
+                GenericArray<INode> outlined = this.draw_outlines(
+                    cr, visible_x, visible_y, visible_w, visible_h
+                );
+                cr.restore();
+                if (this.show_cost_overlay) {
+                    for (int i = 0; i < outlined.length; i++)
+                        this.draw_cost_overlay(cr, outlined[i]);
                 }
+                this.draw_temp_connector(cr);
+                return true;
             }
-            // Draw temporary connector if any
-            if (this.temp_connector != null) {
-                int w = this.temp_connector.width;
-                int h = this.temp_connector.height;
-                cr.move_to(this.temp_connector.x, this.temp_connector.y);
+
+            // Draw nodes, the topmost one last
+            GenericArray<INode> visible_nodes = this.node_index.query(
+                visible_x, visible_y, visible_w, visible_h
+            );
+            for (int i = 0; i < visible_nodes.length; i++) {
+                if (this.profiling) {
+                    int64 start = GLib.get_monotonic_time();
+                    visible_nodes[i].draw_node(cr);
+                    this.profiler.add_draw(visible_nodes[i], start,
+                                           GLib.get_monotonic_time() - start);
+                } else {
+                    visible_nodes[i].draw_node(cr);
+                }
+                if (this.show_cost_overlay)
+                    this.draw_cost_overlay(cr, visible_nodes[i]);
+            }
+
+            // Draw connectors, all of them in a single stroke
+            this.update_connectors();
+            cr.save();
+            cr.translate(-scroll_x, -scroll_y);
+            var iter = HashTableIter<Sink, Connector>(this.connectors);
+            unowned Sink sink;
+            unowned Connector c;
+            while (iter.next(out sink, out c)) {
+                // Drop connections that went away without their nodes noticing
+                if (!c.sink.connected_to(c.source) || c.source.get_node() != c.source_node
+                        || c.sink.get_node() != c.sink_node
+                        || c.source_node.get_node_view() != this
+                        || c.sink_node.get_node_view() != this) {
+                    iter.remove();
+                    continue;
+                }
+                // Don't draw the connection to a sink if we are dragging it
+                if (c.sink == this.drag_dock)
+                    continue;
+                if (int.max(c.x0, c.x1) < visible_x || int.max(c.y0, c.y1) < visible_y
+                        || int.min(c.x0, c.x1) > visible_x + visible_w
+                        || int.min(c.y0, c.y1) > visible_y + visible_h)
+                    continue;
+                int w = c.x1 - c.x0;
+                int h = c.y1 - c.y0;
+                cr.move_to(c.x0, c.y0);
                 cr.rel_curve_to(w,0,0,h,w,h);
-                cr.stroke();
             }
+            cr.stroke();
+            cr.restore();
+            this.draw_temp_connector(cr);
             return true;
         }
 
+        private void draw_temp_connector(Cairo.Context cr) {
+            if (this.temp_connector == null)
+                return;
+            int w = this.temp_connector.width;
+            int h = this.temp_connector.height;
+            cr.move_to(this.temp_connector.x, this.temp_connector.y);
+            cr.rel_curve_to(w,0,0,h,w,h);
+            cr.stroke();
+        }
+
         public override void realize() {
             Gtk.Allocation alloc;
             this.get_allocation(out alloc);
@@ -510,6 +1068,7 @@ namespace GtkFlow {
                  | Gdk.EventMask.POINTER_MOTION_MASK
                  | Gdk.EventMask.BUTTON_PRESS_MASK
                  | Gdk.EventMask.BUTTON_RELEASE_MASK
+                 | Gdk.EventMask.SCROLL_MASK
                  | Gdk.EventMask.LEAVE_NOTIFY_MASK;
             Gdk.WindowAttributesType mask = Gdk.WindowAttributesType.X 
                  | Gdk.WindowAttributesType.X 
@@ -42,16 +42,19 @@ namespace GtkFlow {
 
         public virtual void set_source(Source s) throws NodeError{
             this.unset_source();
-            if (this.val.type() != s.val.type()) {
+            if (!can_convert(s.val.type(), this.val.type())) {
                 throw new NodeError.INCOMPATIBLE_SOURCETYPE(
                     "Can't connect. Source has type %s while Sink has type %s".printf(
                         s.val.type().name(), this.val.type().name()
                     )
                 );
             }
+            if (this.node != null && s.get_node() != null)
+                Node.add_edge(s.get_node(), this.node);
             this._source = s;
             if (!this._source.connected_to(this))
                 this._source.add_sink(this);
+            this.invalidate_connectors();
             this.connected(s);
         }
 
@@ -61,6 +64,7 @@ namespace GtkFlow {
             Source s = this._source;
             this._source = null;
             this.invalidate();
+            this.invalidate_connectors();
             this.disconnected(s);
         }
 
@@ -97,14 +101,25 @@ namespace GtkFlow {
         }
 
         public void change_value(GLib.Value v) throws NodeError {
-            if (this.val.type() != v.type())
+            GLib.Value converted = GLib.Value(this.val.type());
+            if (!convert_value(v, ref converted))
                 throw new NodeError.INCOMPATIBLE_VALUE(
                     "Cannot feed a %s value into this %s Sink".printf(
                         v.type().name(),this.val.type().name())
                 );
-            this.val = v;
+            this.val = converted;
             this.valid = true;
-            this.changed(v);
+            Profiler? profiler = this.get_profiler();
+            if (profiler == null) {
+                this.changed(converted);
+                return;
+            }
+            profiler.begin_evaluation(this.node);
+            try {
+                this.changed(converted);
+            } finally {
+                profiler.end_evaluation(this.node);
+            }
         }
 
         public virtual signal void changed(GLib.Value v) {
@@ -20,12 +20,63 @@
 *********************************************************************/
 
 namespace GtkFlow {
+    /**
+     * Determines when a {@link Source} passes new values on to its sinks
+     */
+    public enum UpdatePolicy {
+        /**
+         * Every value is passed on right away
+         */
+        IMMEDIATE,
+        /**
+         * Only the latest value set during a main loop iteration
+         * is passed on, once the main loop is idle
+         */
+        COALESCE,
+        /**
+         * Values are passed on at most once per update interval.
+         * The latest value is passed on at the end of the interval.
+         */
+        THROTTLE,
+        /**
+         * A value is passed on after no new value has been set
+         * for an update interval
+         */
+        DEBOUNCE
+    }
+
     /**
      * The Source is a special Type of Dock that provides data.
      * A Source can provide a multitude of Sinks with data.
      */
     public class Source : Dock {
-        private List<Sink> sinks = new List<Sink>();
+        private DockList<Sink> sinks = new DockList<Sink>();
+
+        // The main loop source that delivers a delayed value
+        private uint delivery_id = 0;
+        // Monotonic time of the last delivery in microseconds
+        private int64 last_delivery = 0;
+        // Set when the value has to be passed on to all sinks
+        // once the node of this source is thawed
+        private bool delivery_deferred = false;
+        // Sinks waiting for the value until their node or the
+        // node of this source is thawed
+        private HashTable<Sink, Sink>? deferred_sinks = null;
+
+        /**
+         * Determines when values set with {@link set_value} are
+         * passed on to the sinks
+         *
+         * A value that is held back keeps the source alive
+         * until it has been passed on.
+         */
+        public UpdatePolicy update_policy {get; set; default=UpdatePolicy.IMMEDIATE;}
+
+        /**
+         * The interval in milliseconds used by {@link UpdatePolicy.THROTTLE}
+         * and {@link UpdatePolicy.DEBOUNCE}
+         */
+        public uint update_interval {get; set; default=16;}
 
         public Source(GLib.Value initial) {
             base(initial);
@@ -38,31 +89,138 @@ namespace GtkFlow {
                         v.type().name(),this.val.type().name())
                 );
             this.val = v;
-            foreach (Sink s in this.sinks)
-                s.change_value(v);
+            switch (this.update_policy) {
+                case UpdatePolicy.COALESCE:
+                    if (this.delivery_id == 0)
+                        this.delivery_id = GLib.Idle.add(this.deliver_delayed);
+                    break;
+                case UpdatePolicy.THROTTLE:
+                    if (this.delivery_id != 0)
+                        break;
+                    int64 wait = this.last_delivery + this.update_interval * 1000
+                                 - GLib.get_monotonic_time();
+                    if (wait <= 0)
+                        this.deliver();
+                    else
+                        this.delivery_id = GLib.Timeout.add((uint)((wait + 999) / 1000),
+                                                            this.deliver_delayed);
+                    break;
+                case UpdatePolicy.DEBOUNCE:
+                    if (this.delivery_id != 0)
+                        GLib.Source.remove(this.delivery_id);
+                    this.delivery_id = GLib.Timeout.add(this.update_interval,
+                                                        this.deliver_delayed);
+                    break;
+                default:
+                    this.deliver();
+                    break;
+            }
+        }
+
+        /**
+         * Passes a value that has been held back by the
+         * {@link update_policy} on to the sinks right away
+         */
+        public void flush() {
+            if (this.delivery_id == 0)
+                return;
+            GLib.Source.remove(this.delivery_id);
+            this.deliver_delayed();
+        }
+
+        private bool deliver_delayed() {
+            this.delivery_id = 0;
+            try {
+                this.deliver();
+            } catch (NodeError e) {
+                warning("Could not pass on value: %s", e.message);
+            }
+            return false;
+        }
+
+        private void deliver() throws NodeError {
+            if (this.node != null && this.node.frozen) {
+                this.delivery_deferred = true;
+                this.node.defer_source(this);
+                return;
+            }
+            this.delivery_deferred = false;
+            this.deferred_sinks = null;
+            this.last_delivery = GLib.get_monotonic_time();
+            Profiler? profiler = this.get_profiler();
+            if (profiler != null)
+                profiler.begin_propagation();
+            try {
+                foreach (Sink s in this.sinks.head)
+                    this.push_value(s);
+            } finally {
+                if (profiler != null)
+                    profiler.end_propagation();
+            }
+        }
+
+        /**
+         * Passes the value on to a single sink, unless the node of
+         * the sink or of this source is frozen
+         */
+        private void push_value(Sink s) throws NodeError {
+            Node? frozen_node = null;
+            if (this.node != null && this.node.frozen)
+                frozen_node = this.node;
+            else if (s.get_node() != null && s.get_node().frozen)
+                frozen_node = s.get_node();
+            if (frozen_node != null) {
+                if (this.deferred_sinks == null)
+                    this.deferred_sinks = new HashTable<Sink, Sink>(direct_hash, direct_equal);
+                this.deferred_sinks.add(s);
+                frozen_node.defer_source(this);
+                return;
+            }
+            if (this.deferred_sinks != null)
+                this.deferred_sinks.remove(s);
+            s.change_value(this.val);
+        }
+
+        /**
+         * Passes on the latest value to the sinks it has been
+         * held back from while nodes were frozen
+         */
+        internal void flush_deferred() throws NodeError {
+            if (this.delivery_deferred) {
+                this.deliver();
+                return;
+            }
+            if (this.deferred_sinks == null)
+                return;
+            HashTable<Sink, Sink> sinks = this.deferred_sinks;
+            this.deferred_sinks = null;
+            foreach (unowned Sink s in sinks.get_keys()) {
+                if (this.connected_to(s))
+                    this.push_value(s);
+            }
         }
 
         public override void invalidate() {
-            foreach (Sink s in this.sinks) {
+            foreach (Sink s in this.sinks.head) {
                 s.invalidate();
             }
         }
 
         public virtual void add_sink(Sink s) throws NodeError {
-            if (this.val.type() != s.val.type()) {
+            if (!can_convert(this.val.type(), s.val.type())) {
                 throw new NodeError.INCOMPATIBLE_SINKTYPE(
                     "Can't connect. Sink has type %s while Source has type %s".printf(
                         s.val.type().name(), this.val.type().name()
                     )
                 );
             }
-            if (this.sinks.index(s) == -1)
-                this.sinks.append(s);
+            if (this.node != null && s.get_node() != null)
+                Node.add_edge(this.node, s.get_node());
+            this.sinks.append(s);
             if (!s.connected_to(this))
                 s.set_source(this);
-            if (this.valid) {
-                s.change_value(this.val);
-            }
+            if (this.valid)
+                this.push_value(s);
         }
 
         public new void set_valid() {
@@ -70,15 +228,16 @@ namespace GtkFlow {
         }
 
         public virtual void remove_sink(Sink s){
-            if (this.sinks.index(s) != -1)
-                this.sinks.remove(s);
+            this.sinks.remove(s);
+            if (this.deferred_sinks != null)
+                this.deferred_sinks.remove(s);
             if (s.connected_to(this))
                 s.unset_source();
             this.disconnected(s);
         }
 
         public virtual void remove_sinks() {
-            foreach (Sink s in this.sinks)
+            foreach (Sink s in this.sinks.head.copy())
                 this.remove_sink(s);
         }
 
@@ -86,21 +245,21 @@ namespace GtkFlow {
          * Returns true if this Source is connected to the given Sink
          */
         public bool connected_to(Sink s) {
-            return this.sinks.index(s) != -1;
+            return this.sinks.contains(s);
         }
 
         /**
          * Returns true if this Source is connected to one or more Sinks
          */
         public override bool is_connected() {
-            return this.sinks.length() > 0;
+            return this.sinks.length > 0;
         }
 
         /**
          * Returns the sinks that this source is connected to
          */
         public unowned List<Sink> get_sinks() {
-            return this.sinks;
+            return this.sinks.head;
         }
 
         public override void update_layout() {
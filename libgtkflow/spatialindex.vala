@@ -0,0 +1,219 @@
+/********************************************************************
+# Copyright 2014 Daniel 'grindhold' Brendle
+#
+# This file is part of libgtkflow.
+#
+# libgtkflow is free software: you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation, either
+# version 3 of the License, or (at your option) any later
+# version.
+#
+# libgtkflow is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied
+# warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR
+# PURPOSE. See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with libgtkflow.
+# If not, see http://www.gnu.org/licenses/.
+*********************************************************************/
+
+namespace GtkFlow {
+    /**
+     * A uniform grid over the node allocations of a {@link NodeView}
+     *
+     * Every node is registered in all cells its allocation overlaps, so
+     * finding the node on a position only needs to look at the few nodes
+     * of a single cell instead of every node in the view.
+     */
+    internal class SpatialIndex : Object {
+        private const int CELL_SIZE = 128;
+
+        private class Entry {
+            public int x0;
+            public int y0;
+            public int x1;
+            public int y1;
+            // Nodes added later are drawn on top of nodes added earlier
+            public uint stacking;
+        }
+
+        private HashTable<uint, GenericArray<INode>> cells
+            = new HashTable<uint, GenericArray<INode>>(direct_hash, direct_equal);
+        private HashTable<INode, Entry> entries
+            = new HashTable<INode, Entry>(direct_hash, direct_equal);
+        private uint stacking = 0;
+
+        private static int cell_of(double coord) {
+            return (int)Math.floor(coord / CELL_SIZE);
+        }
+
+        private static uint cell_key(int cx, int cy) {
+            return ((uint)(cx & 0xffff) << 16) | (uint)(cy & 0xffff);
+        }
+
+        private void add_to_cells(INode n, Entry e) {
+            for (int cx = e.x0; cx <= e.x1; cx++) {
+                for (int cy = e.y0; cy <= e.y1; cy++) {
+                    uint key = SpatialIndex.cell_key(cx, cy);
+                    unowned GenericArray<INode>? cell = this.cells.lookup(key);
+                    if (cell == null) {
+                        var new_cell = new GenericArray<INode>();
+                        cell = new_cell;
+                        this.cells.insert(key, (owned) new_cell);
+                    }
+                    cell.add(n);
+                }
+            }
+        }
+
+        private void remove_from_cells(INode n, Entry e) {
+            for (int cx = e.x0; cx <= e.x1; cx++) {
+                for (int cy = e.y0; cy <= e.y1; cy++) {
+                    uint key = SpatialIndex.cell_key(cx, cy);
+                    unowned GenericArray<INode>? cell = this.cells.lookup(key);
+                    if (cell == null)
+                        continue;
+                    cell.remove(n);
+                    if (cell.length == 0)
+                        this.cells.remove(key);
+                }
+            }
+        }
+
+        private static void set_bounds(Entry e, Gtk.Allocation alloc) {
+            e.x0 = SpatialIndex.cell_of(alloc.x);
+            e.y0 = SpatialIndex.cell_of(alloc.y);
+            e.x1 = SpatialIndex.cell_of(alloc.x + alloc.width);
+            e.y1 = SpatialIndex.cell_of(alloc.y + alloc.height);
+        }
+
+        /**
+         * Registers a node on top of all nodes that are already indexed
+         */
+        public void insert(INode n) {
+            if (this.entries.contains(n))
+                return;
+            Gtk.Allocation alloc;
+            n.get_node_allocation(out alloc);
+            var e = new Entry();
+            SpatialIndex.set_bounds(e, alloc);
+            e.stacking = ++this.stacking;
+            this.add_to_cells(n, e);
+            this.entries.insert(n, e);
+        }
+
+        /**
+         * Removes a node from the index
+         */
+        public void remove(INode n) {
+            unowned Entry? e = this.entries.lookup(n);
+            if (e == null)
+                return;
+            this.remove_from_cells(n, e);
+            this.entries.remove(n);
+        }
+
+        /**
+         * Has to be called whenever the allocation of a node changed
+         */
+        public void update(INode n) {
+            unowned Entry? e = this.entries.lookup(n);
+            if (e == null)
+                return;
+            Gtk.Allocation alloc;
+            n.get_node_allocation(out alloc);
+            var bounds = new Entry();
+            SpatialIndex.set_bounds(bounds, alloc);
+            if (bounds.x0 == e.x0 && bounds.y0 == e.y0
+                    && bounds.x1 == e.x1 && bounds.y1 == e.y1)
+                return;
+            this.remove_from_cells(n, e);
+            e.x0 = bounds.x0;
+            e.y0 = bounds.y0;
+            e.x1 = bounds.x1;
+            e.y1 = bounds.y1;
+            this.add_to_cells(n, e);
+        }
+
+        /**
+         * Returns the nodes whose allocation intersects the given rectangle,
+         * ordered from bottom to top. The rectangle has to be given in node
+         * coordinates, i.e. without the scroll offset of the view.
+         */
+        public GenericArray<INode> query(int x, int y, int width, int height) {
+            var result = new GenericArray<INode>();
+            var seen = new HashTable<INode, INode>(direct_hash, direct_equal);
+            int x0 = SpatialIndex.cell_of(x);
+            int y0 = SpatialIndex.cell_of(y);
+            int x1 = SpatialIndex.cell_of(x + width);
+            int y1 = SpatialIndex.cell_of(y + height);
+            Gtk.Allocation alloc;
+            // For huge rectangles looking at every node is cheaper than at every cell
+            if ((double)(x1 - x0 + 1) * (y1 - y0 + 1) > this.entries.size()) {
+                foreach (unowned INode n in this.entries.get_keys()) {
+                    n.get_node_allocation(out alloc);
+                    if (alloc.x <= x + width && alloc.y <= y + height
+                            && alloc.x + alloc.width >= x && alloc.y + alloc.height >= y)
+                        result.add(n);
+                }
+            } else {
+                for (int cx = x0; cx <= x1; cx++) {
+                    for (int cy = y0; cy <= y1; cy++) {
+                        unowned GenericArray<INode>? cell = this.cells.lookup(
+                            SpatialIndex.cell_key(cx, cy)
+                        );
+                        if (cell == null)
+                            continue;
+                        for (int i = 0; i < cell.length; i++) {
+                            INode n = cell[i];
+                            if (seen.contains(n))
+                                continue;
+                            seen.add(n);
+                            n.get_node_allocation(out alloc);
+                            if (alloc.x <= x + width && alloc.y <= y + height
+                                    && alloc.x + alloc.width >= x && alloc.y + alloc.height >= y)
+                                result.add(n);
+                        }
+                    }
+                }
+            }
+            result.sort_with_data((a, b) => {
+                uint sa = this.entries.lookup(a).stacking;
+                uint sb = this.entries.lookup(b).stacking;
+                return sa < sb ? -1 : (sa > sb ? 1 : 0);
+            });
+            return result;
+        }
+
+        /**
+         * Returns the topmost node whose allocation contains the given
+         * position. The position has to be given in node coordinates,
+         * i.e. without the scroll offset of the view.
+         */
+        public INode? lookup(double x, double y) {
+            unowned GenericArray<INode>? cell = this.cells.lookup(
+                SpatialIndex.cell_key(SpatialIndex.cell_of(x), SpatialIndex.cell_of(y))
+            );
+            if (cell == null)
+                return null;
+            INode? found = null;
+            uint found_stacking = 0;
+            Gtk.Allocation alloc;
+            for (int i = 0; i < cell.length; i++) {
+                INode n = cell[i];
+                n.get_node_allocation(out alloc);
+                if (x >= alloc.x && y >= alloc.y &&
+                        x <= alloc.x + alloc.width && y <= alloc.y + alloc.height) {
+                    uint s = this.entries.lookup(n).stacking;
+                    if (found == null || s > found_stacking) {
+                        found = n;
+                        found_stacking = s;
+                    }
+                }
+            }
+            return found;
+        }
+    }
+}
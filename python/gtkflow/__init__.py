@@ -0,0 +1,3 @@
+"""
+Python helpers for libgtkflow
+"""
@@ -0,0 +1,200 @@
+"""
+asyncio support for GtkFlow nodes
+
+Subclass AsyncNode and implement ``async def compute(self, inputs)`` to
+write nodes that wait on I/O without blocking the UI. Values arriving
+faster than a node can compute are coalesced, so there is never more
+than one computation running and one set of inputs waiting per node.
+A computation whose inputs changed in the meantime is cancelled and
+its result is never published.
+
+asyncio has to run on top of the GLib main loop for this to work. Call
+install_event_loop_policy() before creating the asyncio loop when
+PyGObject provides gi.events. Otherwise run the application with
+asyncio.run() and keep iterate_glib() running as a task next to it.
+"""
+
+import asyncio
+
+from gi.repository import GLib
+from gi.repository import GtkFlow
+
+
+def install_event_loop_policy():
+    """
+    Makes asyncio run its event loops on the GLib main loop.
+    Returns False if the installed PyGObject does not support this.
+    """
+    try:
+        from gi.events import GLibEventLoopPolicy
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(GLibEventLoopPolicy())
+    return True
+
+
+async def iterate_glib(context=None, interval=0.005):
+    """
+    Dispatches the pending events of a GLib main context from within
+    a running asyncio loop until cancelled
+    """
+    context = context or GLib.MainContext.default()
+    while True:
+        while context.pending():
+            context.iteration(False)
+        await asyncio.sleep(interval)
+
+
+class LatestValueRunner:
+    """
+    Runs a coroutine function for the latest submitted inputs only
+
+    ``compute`` is awaited with the inputs and its result is handed to
+    ``publish``. Inputs submitted while a computation is running replace
+    each other, only the latest one is computed next. If ``restart`` is
+    true, the running computation is cancelled right away, otherwise it
+    may finish, but its result is dropped as stale.
+
+    Computations run on ``loop``. Without one, submit() has to be called
+    from code running in an asyncio loop, e.g. a GLib signal handler
+    when asyncio runs on the GLib main loop.
+    """
+
+    def __init__(self, compute, publish, restart=True, on_error=None, loop=None):
+        self._compute = compute
+        self._publish = publish
+        self._on_error = on_error
+        self.restart = restart
+        self._loop = loop
+        self._pending = None
+        self._has_pending = False
+        self._task = None
+        self._current = None
+        self._closed = False
+        # Inputs that were replaced before being computed
+        self.dropped = 0
+        # Computations cancelled or thrown away because of newer inputs
+        self.stale = 0
+
+    @property
+    def busy(self):
+        return self._task is not None and not self._task.done()
+
+    def submit(self, inputs):
+        if self._closed:
+            raise RuntimeError("Runner has been closed")
+        if not self.busy:
+            # Fails before touching any state if there is no loop to run on
+            loop = self._loop or asyncio.get_running_loop()
+        if self._has_pending:
+            self.dropped += 1
+        self._pending = inputs
+        self._has_pending = True
+        if self.busy:
+            if self.restart and self._current is not None and not self._current.done():
+                self._current.cancel()
+            return
+        self._task = loop.create_task(self._run())
+
+    async def join(self):
+        """
+        Waits until all submitted inputs have been computed
+        """
+        while self.busy:
+            await asyncio.shield(self._task)
+
+    def close(self):
+        """
+        Cancels the running computation and drops pending inputs
+        """
+        self._closed = True
+        self._has_pending = False
+        self._pending = None
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self._has_pending:
+            inputs = self._pending
+            self._pending = None
+            self._has_pending = False
+            self._current = loop.create_task(self._compute(inputs))
+            try:
+                result = await self._current
+            except asyncio.CancelledError:
+                if self._closed or not self._current.cancelled():
+                    raise
+                # Superseded by newer inputs
+                self.stale += 1
+                continue
+            except Exception as e:
+                if self._on_error is None:
+                    raise
+                self._on_error(e)
+                continue
+            finally:
+                self._current = None
+            if self._has_pending:
+                self.stale += 1
+                continue
+            self._publish(result)
+
+
+class AsyncNode(GtkFlow.Node):
+    """
+    A node whose outputs are computed by the coroutine compute()
+
+    Register the docks that make up the inputs and outputs with
+    add_input() and add_output(). Whenever an input changes and all of
+    them hold a value, compute() is called with a dict mapping input
+    names to values. It returns a dict mapping output names to values.
+    """
+
+    restart = True
+
+    def __init__(self, loop=None):
+        GtkFlow.Node.__init__(self)
+        self._inputs = {}
+        self._outputs = {}
+        self.runner = LatestValueRunner(self.compute, self._publish,
+                                        restart=self.restart,
+                                        on_error=self.compute_failed,
+                                        loop=loop)
+
+    def add_input(self, name, sink):
+        if sink.get_label() == "":
+            sink.set_label(name)
+        self.add_sink(sink)
+        self._inputs[name] = sink
+        sink.connect("changed", self._input_changed)
+
+    def add_output(self, name, source):
+        if source.get_label() == "":
+            source.set_label(name)
+        self.add_source(source)
+        self._outputs[name] = source
+
+    async def compute(self, inputs):
+        raise NotImplementedError
+
+    def compute_failed(self, error):
+        """
+        Called with the exception compute() raised. Invalidates the outputs.
+        """
+        for source in self._outputs.values():
+            source.invalidate()
+
+    def _input_changed(self, dock, value=None):
+        inputs = {}
+        for name, sink in self._inputs.items():
+            try:
+                inputs[name] = sink.get_value()
+            except GLib.Error:
+                # Not all inputs are connected yet
+                return
+        self.runner.submit(inputs)
+
+    def _publish(self, outputs):
+        for name, value in outputs.items():
+            self._outputs[name].set_value(value)
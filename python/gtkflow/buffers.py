@@ -0,0 +1,87 @@
+"""
+NumPy access to the buffers of the BufferSources and BufferSinks of
+GtkFlow and GFlow
+
+as_array() wraps the GLib.Bytes of a buffer dock in a read-only NumPy
+array without copying it. The array keeps the GLib.Bytes alive, so it
+stays valid after the dock received a new buffer. set_array() hands an
+array to a BufferSource. A GLib.Bytes owns its memory, so the array is
+copied once when entering the graph and shared by all connected sinks
+from there on.
+"""
+
+import numpy
+
+from gi.repository import GFlow
+from gi.repository import GtkFlow
+
+_BUFFER_DOCKS = (GtkFlow.BufferSource, GtkFlow.BufferSink,
+                 GFlow.BufferSource, GFlow.BufferSink)
+
+DTYPES = {}
+for _types in (GtkFlow.ElementType, GFlow.ElementType):
+    DTYPES.update({
+        _types.UINT8: numpy.dtype(numpy.uint8),
+        _types.INT16: numpy.dtype(numpy.int16),
+        _types.INT32: numpy.dtype(numpy.int32),
+        _types.INT64: numpy.dtype(numpy.int64),
+        _types.FLOAT: numpy.dtype(numpy.float32),
+        _types.DOUBLE: numpy.dtype(numpy.float64),
+    })
+
+
+class _BytesView:
+    """
+    Exposes the memory of a GLib.Bytes through the NumPy array interface
+    and keeps the GLib.Bytes alive as long as an array uses it
+    """
+
+    def __init__(self, data, dtype):
+        self.data = data
+        address, size = GtkFlow.get_buffer_address(data)
+        self.__array_interface__ = {
+            "version": 3,
+            "shape": (size // dtype.itemsize,),
+            "typestr": dtype.str,
+            "data": (address or 0, True),
+        }
+
+
+def element_dtype(dock):
+    """
+    Returns the NumPy dtype of the elements of a buffer dock
+    """
+    return DTYPES[dock.props.element_type]
+
+
+def as_array(data, dtype=None):
+    """
+    Returns a read-only NumPy array sharing the memory of a GLib.Bytes or
+    of the current buffer of a BufferSource or BufferSink
+    """
+    if isinstance(data, _BUFFER_DOCKS):
+        dtype = dtype or element_dtype(data)
+        data = data.props.buffer
+    dtype = numpy.dtype(dtype or numpy.uint8)
+    if data is None or data.get_size() == 0:
+        return numpy.empty(0, dtype)
+    return numpy.asarray(_BytesView(data, dtype))
+
+
+def to_bytes(array):
+    """
+    Copies a NumPy array into a new GLib.Bytes. Contiguous arrays are
+    copied straight from their memory, other arrays are made contiguous
+    first.
+    """
+    array = numpy.ascontiguousarray(array)
+    return GtkFlow.copy_buffer(array.ctypes.data, array.nbytes)
+
+
+def set_array(source, array):
+    """
+    Sets an array as the new buffer of a BufferSource, converted to the
+    element type of the source. The array is copied once.
+    """
+    array = numpy.asarray(array, dtype=element_dtype(source))
+    source.set_buffer(to_bytes(array))
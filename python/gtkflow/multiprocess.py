@@ -0,0 +1,383 @@
+"""
+Running parts of a GFlow.Graph in a pool of worker processes
+
+Python nodes hold the GIL while they compute, so threads do not help
+CPU-heavy pipelines. A ProcessNode computes its outputs with a plain
+function that runs in another process instead. Its docks are ordinary
+GFlow docks, so the rest of the graph connects to it as to any other
+node; they mirror the values of the remote computation.
+
+Every ProcessNode starts out as a Partition of its own. Put several
+connected nodes into one Partition to run them in a single task: only
+the values crossing the border of the partition are sent to the worker,
+values between its nodes stay inside the worker process. Partitions run
+in parallel, so a graph with many of them uses all cores.
+
+Values are pickled. Buffers of SHARED_MEMORY_THRESHOLD bytes or more,
+e.g. GLib.Bytes, bytes or contiguous NumPy arrays, are passed through
+shared memory instead; functions receive them as memoryviews.
+
+Functions have to be picklable, i.e. defined at the top level of a
+module. Workers are started through a fork server, so they never inherit
+the state of GLib from the parent. Results are applied from the GLib main
+loop of the parent, which therefore has to be running. The nodes have to
+belong to a GFlow.Graph, which tells them when their inputs changed.
+"""
+
+import concurrent.futures
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+from gi.repository import GLib
+from gi.repository import GObject
+from gi.repository import GFlow
+
+SHARED_MEMORY_THRESHOLD = 64 * 1024
+
+_BYTES_TYPE = GLib.Bytes.__gtype__
+
+_executor = None
+
+
+def get_executor():
+    """
+    Returns the process pool shared by all partitions that have no
+    executor of their own, creating it with one worker per core
+    """
+    global _executor
+    if _executor is None:
+        _executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context("forkserver"))
+    return _executor
+
+
+def shutdown(wait=True):
+    """
+    Stops the shared process pool. It is created again when needed.
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait)
+        _executor = None
+
+
+class _Shared:
+    """
+    A picklable reference to a buffer in shared memory
+    """
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+
+
+def _encode(value, owned):
+    """
+    Moves large buffers into shared memory. The created blocks are
+    appended to owned.
+    """
+    if isinstance(value, GLib.Bytes):
+        value = value.get_data()
+    try:
+        view = memoryview(value)
+    except TypeError:
+        return value
+    if view.nbytes < SHARED_MEMORY_THRESHOLD:
+        return bytes(view) if isinstance(value, memoryview) else value
+    try:
+        view = view.cast("B")
+    except TypeError:
+        # Not contiguous
+        view = memoryview(view.tobytes())
+    shm = shared_memory.SharedMemory(create=True, size=view.nbytes)
+    owned.append(shm)
+    shm.buf[:view.nbytes] = view
+    return _Shared(shm.name, view.nbytes)
+
+
+def _release(blocks, unlink=False):
+    for shm in blocks:
+        try:
+            shm.close()
+        except BufferError:
+            # Somebody still looks at the buffer, leave it to the GC
+            pass
+        if unlink:
+            shm.unlink()
+
+
+def _run_steps(steps, inputs):
+    """
+    Runs in a worker. Evaluates the functions of a partition in
+    topological order and returns the outputs of all of them.
+    """
+    attached = []
+    try:
+        results = {}
+        for index, function, wiring, output_names in steps:
+            args = {}
+            for name, origin in wiring.items():
+                if origin is None:
+                    value = inputs[(index, name)]
+                    if isinstance(value, _Shared):
+                        shm = shared_memory.SharedMemory(name=value.name)
+                        attached.append(shm)
+                        value = shm.buf[:value.size]
+                    args[name] = value
+                else:
+                    args[name] = results[origin]
+            outputs = function(args)
+            for name in output_names:
+                if name not in outputs:
+                    raise KeyError("%s did not return the output %s" % (function.__name__, name))
+                results[(index, name)] = outputs[name]
+        owned = []
+        try:
+            encoded = {key: _encode(value, owned) for key, value in results.items()}
+        except BaseException:
+            _release(owned, unlink=True)
+            raise
+        # The parent unlinks the blocks once it read them
+        _release(owned)
+        return encoded
+    finally:
+        _release(attached)
+
+
+def _gtype_of(value):
+    if isinstance(value, GObject.Value):
+        return value.g_type
+    if isinstance(value, bool):
+        return GObject.TYPE_BOOLEAN
+    if isinstance(value, int):
+        return GObject.TYPE_INT if -2**31 <= value < 2**31 else GObject.TYPE_INT64
+    if isinstance(value, float):
+        return GObject.TYPE_DOUBLE
+    if isinstance(value, str):
+        return GObject.TYPE_STRING
+    if isinstance(value, (bytes, bytearray, memoryview, GLib.Bytes)):
+        return _BYTES_TYPE
+    raise TypeError("No GType known for %s" % type(value).__name__)
+
+
+def _to_gvalue(gtype, value):
+    if isinstance(value, GObject.Value):
+        return value
+    if gtype == _BYTES_TYPE and not isinstance(value, GLib.Bytes):
+        value = GLib.Bytes.new(bytes(memoryview(value)))
+    return GObject.Value(gtype, value)
+
+
+def _dock_value(dock):
+    value = dock.props.val
+    if isinstance(value, GObject.Value):
+        value = value.get_value()
+    return value
+
+
+class ProcessNode(GFlow.SimpleNode):
+    """
+    A node whose outputs are computed in a worker process
+
+    function is called with a dict mapping input names to values and
+    returns a dict mapping output names to values. inputs and outputs
+    map the dock names to initial values, which also determine the
+    types of the docks.
+    """
+
+    def __init__(self, function, inputs, outputs, name=None):
+        GFlow.SimpleNode.__init__(self)
+        self.props.name = name or function.__name__
+        self.function = function
+        self.inputs = {}
+        self.outputs = {}
+        self.output_types = {}
+        for dock_name, initial in inputs.items():
+            sink = GFlow.SimpleSink.new(_to_gvalue(_gtype_of(initial), initial))
+            sink.props.name = dock_name
+            self.add_sink(sink)
+            self.inputs[dock_name] = sink
+        for dock_name, initial in outputs.items():
+            gtype = _gtype_of(initial)
+            source = GFlow.SimpleSource.new(_to_gvalue(gtype, initial))
+            source.props.name = dock_name
+            self.add_source(source)
+            self.outputs[dock_name] = source
+            self.output_types[dock_name] = gtype
+        self.partition = None
+        Partition([self])
+        GObject.Object.connect(self, "evaluate", self._evaluate)
+
+    def _evaluate(self, node):
+        self.partition.submit()
+
+
+class Partition:
+    """
+    A set of ProcessNodes that is computed in a single worker task
+
+    Inputs arriving while the partition computes are coalesced. Once the
+    running computation is done, its result is dropped and the partition
+    computes again with the latest values.
+    """
+
+    def __init__(self, nodes, executor=None):
+        self.nodes = []
+        self.executor = executor
+        for node in nodes:
+            if not isinstance(node, ProcessNode):
+                raise TypeError("Only ProcessNodes can be partitioned")
+            if node.partition is not None:
+                node.partition.nodes.remove(node)
+            node.partition = self
+            self.nodes.append(node)
+        self._future = None
+        self._shared = []
+        self._scheduled = False
+        self._pending = False
+        self._publishing = False
+        # Computations started and results thrown away for newer inputs
+        self.runs = 0
+        self.stale = 0
+        self.last_error = None
+
+    @property
+    def busy(self):
+        return self._scheduled or self._future is not None
+
+    def submit(self):
+        """
+        Computes the partition with the current values of its inputs.
+        Calls within one main loop iteration are merged.
+        """
+        if self._publishing or not self.nodes:
+            return
+        if self._future is not None:
+            self._pending = True
+            return
+        if not self._scheduled:
+            self._scheduled = True
+            GLib.idle_add(self._start)
+
+    def _plan(self):
+        """
+        Sorts the nodes topologically and collects the values of the
+        sinks fed from outside the partition
+        """
+        index = {node: i for i, node in enumerate(self.nodes)}
+        wirings = []
+        in_degree = [0] * len(self.nodes)
+        successors = [[] for node in self.nodes]
+        for i, node in enumerate(self.nodes):
+            wiring = {}
+            for name, sink in node.inputs.items():
+                source = sink.props.source
+                upstream = source.props.node if source is not None else None
+                if upstream in index:
+                    wiring[name] = (index[upstream], source.props.name)
+                    in_degree[i] += 1
+                    successors[index[upstream]].append(i)
+                else:
+                    wiring[name] = None
+            wirings.append(wiring)
+        order = [i for i in range(len(self.nodes)) if in_degree[i] == 0]
+        for i in order:
+            for j in successors[i]:
+                in_degree[j] -= 1
+                if in_degree[j] == 0:
+                    order.append(j)
+        if len(order) != len(self.nodes):
+            raise ValueError("Partition contains a recursion")
+        steps = []
+        inputs = {}
+        for i in order:
+            node = self.nodes[i]
+            for name, origin in wirings[i].items():
+                if origin is None:
+                    inputs[(i, name)] = _encode(_dock_value(node.inputs[name]), self._shared)
+            steps.append((i, node.function, wirings[i], list(node.outputs.keys())))
+        return steps, inputs
+
+    def _start(self):
+        self._scheduled = False
+        self._pending = False
+        try:
+            steps, inputs = self._plan()
+        except Exception as e:
+            _release(self._shared, unlink=True)
+            self._shared = []
+            self.computation_failed(e)
+            return False
+        executor = self.executor or get_executor()
+        self.runs += 1
+        self._future = executor.submit(_run_steps, steps, inputs)
+        self._future.add_done_callback(
+            lambda future: GLib.idle_add(self._finished, future))
+        return False
+
+    def _finished(self, future):
+        self._future = None
+        _release(self._shared, unlink=True)
+        self._shared = []
+        try:
+            results = future.result()
+        except Exception as e:
+            if not self._pending:
+                self.computation_failed(e)
+            results = None
+        if results is not None:
+            results = self._decode(results)
+            if self._pending:
+                self.stale += 1
+            else:
+                self._publish(results)
+        if self._pending:
+            self._start()
+        return False
+
+    def _decode(self, results):
+        decoded = {}
+        for key, value in results.items():
+            if isinstance(value, _Shared):
+                shm = shared_memory.SharedMemory(name=value.name)
+                value = GLib.Bytes.new(bytes(shm.buf[:value.size]))
+                _release([shm], unlink=True)
+            decoded[key] = value
+        return decoded
+
+    def _publish(self, results):
+        graph = self.nodes[0].props.graph if self.nodes else None
+        # The nodes of this partition downstream of the changed
+        # values have been computed already
+        self._publishing = True
+        if graph is not None:
+            graph.begin()
+        try:
+            for (i, name), value in results.items():
+                node = self.nodes[i]
+                node.outputs[name].set_value(_to_gvalue(node.output_types[name], value))
+        finally:
+            if graph is not None:
+                graph.commit()
+            self._publishing = False
+
+    def computation_failed(self, error):
+        """
+        Called with the exception the computation raised.
+        Invalidates the outputs of the partition.
+        """
+        self.last_error = error
+        for node in self.nodes:
+            for source in node.outputs.values():
+                source.invalidate()
+
+
+def wait(partitions, context=None):
+    """
+    Runs the GLib main loop until none of the given partitions is busy
+    """
+    context = context or GLib.MainContext.default()
+    while any(p.busy for p in partitions):
+        context.iteration(True)
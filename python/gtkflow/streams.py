@@ -0,0 +1,97 @@
+"""
+Generator style access to GFlow.StreamSource and GFlow.StreamSink
+
+chunks() iterates over the chunks queued in a stream sink and runs the
+GLib main loop while it waits for more, until the source closes the
+stream. achunks() does the same as an asynchronous generator for
+asyncio running on the GLib main loop, see gtkflow.aio.
+
+write() and awrite() hand data to a stream source chunk by chunk and
+wait whenever a sink is full, so producers never outrun the slowest
+consumer.
+"""
+
+import asyncio
+
+from gi.repository import GLib
+from gi.repository import GObject
+from gi.repository import GFlow
+
+
+def _split(source, data):
+    size = source.props.chunk_size
+    if size == 0 or len(data) <= size:
+        return [data]
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def chunks(sink, context=None):
+    """
+    Yields the chunks of a stream sink as bytes until the stream ends
+    """
+    context = context or GLib.MainContext.default()
+    while True:
+        chunk = sink.pop()
+        if chunk is not None:
+            yield chunk.get_data()
+        elif sink.props.at_end:
+            return
+        else:
+            context.iteration(True)
+
+
+async def achunks(sink):
+    """
+    Yields the chunks of a stream sink as bytes until the stream ends,
+    awaiting new chunks instead of blocking
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = sink.pop()
+        if chunk is not None:
+            yield chunk.get_data()
+            continue
+        if sink.props.at_end:
+            return
+        future = loop.create_future()
+        def wake(_sink):
+            if not future.done():
+                future.set_result(None)
+        # Docks have a connect() method of their own
+        handler = GObject.Object.connect(sink, "chunk-available", wake)
+        try:
+            await future
+        finally:
+            GObject.signal_handler_disconnect(sink, handler)
+
+
+def write(source, data, context=None):
+    """
+    Writes bytes to a stream source, running the GLib main loop
+    while the sinks are full
+    """
+    context = context or GLib.MainContext.default()
+    for part in _split(source, data):
+        chunk = GLib.Bytes.new(part)
+        while not source.try_write(chunk):
+            context.iteration(True)
+
+
+async def awrite(source, data):
+    """
+    Writes bytes to a stream source, awaiting room in the sinks
+    instead of blocking
+    """
+    loop = asyncio.get_running_loop()
+    for part in _split(source, data):
+        chunk = GLib.Bytes.new(part)
+        while not source.try_write(chunk):
+            future = loop.create_future()
+            def wake(_source):
+                if not future.done():
+                    future.set_result(None)
+            handler = GObject.Object.connect(source, "writable", wake)
+            try:
+                await future
+            finally:
+                GObject.signal_handler_disconnect(source, handler)
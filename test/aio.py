@@ -0,0 +1,164 @@
+#!/usr/bin/python3
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python"))
+
+from gi.repository import GtkFlow
+
+from gtkflow.aio import AsyncNode, LatestValueRunner, iterate_glib
+
+"""
+A local stand-in for a slow network service: answers every line with
+the uppercased line after a delay
+"""
+class UppercaseService:
+    def __init__(self, delay):
+        self.delay = delay
+        self.requests = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        line = await reader.readline()
+        self.requests += 1
+        await asyncio.sleep(self.delay)
+        writer.write(line.upper())
+        await writer.drain()
+        writer.close()
+
+    async def query(self, text):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write((text + "\n").encode())
+        await writer.drain()
+        answer = await reader.readline()
+        writer.close()
+        return answer.decode().strip()
+
+
+class UppercaseNode(AsyncNode):
+    def __init__(self, service):
+        AsyncNode.__init__(self)
+        self.service = service
+        self.add_input("text", GtkFlow.Sink.new(""))
+        self.add_output("upper", GtkFlow.Source.new(""))
+
+    async def compute(self, inputs):
+        return {"upper": await self.service.query(inputs["text"])}
+
+
+class TestLatestValueRunner(unittest.TestCase):
+    def run_async(self, coroutine):
+        return asyncio.run(coroutine)
+
+    """
+    Only the latest of values arriving faster than they can be computed
+    gets published
+    """
+    def test_latest_value(self):
+        async def scenario():
+            service = UppercaseService(0.05)
+            await service.start()
+            published = []
+            runner = LatestValueRunner(service.query, published.append)
+            for text in ["a", "b", "c", "d"]:
+                runner.submit(text)
+                await asyncio.sleep(0.01)
+            await runner.join()
+            await service.stop()
+            return runner, published
+
+        runner, published = self.run_async(scenario())
+        self.assertEqual(published, ["D"])
+        self.assertEqual(runner.stale, 3)
+
+    """
+    Without restarting, running computations finish but stale results
+    are dropped, and values in between are never computed
+    """
+    def test_no_restart(self):
+        async def scenario():
+            service = UppercaseService(0.05)
+            await service.start()
+            published = []
+            runner = LatestValueRunner(service.query, published.append, restart=False)
+            runner.submit("a")
+            await asyncio.sleep(0.01)
+            runner.submit("b")
+            runner.submit("c")
+            await runner.join()
+            await service.stop()
+            return runner, service, published
+
+        runner, service, published = self.run_async(scenario())
+        self.assertEqual(published, ["C"])
+        self.assertEqual(runner.dropped, 1)
+        self.assertEqual(service.requests, 2)
+
+    """
+    Errors raised by the computation are reported and don't stop the runner
+    """
+    def test_error(self):
+        errors = []
+        async def compute(value):
+            if value < 0:
+                raise ValueError(value)
+            return value * 2
+
+        async def scenario():
+            published = []
+            runner = LatestValueRunner(compute, published.append, on_error=errors.append)
+            runner.submit(-1)
+            await runner.join()
+            runner.submit(2)
+            await runner.join()
+            return published
+
+        self.assertEqual(self.run_async(scenario()), [4])
+        self.assertEqual(len(errors), 1)
+
+    """
+    Without a loop, submitting outside a running asyncio loop fails
+    instead of picking up some other loop
+    """
+    def test_no_running_loop(self):
+        async def compute(value):
+            return value
+
+        runner = LatestValueRunner(compute, lambda result: None)
+        with self.assertRaises(RuntimeError):
+            runner.submit(1)
+
+
+class TestAsyncNode(unittest.TestCase):
+    """
+    An async node publishes the result of its computation to its source
+    """
+    def test_async_node(self):
+        async def scenario():
+            glib = asyncio.ensure_future(iterate_glib())
+            service = UppercaseService(0.01)
+            await service.start()
+            node = UppercaseNode(service)
+            src = GtkFlow.Source.new("")
+            src.set_valid()
+            src.add_sink(node.get_sinks()[0])
+            snk = GtkFlow.Sink.new("")
+            node.get_sources()[0].add_sink(snk)
+            src.set_value("first")
+            src.set_value("second")
+            await node.runner.join()
+            await service.stop()
+            glib.cancel()
+            return snk.get_value()
+
+        self.assertEqual(asyncio.run(scenario()), "SECOND")
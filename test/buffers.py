@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python"))
+
+from gi.repository import GLib
+from gi.repository import GFlow
+from gi.repository import GtkFlow
+
+try:
+    import numpy
+    from gtkflow.buffers import as_array, set_array
+except ImportError:
+    numpy = None
+
+@unittest.skipIf(numpy is None, "NumPy is not available")
+class TestBufferDocks(unittest.TestCase):
+    """
+    Tests that all sinks share the buffer of their source
+    """
+    def test_fan_out(self):
+        src = GtkFlow.BufferSource.new(GtkFlow.ElementType.DOUBLE)
+        sinks = [GtkFlow.BufferSink.new(GtkFlow.ElementType.DOUBLE) for x in range(0,3)]
+        for snk in sinks:
+            src.add_sink(snk)
+        set_array(src, numpy.linspace(0.0, 1.0, 5))
+        arrays = [as_array(snk) for snk in sinks]
+        for a in arrays:
+            self.assertEqual(a.dtype, numpy.float64)
+            self.assertEqual(len(a), 5)
+            self.assertEqual(a[4], 1.0)
+            self.assertFalse(a.flags.writeable)
+        self.assertEqual(arrays[0].ctypes.data, arrays[1].ctypes.data)
+        self.assertEqual(arrays[0].ctypes.data, as_array(src).ctypes.data)
+
+    """
+    Tests that an array stays valid after a new buffer arrived
+    """
+    def test_keep_alive(self):
+        src = GtkFlow.BufferSource.new(GtkFlow.ElementType.INT32)
+        snk = GtkFlow.BufferSink.new(GtkFlow.ElementType.INT32)
+        src.add_sink(snk)
+        set_array(src, [1, 2, 3])
+        a = as_array(snk)
+        set_array(src, [4])
+        self.assertEqual(list(a), [1, 2, 3])
+        self.assertEqual(list(as_array(snk)), [4])
+
+    """
+    Tests that buffers of different element types do not connect
+    """
+    def test_element_types(self):
+        src = GtkFlow.BufferSource.new(GtkFlow.ElementType.FLOAT)
+        snk = GtkFlow.BufferSink.new(GtkFlow.ElementType.DOUBLE)
+        with self.assertRaises(GLib.Error):
+            snk.set_source(src)
+        with self.assertRaises(GLib.Error):
+            src.set_buffer(GLib.Bytes.new(b"abc"))
+
+    """
+    Tests that the buffer docks of GFlow are supported as well
+    """
+    def test_gflow_docks(self):
+        src = GFlow.BufferSource.new(GFlow.ElementType.INT16)
+        snk = GFlow.BufferSink.new(GFlow.ElementType.INT16)
+        src.add_sink(snk)
+        array = numpy.arange(4, dtype=numpy.int16)
+        set_array(src, array[::-1])
+        a = as_array(snk)
+        self.assertEqual(a.dtype, numpy.int16)
+        self.assertEqual(list(a), [3, 2, 1, 0])
+        self.assertNotEqual(a.ctypes.data, array.ctypes.data)
+        self.assertEqual(a.ctypes.data, as_array(src).ctypes.data)
@@ -1,8 +1,10 @@
 #!/usr/bin/python3
 
+import time
 import unittest
 
 from gi.repository import GLib
+from gi.repository import GObject
 from gi.repository import GtkFlow
 
 
@@ -29,6 +31,19 @@ class TestSinkSource(unittest.TestCase):
             snk = GtkFlow.Sink.new(0)
             src.add_sink(snk)
 
+    """
+    Tests that values are converted into the type of a sink
+    that accepts them
+    """
+    def test_conversion(self):
+        src = GtkFlow.Source.new(1)
+        snk = GtkFlow.Sink.new(0.0)
+        src.add_sink(snk)
+        src.set_value(3)
+        self.assertEqual(snk.get_value(), 3.0)
+        self.assertTrue(GtkFlow.can_convert(GObject.TYPE_INT, GObject.TYPE_DOUBLE))
+        self.assertFalse(GtkFlow.can_convert(GObject.TYPE_DOUBLE, GObject.TYPE_INT))
+
     """
     Tests if a value-update gets transported from source to sink
     """
@@ -74,3 +89,61 @@ class TestSinkSource(unittest.TestCase):
             with self.assertRaises(GLib.Error) as err:
                 v = snk.get_value()
 
+
+    def run_until(self, condition, timeout=5.0):
+        context = GLib.MainContext.default()
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            context.iteration(False)
+            time.sleep(0.001)
+
+    def create_policy_docks(self, policy, interval):
+        src = GtkFlow.Source.new(0)
+        src.props.update_policy = policy
+        src.props.update_interval = interval
+        snk = GtkFlow.Sink.new(0)
+        src.add_sink(snk)
+        values = []
+        snk.connect("changed", lambda dock, val: values.append(val))
+        return src, values
+
+    """
+    Tests that a coalescing source passes on the latest value once idle
+    """
+    def test_coalesce(self):
+        src, values = self.create_policy_docks(GtkFlow.UpdatePolicy.COALESCE, 0)
+        for i in range(1, 101):
+            src.set_value(i)
+        self.assertEqual(values, [])
+        self.run_until(lambda: values)
+        self.assertEqual(values, [100])
+
+    """
+    Tests that a throttling source passes on the first value right away
+    and the latest one at the end of the interval
+    """
+    def test_throttle(self):
+        src, values = self.create_policy_docks(GtkFlow.UpdatePolicy.THROTTLE, 50)
+        for i in range(1, 4):
+            src.set_value(i)
+        self.assertEqual(values, [1])
+        self.run_until(lambda: len(values) == 2)
+        self.assertEqual(values, [1, 3])
+
+    """
+    Tests that a debouncing source passes on a value once no new one
+    has been set for the interval, or when flushed
+    """
+    def test_debounce(self):
+        src, values = self.create_policy_docks(GtkFlow.UpdatePolicy.DEBOUNCE, 10)
+        for i in range(1, 4):
+            src.set_value(i)
+        self.assertEqual(values, [])
+        src.flush()
+        self.assertEqual(values, [3])
+        src.flush()
+        self.assertEqual(values, [3])
+        src.set_value(4)
+        src.set_value(5)
+        self.run_until(lambda: len(values) == 2)
+        self.assertEqual(values, [3, 5])
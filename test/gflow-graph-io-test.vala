@@ -0,0 +1,106 @@
+/* -*- Mode: vala; indent-tabs-mode: nil; c-basic-offset: 2; tab-width: 2 -*-  */
+/* GFlowTest
+ *
+ * Copyright (C) 2015 Daniel Espinosa <esodan@gmail.com>
+ *
+ * librescl is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU General Public License as published by the
+ * Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ * 
+ * librescl is distributed in the hope that it will be useful, but
+ * WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+ * See the GNU General Public License for more details.
+ * 
+ * You should have received a copy of the GNU General Public License along
+ * with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+using GFlow;
+
+public class GFlowTest.GraphIOTest
+{
+  // Builds a -> b, where b also has an unconnected string sink
+  public static GFlow.Graph create_graph ()
+  {
+    var g = new GFlow.Graph ();
+    var a = new GFlow.SimpleNode ();
+    a.name = "a";
+    var b = new GFlow.SimpleNode ();
+    b.name = "b";
+    Value initial = Value (typeof (int));
+    initial.set_int (3);
+    var src = new GFlow.SimpleSource (initial);
+    src.name = "out";
+    var snk = new GFlow.SimpleSink (initial);
+    snk.name = "in";
+    Value text = "hello";
+    var label = new GFlow.SimpleSink (text);
+    label.name = "label";
+    try {
+      a.add_source (src);
+      b.add_sink (snk);
+      b.add_sink (label);
+      // Add b first, so the file order differs from the insertion order
+      g.add_node (b);
+      g.add_node (a);
+      snk.connect (src);
+    } catch (GLib.Error e) { assert_not_reached (); }
+    return g;
+  }
+
+  public static void check_graph (GFlow.Graph g)
+  {
+    assert (g.get_nodes ().length () == 2);
+    var nodes = g.get_sorted_nodes ();
+    assert (nodes[0].name == "a");
+    assert (nodes[1].name == "b");
+    var src = nodes[0].get_dock ("out") as GFlow.Source;
+    var snk = nodes[1].get_dock ("in") as GFlow.Sink;
+    var label = nodes[1].get_dock ("label") as GFlow.Sink;
+    assert (src != null);
+    assert (snk != null);
+    assert (label != null);
+    assert (snk.source == src);
+    assert (src.initial.get_int () == 3);
+    assert (label.initial.get_string () == "hello");
+  }
+
+  public static void add_tests ()
+  {
+    Test.add_func ("/gflow/graph-io/text",
+    () => {
+      try {
+        var stream = new MemoryOutputStream.resizable ();
+        new GFlow.GraphWriter ().write (create_graph (), stream);
+        stream.close ();
+        var g = new GFlow.Graph ();
+        new GFlow.GraphReader ().read (g, new MemoryInputStream.from_bytes (stream.steal_as_bytes ()));
+        check_graph (g);
+      } catch (GLib.Error e) { assert_not_reached (); }
+    });
+    Test.add_func ("/gflow/graph-io/binary",
+    () => {
+      try {
+        string path;
+        FileUtils.close (FileUtils.open_tmp ("gflow-test-XXXXXX.graph", out path));
+        var stream = File.new_for_path (path).replace (null, false, FileCreateFlags.NONE);
+        new GFlow.GraphWriter ().write_binary (create_graph (), stream);
+        stream.close ();
+        var g = new GFlow.Graph ();
+        new GFlow.GraphReader ().read_mapped (g, path);
+        FileUtils.unlink (path);
+        check_graph (g);
+      } catch (GLib.Error e) { assert_not_reached (); }
+    });
+    Test.add_func ("/gflow/graph-io/invalid",
+    () => {
+      var data = new MemoryInputStream.from_data ("no graph\n".data, null);
+      try {
+        new GFlow.GraphReader ().read (new GFlow.Graph (), data);
+        assert_not_reached ();
+      } catch (GFlow.FormatError e) {
+      } catch (GLib.Error e) { assert_not_reached (); }
+    });
+  }
+}
@@ -0,0 +1,486 @@
+/* -*- Mode: vala; indent-tabs-mode: nil; c-basic-offset: 2; tab-width: 2 -*-  */
+/* GFlowTest
+ *
+ * Copyright (C) 2015 Daniel Espinosa <esodan@gmail.com>
+ *
+ * librescl is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU General Public License as published by the
+ * Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ * 
+ * librescl is distributed in the hope that it will be useful, but
+ * WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+ * See the GNU General Public License for more details.
+ * 
+ * You should have received a copy of the GNU General Public License along
+ * with this program.  If not, see <http://www.gnu.org/licenses/>.
+ */
+using GFlow;
+
+/**
+ * Sums up all its inputs and counts how often it has been evaluated
+ */
+public class GFlowTest.SumNode : GFlow.SimpleNode
+{
+  public int evaluations = 0;
+  public GFlow.SimpleSource output;
+
+  public SumNode (int n_inputs)
+  {
+    Value initial = Value (typeof (int));
+    initial.set_int (0);
+    output = new GFlow.SimpleSource (initial);
+    try {
+      add_source (output);
+      for (int i = 0; i < n_inputs; i++)
+        add_sink (new GFlow.SimpleSink (initial));
+    } catch (GLib.Error e) { warning (e.message); }
+    evaluate.connect (() => {
+      evaluations++;
+      int total = 0;
+      foreach (Sink s in get_sinks ())
+        total += s.val.get_int ();
+      Value sum = Value (typeof (int));
+      sum.set_int (total);
+      try { output.set_value (sum); } catch (GLib.Error e) { warning (e.message); }
+    });
+  }
+
+  public Sink input (int i)
+  {
+    return get_sinks ().nth_data (i);
+  }
+}
+
+/**
+ * Squares its input on a worker thread
+ */
+public class GFlowTest.SquareNode : GFlow.SimpleNode, GFlow.Computable
+{
+  public GFlow.SimpleSource output;
+  public GFlow.SimpleSink input;
+  public int computations = 0;
+
+  public SquareNode ()
+  {
+    Value initial = Value (typeof (int));
+    initial.set_int (0);
+    output = new GFlow.SimpleSource (initial);
+    output.name = "square";
+    input = new GFlow.SimpleSink (initial);
+    input.name = "value";
+    try {
+      add_source (output);
+      add_sink (input);
+    } catch (GLib.Error e) { warning (e.message); }
+  }
+
+  public HashTable<string, Value?> compute (HashTable<string, Value?> inputs,
+                                            Cancellable cancellable) throws GLib.Error
+  {
+    Thread.usleep (10000);
+    AtomicInt.inc (ref computations);
+    int v = inputs.lookup ("value").get_int ();
+    Value result = Value (typeof (int));
+    result.set_int (v * v);
+    var outputs = new HashTable<string, Value?> (str_hash, str_equal);
+    outputs.insert ("square", result);
+    return outputs;
+  }
+}
+
+public class GFlowTest.GraphTest
+{
+  // Builds a -> b, a -> c, (b, c) -> d
+  public static GFlow.Graph create_diamond (out SumNode a, out SumNode b,
+                                            out SumNode c, out SumNode d)
+  {
+    var g = new GFlow.Graph ();
+    a = new SumNode (0);
+    b = new SumNode (1);
+    c = new SumNode (1);
+    d = new SumNode (2);
+    try {
+      b.input (0).connect (a.output);
+      c.input (0).connect (a.output);
+      d.input (0).connect (b.output);
+      d.input (1).connect (c.output);
+      g.add_node (a);
+      g.add_node (b);
+      g.add_node (c);
+      g.add_node (d);
+    } catch (GLib.Error e) { assert_not_reached (); }
+    return g;
+  }
+
+  public static void add_tests ()
+  {
+    Test.add_func ("/gflow/graph", 
+    () => {
+      var g = new GFlow.Graph ();
+      var n = new GFlow.SimpleNode ();
+      assert (n.graph == null);
+      assert (g.get_nodes ().length () == 0);
+      try { g.add_node (n); } catch { assert_not_reached (); }
+      assert (n.graph == g);
+      assert (g.has_node (n));
+      try {
+        g.add_node (n);
+        assert_not_reached ();
+      } catch {}
+      try { g.remove_node (n); } catch { assert_not_reached (); }
+      assert (n.graph == null);
+      assert (!g.has_node (n));
+    });
+    Test.add_func ("/gflow/graph/finalize",
+    () => {
+      SumNode a, b, c, d;
+      var g = create_diamond (out a, out b, out c, out d);
+      g = null;
+      assert (a.graph == null);
+      assert (d.graph == null);
+      var v = Value (typeof (int));
+      v.set_int (1);
+      try { a.output.set_value (v); } catch { assert_not_reached (); }
+    });
+    Test.add_func ("/gflow/graph/diamond", 
+    () => {
+      SumNode a, b, c, d;
+      var g = create_diamond (out a, out b, out c, out d);
+      assert (g.get_nodes ().length () == 4);
+      Value v = Value (typeof (int));
+      v.set_int (1);
+      try { a.output.set_value (v); } catch { assert_not_reached (); }
+      assert (b.evaluations == 1);
+      assert (c.evaluations == 1);
+      assert (d.evaluations == 1);
+      assert (d.output.val.get_int () == 2);
+    });
+    Test.add_func ("/gflow/graph/edges",
+    () => {
+      SumNode a, b, c, d;
+      var g = create_diamond (out a, out b, out c, out d);
+      assert (g.n_edges == 4);
+      assert (g.get_edges ().length == 4);
+      var successors = g.get_successors (a);
+      assert (successors.length == 2);
+      assert (successors[0] == b || successors[1] == b);
+      assert (successors[0] == c || successors[1] == c);
+      var predecessors = g.get_predecessors (d);
+      assert (predecessors.length == 2);
+      assert (g.get_incoming_edges (a).length == 0);
+      assert (g.get_node_edges (b).length == 2);
+      Edge? e = g.get_edge (d.input (0));
+      assert (e != null);
+      assert (e.source == b.output);
+      assert (e.from == b);
+      assert (e.to == d);
+      // Snapshots don't change with the graph
+      var snapshot = g.get_edges ();
+      try {
+        d.input (1).disconnect (c.output);
+      } catch (GLib.Error err) { assert_not_reached (); }
+      assert (snapshot.length == 4);
+      assert (g.n_edges == 3);
+      assert (g.get_edge (d.input (1)) == null);
+      assert (g.get_outgoing_edges (c).length == 0);
+      assert (g.get_predecessors (d).length == 1);
+      try {
+        g.remove_node (a);
+      } catch (GLib.Error err) { assert_not_reached (); }
+      assert (g.n_edges == 1);
+      assert (g.get_incoming_edges (b).length == 0);
+      try {
+        g.add_node (a);
+      } catch (GLib.Error err) { assert_not_reached (); }
+      assert (g.n_edges == 3);
+      assert (g.get_successors (a).length == 2);
+    });
+    Test.add_func ("/gflow/graph/transaction", 
+    () => {
+      SumNode a, b, c, d;
+      var g = create_diamond (out a, out b, out c, out d);
+      Value v = Value (typeof (int));
+      g.begin ();
+      assert (g.in_transaction);
+      try {
+        for (int i = 1; i <= 3; i++) {
+          v.set_int (i);
+          a.output.set_value (v);
+        }
+      } catch { assert_not_reached (); }
+      assert (b.evaluations == 0);
+      assert (d.evaluations == 0);
+      g.commit ();
+      assert (!g.in_transaction);
+      assert (b.evaluations == 1);
+      assert (c.evaluations == 1);
+      assert (d.evaluations == 1);
+      assert (d.output.val.get_int () == 6);
+    });
+    Test.add_func ("/gflow/graph/freeze",
+    () => {
+      var g = new GFlow.Graph ();
+      var a = new SumNode (0);
+      Value v = Value (typeof (int));
+      v.set_int (7);
+      try {
+        g.add_node (a);
+        a.output.set_valid ();
+        a.output.set_value (v);
+      } catch { assert_not_reached (); }
+      var nodes = new GenericArray<SumNode> ();
+      g.freeze ();
+      assert (g.frozen);
+      try {
+        for (int i = 0; i < 100; i++) {
+          var n = new SumNode (1);
+          g.add_node (n);
+          n.input (0).connect (a.output);
+          nodes.add (n);
+        }
+      } catch { assert_not_reached (); }
+      assert (nodes[0].evaluations == 0);
+      assert (nodes[0].input (0).val.get_int () == 0);
+      g.thaw ();
+      assert (!g.frozen);
+      assert (!g.in_transaction);
+      for (int i = 0; i < nodes.length; i++) {
+        assert (nodes[i].evaluations == 1);
+        assert (nodes[i].output.val.get_int () == 7);
+      }
+    });
+    Test.add_func ("/gflow/graph/threads",
+    () => {
+      var g = new GFlow.Graph ();
+      g.max_threads = 2;
+      var a = new SumNode (0);
+      var b = new SquareNode ();
+      var c = new SquareNode ();
+      var loop = new MainLoop ();
+      int computed = 0;
+      g.computed.connect ((n) => {
+        if (++computed == 2)
+          loop.quit ();
+      });
+      uint watchdog = Timeout.add_seconds (5, () => {
+        assert_not_reached ();
+      });
+      try {
+        g.add_node (a);
+        g.add_node (b);
+        g.add_node (c);
+        b.input.connect (a.output);
+        c.input.connect (a.output);
+        Value v = Value (typeof (int));
+        v.set_int (2);
+        a.output.set_value (v);
+        // Supersedes the computations started for the previous value
+        v.set_int (3);
+        a.output.set_value (v);
+      } catch (GLib.Error e) { assert_not_reached (); }
+      assert (g.pending_computations == 2);
+      loop.run ();
+      Source.remove (watchdog);
+      assert (computed == 2);
+      assert (b.output.val.get_int () == 9);
+      assert (c.output.val.get_int () == 9);
+      assert (g.pending_computations == 0);
+    });
+    Test.add_func ("/gflow/graph/memoize",
+    () => {
+      var g = new GFlow.Graph ();
+      g.memoize = true;
+      var a = new SumNode (0);
+      var b = new SquareNode ();
+      var c = new SquareNode ();
+      try {
+        g.add_node (a);
+        g.add_node (b);
+        g.add_node (c);
+        b.input.connect (a.output);
+        c.input.connect (b.output);
+        Value v = Value (typeof (int));
+        v.set_int (2);
+        a.output.set_value (v);
+        v.set_int (3);
+        a.output.set_value (v);
+        v.set_int (2);
+        a.output.set_value (v);
+        assert (b.computations == 2);
+        assert (b.output.val.get_int () == 4);
+        assert (c.output.val.get_int () == 16);
+        assert (g.memo_hits == 2);
+        assert (g.memo_misses == 4);
+        // The remembered output equals the current one, so c is left alone
+        a.output.set_value (v);
+        assert (b.computations == 2);
+        assert (c.computations == 2);
+        assert (g.memo_hits == 3);
+        g.memo_max_entries = 1;
+        g.clear_memo ();
+        assert (g.memo_hits == 0);
+        v.set_int (3);
+        a.output.set_value (v);
+        v.set_int (2);
+        a.output.set_value (v);
+        assert (b.computations == 4);
+      } catch (GLib.Error e) { assert_not_reached (); }
+    });
+    Test.add_func ("/gflow/graph/memoize/uncacheable",
+    () => {
+      var g = new GFlow.Graph ();
+      g.memoize = true;
+      var a = new SumNode (0);
+      var b = new SquareNode ();
+      try {
+        Value extra = Value (typeof (Bytes));
+        extra.set_boxed (new Bytes ({ 1, 2, 3 }));
+        var sink = new GFlow.SimpleSink (extra);
+        sink.name = "extra";
+        b.add_sink (sink);
+        g.add_node (a);
+        g.add_node (b);
+        b.input.connect (a.output);
+        Value v = Value (typeof (int));
+        v.set_int (2);
+        a.output.set_value (v);
+        v.set_int (3);
+        a.output.set_value (v);
+        v.set_int (2);
+        a.output.set_value (v);
+        assert (b.computations == 3);
+        assert (g.memo_hits == 0);
+        assert (g.memo_misses == 0);
+        assert (g.memo_uncacheable == 3);
+        g.clear_memo ();
+        assert (g.memo_uncacheable == 0);
+      } catch (GLib.Error e) { assert_not_reached (); }
+    });
+    Test.add_func ("/gflow/graph/pull",
+    () => {
+      SumNode a, b, c, d;
+      var g = create_diamond (out a, out b, out c, out d);
+      g.evaluation_mode = GFlow.EvaluationMode.PULL;
+      try {
+        Value v = Value (typeof (int));
+        for (int i = 1; i <= 3; i++) {
+          v.set_int (i);
+          a.output.set_value (v);
+        }
+      } catch (GLib.Error e) { assert_not_reached (); }
+      assert (b.evaluations == 0);
+      assert (c.evaluations == 0);
+      assert (d.evaluations == 0);
+      // Only the upstream part of the read value is evaluated
+      assert (b.output.val.get_int () == 3);
+      assert (b.evaluations == 1);
+      assert (c.evaluations == 0);
+      assert (d.evaluations == 0);
+      assert (d.input (1).val.get_int () == 3);
+      assert (c.evaluations == 1);
+      assert (d.evaluations == 0);
+      assert (d.output.val.get_int () == 6);
+      assert (d.output.val.get_int () == 6);
+      assert (b.evaluations == 1);
+      assert (c.evaluations == 1);
+      assert (d.evaluations == 1);
+      try {
+        Value v = Value (typeof (int));
+        v.set_int (4);
+        a.output.set_value (v);
+      } catch (GLib.Error e) { assert_not_reached (); }
+      // Switching back to push mode brings everything up to date
+      g.evaluation_mode = GFlow.EvaluationMode.PUSH;
+      assert (b.evaluations == 2);
+      assert (c.evaluations == 2);
+      assert (d.evaluations == 2);
+      assert (d.output.val.get_int () == 8);
+    });
+    Test.add_func ("/gflow/graph/profiling",
+    () => {
+      SumNode a, b, c, d;
+      var g = create_diamond (out a, out b, out c, out d);
+      g.profiling = true;
+      uint evaluated = 0;
+      g.profiler.node_evaluated.connect (() => { evaluated++; });
+      try {
+        Value v = Value (typeof (int));
+        v.set_int (1);
+        a.output.set_value (v);
+        v.set_int (2);
+        a.output.set_value (v);
+      } catch (GLib.Error e) { assert_not_reached (); }
+      assert (evaluated == 6);
+      assert (g.profiler.propagations == 2);
+      assert (g.profiler.last_fan_out == 3);
+      assert (g.profiler.max_fan_out == 3);
+      assert (g.profiler.get_stats (a) == null);
+      assert (g.profiler.get_stats (d).evaluations == 2);
+      assert (g.profiler.get_nodes ().length () == 3);
+      var stream = new MemoryOutputStream.resizable ();
+      try {
+        g.profiler.write_trace (stream);
+        stream.write ({0});
+      } catch (GLib.Error e) { assert_not_reached (); }
+      string trace = (string) stream.get_data ();
+      assert (trace.has_prefix ("{\"traceEvents\": ["));
+      assert ("\"cat\": \"evaluate\"" in trace);
+      assert ("\"cat\": \"propagate\"" in trace);
+      // Nothing is recorded while profiling is off
+      g.profiling = false;
+      g.profiler.reset ();
+      try {
+        Value v = Value (typeof (int));
+        v.set_int (3);
+        a.output.set_value (v);
+      } catch (GLib.Error e) { assert_not_reached (); }
+      assert (g.profiler.propagations == 0);
+      assert (g.profiler.get_stats (d) == null);
+    });
+    Test.add_func ("/gflow/graph/recursion", 
+    () => {
+      SumNode a, b, c, d;
+      var g = create_diamond (out a, out b, out c, out d);
+      assert (g.is_reachable (a, d));
+      assert (!g.is_reachable (d, a));
+      assert (!g.is_reachable (b, c));
+      assert (b.is_recursive (d));
+      assert (!d.is_recursive (b));
+      assert (b.is_recursive (b));
+      assert (!b.is_recursive (b, true));
+      var feedback = new GFlow.SimpleSink (a.output.initial);
+      try { a.add_sink (feedback); } catch { assert_not_reached (); }
+      try {
+        feedback.connect (d.output);
+        assert_not_reached ();
+      } catch (GLib.Error e) {
+        assert (e is NodeError.RECURSIVE_CONNECTION);
+      }
+      assert (!feedback.is_connected ());
+    });
+    Test.add_func ("/gflow/graph/recursion/chain", 
+    () => {
+      // Add a long chain to the graph back to front, so every
+      // connection forces the topological order to be updated
+      var g = new GFlow.Graph ();
+      var nodes = new GenericArray<SumNode> ();
+      for (int i = 0; i < 2000; i++)
+        nodes.add (new SumNode (1));
+      try {
+        for (int i = nodes.length - 1; i >= 0; i--)
+          g.add_node (nodes[i]);
+        for (int i = nodes.length - 2; i >= 0; i--)
+          nodes[i + 1].input (0).connect (nodes[i].output);
+      } catch { assert_not_reached (); }
+      assert (g.is_reachable (nodes[0], nodes[nodes.length - 1]));
+      assert (!g.is_reachable (nodes[nodes.length - 1], nodes[0]));
+      Value v = Value (typeof (int));
+      v.set_int (1);
+      try { nodes[0].output.set_value (v); } catch { assert_not_reached (); }
+      assert (nodes[nodes.length - 1].evaluations == 1);
+      assert (nodes[nodes.length - 1].output.val.get_int () == 1);
+    });
+  }
+}
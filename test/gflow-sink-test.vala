@@ -39,6 +39,43 @@ public class GFlowTest.SinkTest
       assert (s.source == null);
       assert (!s.is_connected ());
     });
+    Test.add_func ("/gflow/sink/reconnect",
+    () => {
+      try {
+        var src = new GFlow.SimpleSource (0);
+        var other = new GFlow.SimpleSource (0);
+        var fresh = new GFlow.SimpleSink (0);
+        var snk = new GFlow.SimpleSink (0);
+        int fresh_changes = 0, changes = 0;
+        fresh.changed.connect (() => { fresh_changes++; });
+        snk.changed.connect (() => { changes++; });
+        fresh.connect (src);
+        for (int i = 0; i < 100; i++) {
+          snk.connect (src);
+          snk.disconnect (src);
+          // Disconnecting from the source side releases the sink as well
+          snk.connect (src);
+          src.disconnect (snk);
+          assert (snk.source == null);
+        }
+        // Connecting from the source side is seen by the sink
+        src.connect (snk);
+        assert (snk.source == src);
+        snk.connect (other);
+        assert (!src.is_connected_to (snk));
+        changes = 0;
+        fresh_changes = 0;
+        src.set_value (1);
+        assert (changes == 0);
+        assert (snk.val.get_int () == 0);
+        snk.connect (src);
+        changes = 0;
+        fresh_changes = 0;
+        src.set_value (2);
+        assert (changes == fresh_changes);
+        assert (snk.val.get_int () == 2);
+      } catch (GLib.Error e) { assert_not_reached (); }
+    });
     Test.add_func ("/gflow/sink/source", 
     () => {
       Value initial = Value(typeof(int));
@@ -85,5 +122,32 @@ public class GFlowTest.SinkTest
       src.val = "text";
       assert (((int) s.val) == 10);
     });
+    Test.add_func ("/gflow/sink/source/conversion",
+    () => {
+      try {
+        var src = new GFlow.SimpleSource (0);
+        var number = new GFlow.SimpleSink (0.0);
+        var text = new GFlow.SimpleSink ("");
+        number.connect (src);
+        text.connect (src);
+        src.set_value (3);
+        assert (number.val.get_double () == 3.0);
+        assert (text.val.get_string () == "3");
+        assert (GFlow.can_convert (typeof (int), typeof (double)));
+        assert (!GFlow.can_convert (typeof (double), typeof (int)));
+        var whole = new GFlow.SimpleSink (0);
+        try {
+          whole.connect (new GFlow.SimpleSource (0.5));
+          assert_not_reached ();
+        } catch (GFlow.NodeError e) {}
+        GFlow.register_conversion (typeof (double), typeof (int));
+        var half = new GFlow.SimpleSource (0.0);
+        whole.connect (half);
+        half.set_value (2.5);
+        assert (whole.val.get_int () == 2);
+        GFlow.unregister_conversion (typeof (double), typeof (int));
+        assert (!GFlow.can_convert (typeof (double), typeof (int)));
+      } catch (GLib.Error e) { assert_not_reached (); }
+    });
   }
 }
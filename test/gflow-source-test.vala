@@ -33,6 +33,15 @@ public class GFlowTest.Source : GFlow.SimpleSource
 
 public class GFlowTest.SourceTest
 {
+  private static async void read_all (GFlow.StreamSink sink, ByteArray received)
+  {
+    try {
+      Bytes? chunk;
+      while ((chunk = yield sink.read_async ()) != null)
+        received.append (chunk.get_data ());
+    } catch (GLib.Error e) { assert_not_reached (); }
+  }
+
   public static void add_tests ()
   {
     Test.add_func ("/gflow/source", 
@@ -61,5 +70,229 @@ public class GFlowTest.SourceTest
       assert (src.val.get_boolean ());
       assert (!src.is_connected ());
     });
+    Test.add_func ("/gflow/source/fan-out",
+    () => {
+      try {
+        var src = new GFlow.SimpleSource (0);
+        var sinks = new GenericArray<GFlow.SimpleSink> ();
+        for (int i = 0; i < 500; i++) {
+          var snk = new GFlow.SimpleSink (0);
+          snk.connect (src);
+          sinks.add (snk);
+        }
+        assert (src.sinks.length () == 500);
+        assert (src.is_connected_to (sinks[250]));
+        sinks[250].disconnect (src);
+        assert (!src.is_connected_to (sinks[250]));
+        assert (src.is_connected_to (sinks[251]));
+        // Connection order is kept
+        assert (src.sinks.nth_data (249) == sinks[249]);
+        assert (src.sinks.nth_data (250) == sinks[251]);
+        src.disconnect_all ();
+        assert (!src.is_connected ());
+      } catch (GLib.Error e) { assert_not_reached (); }
+    });
+    Test.add_func ("/gflow/source/coalesce",
+    () => {
+      try {
+        var src = new GFlow.SimpleSource (0);
+        src.update_policy = GFlow.UpdatePolicy.COALESCE;
+        var snk = new GFlow.SimpleSink (0);
+        snk.connect (src);
+        int updates = 0;
+        src.updated.connect (() => { updates++; });
+        for (int i = 1; i <= 100; i++)
+          src.set_value (i);
+        assert (updates == 0);
+        assert (snk.val.get_int () == 0);
+        while (MainContext.default ().iteration (false));
+        assert (updates == 1);
+        assert (snk.val.get_int () == 100);
+        src.set_value (101);
+        src.flush ();
+        assert (updates == 2);
+        assert (snk.val.get_int () == 101);
+      } catch (GLib.Error e) { assert_not_reached (); }
+    });
+    Test.add_func ("/gflow/source/throttle",
+    () => {
+      try {
+        var src = new GFlow.SimpleSource (0);
+        src.update_policy = GFlow.UpdatePolicy.THROTTLE;
+        src.update_interval = 50;
+        var snk = new GFlow.SimpleSink (0);
+        snk.connect (src);
+        int updates = 0;
+        var loop = new MainLoop ();
+        src.updated.connect (() => {
+          if (++updates == 2)
+            loop.quit ();
+        });
+        // The first value is passed on right away
+        for (int i = 1; i <= 3; i++)
+          src.set_value (i);
+        assert (updates == 1);
+        assert (snk.val.get_int () == 1);
+        // The latest one at the end of the interval
+        uint watchdog = Timeout.add_seconds (5, () => {
+          assert_not_reached ();
+        });
+        loop.run ();
+        Source.remove (watchdog);
+        assert (updates == 2);
+        assert (snk.val.get_int () == 3);
+      } catch (GLib.Error e) { assert_not_reached (); }
+    });
+    Test.add_func ("/gflow/source/debounce",
+    () => {
+      try {
+        var src = new GFlow.SimpleSource (0);
+        src.update_policy = GFlow.UpdatePolicy.DEBOUNCE;
+        src.update_interval = 10;
+        var snk = new GFlow.SimpleSink (0);
+        snk.connect (src);
+        int updates = 0;
+        var loop = new MainLoop ();
+        src.updated.connect (() => {
+          updates++;
+          loop.quit ();
+        });
+        for (int i = 1; i <= 3; i++)
+          src.set_value (i);
+        assert (updates == 0);
+        src.flush ();
+        assert (updates == 1);
+        assert (snk.val.get_int () == 3);
+        src.flush ();
+        assert (updates == 1);
+        // Without flushing, the value is passed on once the source is quiet
+        src.set_value (4);
+        src.set_value (5);
+        uint watchdog = Timeout.add_seconds (5, () => {
+          assert_not_reached ();
+        });
+        loop.run ();
+        Source.remove (watchdog);
+        assert (updates == 2);
+        assert (snk.val.get_int () == 5);
+      } catch (GLib.Error e) { assert_not_reached (); }
+    });
+    Test.add_func ("/gflow/source/buffer",
+    () => {
+      try {
+        var src = new GFlow.BufferSource (GFlow.ElementType.DOUBLE);
+        var a = new GFlow.BufferSink (GFlow.ElementType.DOUBLE);
+        var b = new GFlow.BufferSink (GFlow.ElementType.DOUBLE);
+        a.connect (src);
+        b.connect (src);
+        double[] data = { 1.0, 2.0, 3.0 };
+        var raw = new uint8[data.length * sizeof (double)];
+        Memory.copy (raw, data, raw.length);
+        src.set_buffer (new Bytes.take ((owned) raw));
+        assert (a.n_elements == 3);
+        // All sinks share the buffer of the source
+        assert (a.buffer == src.buffer);
+        assert (b.buffer == src.buffer);
+        var back = new double[3];
+        Memory.copy (back, a.buffer.get_data (), 3 * sizeof (double));
+        assert (back[2] == 3.0);
+        var c = new GFlow.BufferSink (GFlow.ElementType.FLOAT);
+        try {
+          c.connect (src);
+          assert_not_reached ();
+        } catch (GFlow.NodeError e) {}
+        try {
+          src.set_buffer (new Bytes ({ 1, 2, 3 }));
+          assert_not_reached ();
+        } catch (GFlow.NodeError e) {}
+      } catch (GLib.Error e) { assert_not_reached (); }
+    });
+    Test.add_func ("/gflow/source/stream",
+    () => {
+      try {
+        var src = new GFlow.StreamSource ();
+        src.chunk_size = 4;
+        var fast = new GFlow.StreamSink ();
+        var slow = new GFlow.StreamSink ();
+        slow.capacity = 2;
+        fast.connect (src);
+        slow.connect (src);
+        try {
+          new GFlow.SimpleSink (0).connect (src);
+          assert_not_reached ();
+        } catch (GFlow.NodeError e) {}
+        assert (src.try_write (new Bytes ("abcdefgh".data)));
+        assert (fast.length == 2);
+        // The slow sink is full, so the producer is held back
+        assert (!src.try_write (new Bytes ("ijkl".data)));
+        assert (fast.pop ().compare (new Bytes ("abcd".data)) == 0);
+        assert (fast.length == 1);
+        var loop = new MainLoop ();
+        var received = new ByteArray ();
+        src.write_async.begin (new Bytes ("ijklmnop".data), null, (obj, res) => {
+          try {
+            src.write_async.end (res);
+            src.close ();
+          } catch (GLib.Error e) { assert_not_reached (); }
+        });
+        read_all.begin (slow, received, (obj, res) => {
+          read_all.end (res);
+          loop.quit ();
+        });
+        uint watchdog = Timeout.add_seconds (5, () => {
+          assert_not_reached ();
+        });
+        loop.run ();
+        Source.remove (watchdog);
+        received.append ({ 0 });
+        assert ((string) received.data == "abcdefghijklmnop");
+        assert (slow.at_end);
+        assert (fast.length == 3);
+      } catch (GLib.Error e) { assert_not_reached (); }
+    });
+    Test.add_func ("/gflow/source/stream-wakeup",
+    () => {
+      try {
+        var src = new GFlow.StreamSource ();
+        var full = new GFlow.StreamSink ();
+        full.capacity = 1;
+        full.connect (src);
+        assert (src.try_write (new Bytes ("a".data)));
+        var loop = new MainLoop ();
+        bool written = false;
+        // Disconnecting the full sink lets the writer go on
+        src.write_async.begin (new Bytes ("b".data), null, (obj, res) => {
+          try {
+            src.write_async.end (res);
+            written = true;
+          } catch (GLib.Error e) { assert_not_reached (); }
+          loop.quit ();
+        });
+        src.disconnect (full);
+        uint watchdog = Timeout.add_seconds (5, () => {
+          assert_not_reached ();
+        });
+        loop.run ();
+        assert (written);
+        // Closing the stream makes a waiting writer fail
+        full = new GFlow.StreamSink ();
+        full.capacity = 1;
+        full.connect (src);
+        assert (src.try_write (new Bytes ("c".data)));
+        bool failed = false;
+        src.write_async.begin (new Bytes ("d".data), null, (obj, res) => {
+          try {
+            src.write_async.end (res);
+          } catch (IOError.CLOSED e) {
+            failed = true;
+          } catch (GLib.Error e) { assert_not_reached (); }
+          loop.quit ();
+        });
+        src.close ();
+        loop.run ();
+        Source.remove (watchdog);
+        assert (failed);
+      } catch (GLib.Error e) { assert_not_reached (); }
+    });
   }
 }
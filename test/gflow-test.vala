@@ -28,6 +28,8 @@ class GFlowTest.Main {
 		SinkTest.add_tests ();
 		DockTest.add_tests ();
 		NodeTest.add_tests ();
+		GraphTest.add_tests ();
+		GraphIOTest.add_tests ();
 		Test.run ();
 		return 0;
 	}
@@ -1,8 +1,21 @@
 #!/usr/bin/python3
 
+import gc
+import os
+import shutil
+import tempfile
+import time
 import unittest
 
+import cairo
+
+import gi
+gi.require_version("Gtk", "3.0")
 from gi.repository import GLib
+from gi.repository import Gdk
+from gi.repository import Gio
+from gi.repository import GObject
+from gi.repository import Gtk
 from gi.repository import GtkFlow
 
 """
@@ -19,6 +32,10 @@ class TestNode(unittest.TestCase):
         node2 = GtkFlow.Node.new()
         node2_src = GtkFlow.Source.new(0)
         node2_snk = GtkFlow.Sink.new(0)
+        node1.add_source(node1_src)
+        node1.add_sink(node1_snk)
+        node2.add_source(node2_src)
+        node2.add_sink(node2_snk)
         node1_src.add_sink(node2_snk)
         self.assertTrue(node1_src.connected_to(node2_snk))
         with self.assertRaises(GLib.Error) as err:
@@ -29,6 +46,388 @@ class TestNode(unittest.TestCase):
         self.assertFalse(node1_src.connected_to(node2_snk))
         node2_src.add_sink(node1_snk)
         self.assertTrue(node2_src.connected_to(node1_snk))
-        
 
+    """
+    Test recursion checks on a long chain of nodes
+    """
+    def test_recursion_chain(self):
+        nodes, sources, sinks = [], [], []
+        for i in range(0, 2000):
+            node = GtkFlow.Node.new()
+            src = GtkFlow.Source.new(0)
+            snk = GtkFlow.Sink.new(0)
+            node.add_source(src)
+            node.add_sink(snk)
+            nodes.append(node)
+            sources.append(src)
+            sinks.append(snk)
+        # Connect the chain back to front to force the order to be updated
+        for i in reversed(range(0, len(nodes)-1)):
+            sources[i].add_sink(sinks[i+1])
+        self.assertTrue(nodes[0].is_recursive(nodes[-1], True))
+        self.assertFalse(nodes[-1].is_recursive(nodes[0], True))
+        with self.assertRaises(GLib.Error) as err:
+            sources[-1].add_sink(sinks[0])
+        self.assertFalse(sources[-1].connected_to(sinks[0]))
+
+    """
+    Test that dock positions follow the docks when the node changes
+    """
+    def test_dock_position(self):
+        node = GtkFlow.Node.new()
+        sinks = [GtkFlow.Sink.new(0) for i in range(0, 3)]
+        sources = [GtkFlow.Source.new(0) for i in range(0, 2)]
+        for s in sinks:
+            node.add_sink(s)
+        for s in sources:
+            node.add_source(s)
+        ys = [node.get_dock_position(d).y for d in sinks + sources]
+        self.assertEqual(ys, sorted(ys))
+        self.assertLess(node.get_dock_position(sinks[0]).x,
+                        node.get_dock_position(sources[0]).x)
+        height = node.get_min_height()
+
+        node.remove_sink(sinks[1])
+        self.assertEqual(node.get_dock_position(sinks[2]).y, ys[1])
+        self.assertLess(node.get_min_height(), height)
+        with self.assertRaises(GLib.Error) as err:
+            node.get_dock_position(sinks[1])
+
+    def allocation(self, x, y, width, height):
+        alloc = Gdk.Rectangle()
+        alloc.x, alloc.y, alloc.width, alloc.height = x, y, width, height
+        return alloc
+
+    """
+    Test that a view finds its nodes on their positions after they have
+    been moved, resized and removed
+    """
+    def test_node_lookup(self):
+        view = GtkFlow.NodeView.new()
+        bottom = GtkFlow.Node.new()
+        top = GtkFlow.Node.new()
+        view.add(bottom)
+        view.add(top)
+        bottom.set_node_allocation(self.allocation(0, 0, 300, 200))
+        top.set_node_allocation(self.allocation(1000, 1000, 300, 200))
+        self.assertEqual(view.get_node_on_position(50, 50), bottom)
+        self.assertEqual(view.get_node_on_position(1050, 1050), top)
+        self.assertIsNone(view.get_node_on_position(600, 600))
+
+        top.set_position(100, 100)
+        self.assertIsNone(view.get_node_on_position(1050, 1050))
+        self.assertEqual(view.get_node_on_position(50, 50), bottom)
+        # The node added last is on top
+        self.assertEqual(view.get_node_on_position(150, 150), top)
+
+        bottom.set_node_allocation(self.allocation(0, 0, 600, 600))
+        self.assertEqual(view.get_node_on_position(550, 550), bottom)
+        self.assertEqual(view.get_node_on_position(150, 150), top)
+
+        view.remove(top)
+        self.assertEqual(view.get_node_on_position(150, 150), bottom)
+        view.remove(bottom)
+        self.assertIsNone(view.get_node_on_position(150, 150))
+
+    """
+    Test that only the nodes within an area are found, bottom to top
+    """
+    def test_nodes_in_area(self):
+        view = GtkFlow.NodeView.new()
+        nodes = [GtkFlow.Node.new() for i in range(0, 3)]
+        for node in nodes:
+            view.add(node)
+        nodes[0].set_node_allocation(self.allocation(0, 0, 300, 200))
+        nodes[1].set_node_allocation(self.allocation(1000, 0, 300, 200))
+        nodes[2].set_node_allocation(self.allocation(100, 100, 300, 200))
+        self.assertEqual(view.get_nodes_in_area(0, 0, 500, 500), [nodes[0], nodes[2]])
+        self.assertEqual(view.get_nodes_in_area(350, 250, 10, 10), [nodes[2]])
+        self.assertEqual(view.get_nodes_in_area(2000, 2000, 10, 10), [])
+        # Larger than the grid, so every node is looked at
+        self.assertEqual(view.get_nodes_in_area(-100000, -100000, 200000, 200000), nodes)
+
+    """
+    Test that a frozen view resizes its nodes only when thawed
+    """
+    def test_freeze(self):
+        view = GtkFlow.NodeView.new()
+        node = GtkFlow.Node.new()
+        view.add(node)
+        height = node.get_node_allocation().height
+        view.freeze()
+        self.assertTrue(view.props.frozen)
+        for i in range(0, 20):
+            node.add_sink(GtkFlow.Sink.new(0))
+        self.assertEqual(node.get_node_allocation().height, height)
+        view.thaw()
+        self.assertFalse(view.props.frozen)
+        self.assertEqual(node.get_node_allocation().height, node.get_min_height())
+
+    """
+    Test that a frozen view passes on only the latest value,
+    once to every sink, when it is thawed
+    """
+    def test_freeze_values(self):
+        view = GtkFlow.NodeView.new()
+        producer = GtkFlow.Node.new()
+        src = GtkFlow.Source.new(0)
+        producer.add_source(src)
+        src.set_valid()
+        src.set_value(1)
+        view.add(producer)
+        changes = []
+        sinks = []
+        for i in range(0, 10):
+            node = GtkFlow.Node.new()
+            snk = GtkFlow.Sink.new(0)
+            snk.connect("changed", lambda dock, val: changes.append(val))
+            node.add_sink(snk)
+            view.add(node)
+            sinks.append(snk)
+
+        view.freeze()
+        for snk in sinks:
+            src.add_sink(snk)
+        src.set_value(2)
+        src.set_value(3)
+        self.assertEqual(changes, [])
+        view.thaw()
+        self.assertEqual(changes, [3] * len(sinks))
+        for snk in sinks:
+            self.assertEqual(snk.get_value(), 3)
+
+    """
+    Test that a node built before it is added to a view lays itself
+    out and receives values only when it is thawed
+    """
+    def test_freeze_node(self):
+        src = GtkFlow.Source.new(0)
+        src.set_valid()
+        src.set_value(5)
+        node = GtkFlow.Node.new()
+        height = node.get_node_allocation().height
+        changes = []
+        node.freeze()
+        self.assertTrue(node.props.frozen)
+        for i in range(0, 5):
+            snk = GtkFlow.Sink.new(0)
+            snk.connect("changed", lambda dock, val: changes.append(val))
+            node.add_sink(snk)
+            snk.set_label("in %d" % i)
+            src.add_sink(snk)
+        self.assertEqual(changes, [])
+        self.assertEqual(node.get_node_allocation().height, height)
+        node.thaw()
+        self.assertFalse(node.props.frozen)
+        self.assertEqual(changes, [5] * 5)
+        self.assertEqual(node.get_node_allocation().height, node.get_min_height())
+
+    """
+    Test that a view lets go of the nodes removed from it
+    """
+    def test_remove_releases_node(self):
+        view = GtkFlow.NodeView.new()
+        node = GtkFlow.Node.new()
+        node.add_sink(GtkFlow.Sink.new(0))
+        view.add(node)
+        finalized = []
+        node.weak_ref(lambda: finalized.append(True))
+        view.remove(node)
+        del node
+        gc.collect()
+        self.assertEqual(finalized, [True])
+        self.assertEqual(len(view.get_nodes()), 0)
+
+    """
+    Test that the cached rendering of a node is dropped when its title,
+    the highlight of a dock or its size changes, but not when it moves
+    """
+    def test_render_cache(self):
+        view = GtkFlow.NodeView.new()
+        view.props.cache_node_surfaces = True
+        node = GtkFlow.Node.new()
+        sink = GtkFlow.Sink.new(0)
+        node.add_sink(sink)
+        view.add(node)
+        surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, 400, 300)
+        def draw():
+            node.draw_node(cairo.Context(surface))
+            self.assertTrue(node.props.render_cached)
+
+        draw()
+        node.set_title("renamed")
+        self.assertFalse(node.props.render_cached)
+        draw()
+        sink.props.highlight = True
+        self.assertFalse(node.props.render_cached)
+        draw()
+        alloc = node.get_node_allocation()
+        node.set_node_allocation(self.allocation(alloc.x, alloc.y, alloc.width + 50, alloc.height))
+        self.assertFalse(node.props.render_cached)
+        draw()
+        node.set_position(20, 20)
+        self.assertTrue(node.props.render_cached)
+
+    """
+    Test that icons are loaded once per name, size and scale factor
+    """
+    def test_icon_cache(self):
+        directory = tempfile.mkdtemp()
+        try:
+            icon = cairo.ImageSurface(cairo.FORMAT_ARGB32, 16, 16)
+            cr = cairo.Context(icon)
+            cr.set_source_rgb(0, 1, 0)
+            cr.paint()
+            icon.write_to_png(os.path.join(directory, "gtkflow-test-icon.png"))
+            theme = Gtk.IconTheme.new()
+            theme.append_search_path(directory)
+            cache = GtkFlow.IconCache()
+            cache.props.icon_theme = theme
+
+            def pixel(surface):
+                surface.flush()
+                return bytes(surface.get_data()[0:4])
+
+            # Paint over the cached surface, only that one shows it
+            surface = cache.get_surface("gtkflow-test-icon", 16, None)
+            cr = cairo.Context(surface)
+            cr.set_source_rgb(1, 0, 0)
+            cr.paint()
+            marked = pixel(surface)
+            self.assertEqual(pixel(cache.get_surface("gtkflow-test-icon", 16, None)), marked)
+            self.assertNotEqual(pixel(cache.get_surface("gtkflow-test-icon", 24, None)), marked)
+            cache.props.scale = 2
+            self.assertNotEqual(pixel(cache.get_surface("gtkflow-test-icon", 16, None)), marked)
+            self.assertIsNone(cache.get_surface("gtkflow-missing-icon", 16, None))
+        finally:
+            shutil.rmtree(directory)
+
+    """
+    Test that a view survives writing and reading it
+    """
+    def test_write_read(self):
+        view = GtkFlow.NodeView.new()
+        node1 = GtkFlow.Node.new()
+        node1.set_title("first")
+        src = GtkFlow.Source.new(0)
+        src.set_label("out")
+        node1.add_source(src)
+        node2 = GtkFlow.Node.new()
+        snk = GtkFlow.Sink.new(0)
+        snk.set_label("in")
+        node2.add_sink(snk)
+        view.add(node1)
+        view.add(node2)
+        node2.set_position(300, 40)
+        src.add_sink(snk)
+
+        stream = Gio.MemoryOutputStream.new_resizable()
+        GtkFlow.GraphWriter().write(view, stream, None)
+        stream.close(None)
+        data = stream.steal_as_bytes()
+
+        loaded = GtkFlow.NodeView.new()
+        GtkFlow.GraphReader().read(loaded, Gio.MemoryInputStream.new_from_bytes(data), None)
+        nodes = {n.get_title(): n for n in loaded.get_nodes()}
+        self.assertEqual(len(nodes), 2)
+        first = nodes["first"]
+        second = [n for t, n in nodes.items() if t != "first"][0]
+        self.assertEqual(second.get_node_allocation().x, 300)
+        self.assertEqual(second.get_node_allocation().y, 40)
+        loaded_src = first.get_sources()[0]
+        loaded_snk = second.get_sinks()[0]
+        self.assertEqual(loaded_src.get_label(), "out")
+        self.assertTrue(loaded_src.connected_to(loaded_snk))
+
+    """
+    Test that a profiling view records the evaluations of its nodes
+    """
+    def test_profiling(self):
+        view = GtkFlow.NodeView.new()
+        view.props.profiling = True
+        node1 = GtkFlow.Node.new()
+        node1.set_title("producer")
+        src = GtkFlow.Source.new(0)
+        node1.add_source(src)
+        node2 = GtkFlow.Node.new()
+        node2.set_title("consumer")
+        snk = GtkFlow.Sink.new(0)
+        node2.add_sink(snk)
+        view.add(node1)
+        view.add(node2)
+        src.add_sink(snk)
+        src.set_value(1)
+        src.set_value(2)
+
+        profiler = view.props.profiler
+        self.assertEqual(profiler.props.propagations, 2)
+        self.assertEqual(profiler.props.last_fan_out, 1)
+        self.assertIsNone(profiler.get_stats(node1))
+        self.assertEqual(profiler.get_stats(node2).props.evaluations, 2)
+        self.assertEqual(profiler.get_cost(node1), -1.0)
+        self.assertGreaterEqual(profiler.get_cost(node2), 0.0)
+
+        stream = Gio.MemoryOutputStream.new_resizable()
+        profiler.write_trace(stream, None)
+        stream.close(None)
+        trace = stream.steal_as_bytes().get_data().decode()
+        self.assertIn("consumer", trace)
+
+    """
+    Test that costs are relative to the most expensive remaining node
+    """
+    def test_profiling_cost(self):
+        view = GtkFlow.NodeView.new()
+        view.props.profiling = True
+        producer = GtkFlow.Node.new()
+        src = GtkFlow.Source.new(0)
+        src.set_valid()
+        producer.add_source(src)
+        view.add(producer)
+        consumers = []
+        for delay in (0.002, 0.02):
+            node = GtkFlow.Node.new()
+            snk = GtkFlow.Sink.new(0)
+            GObject.Object.connect(snk, "changed", lambda sink, value, delay=delay: time.sleep(delay))
+            node.add_sink(snk)
+            view.add(node)
+            src.add_sink(snk)
+            consumers.append(node)
+        src.set_value(1)
+
+        profiler = view.props.profiler
+        cheap, expensive = consumers
+        self.assertEqual(profiler.get_cost(expensive), 1.0)
+        self.assertLess(profiler.get_cost(cheap), 1.0)
+        view.remove(expensive)
+        self.assertIsNone(profiler.get_stats(expensive))
+        self.assertEqual(profiler.get_cost(cheap), 1.0)
+
+    """
+    Test that zooming is clamped and that a minimap follows its view
+    """
+    def test_zoom(self):
+        view = GtkFlow.NodeView.new()
+        self.assertEqual(view.props.zoom, 1.0)
+        view.props.zoom = 0.25
+        self.assertEqual(view.props.zoom, 0.25)
+        self.assertLess(view.props.zoom, view.props.detail_zoom)
+        view.props.zoom = 0
+        self.assertEqual(view.props.zoom, 0.01)
+        view.props.zoom = 100
+        self.assertEqual(view.props.zoom, 4.0)
+
+        minimap = GtkFlow.Minimap.new(view)
+        self.assertEqual(minimap.props.nodeview, view)
+        minimap.props.nodeview = None
+        self.assertIsNone(minimap.props.nodeview)
 
+    def test_minimap_releases_view(self):
+        view = GtkFlow.NodeView.new()
+        minimap = GtkFlow.Minimap.new(view)
+        released = []
+        view.weak_ref(lambda: released.append(True))
+        del view
+        gc.collect()
+        self.assertEqual(released, [True])
+        self.assertIsNone(minimap.props.nodeview)
@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python"))
+
+from gi.repository import GLib
+from gi.repository import GFlow
+
+from gtkflow import multiprocess
+from gtkflow.multiprocess import Partition, ProcessNode, wait
+
+# Workers import the functions by name, so they live at the top level
+
+def square(inputs):
+    return {"y": inputs["x"] * inputs["x"]}
+
+def add_one(inputs):
+    return {"y": inputs["x"] + 1}
+
+def reverse(inputs):
+    return {"data": bytes(inputs["data"])[::-1]}
+
+def fail(inputs):
+    raise ValueError("failed on purpose")
+
+class TestMultiprocess(unittest.TestCase):
+    """
+    Tests nodes computed in worker processes
+    """
+    @classmethod
+    def tearDownClass(cls):
+        multiprocess.shutdown()
+
+    def create_graph(self, initial, *nodes):
+        graph = GFlow.Graph()
+        feeder = GFlow.SimpleNode()
+        src = GFlow.SimpleSource.new(initial)
+        feeder.add_source(src)
+        graph.add_node(feeder)
+        for node in nodes:
+            graph.add_node(node)
+        return graph, src
+
+    def test_partition(self):
+        sq = ProcessNode(square, {"x": 0}, {"y": 0})
+        inc = ProcessNode(add_one, {"x": 0}, {"y": 0})
+        inc.inputs["x"].connect(sq.outputs["y"])
+        partition = Partition([sq, inc])
+        graph, src = self.create_graph(0, sq, inc)
+        sq.inputs["x"].connect(src)
+        src.set_value(7)
+        wait([partition])
+        self.assertEqual(sq.outputs["y"].props.val, 49)
+        self.assertEqual(inc.outputs["y"].props.val, 50)
+        self.assertEqual(partition.runs, 1)
+
+    def test_shared_memory(self):
+        payload = bytes(range(256)) * 4096
+        node = ProcessNode(reverse, {"data": b""}, {"data": b""})
+        graph, src = self.create_graph(GLib.Bytes.new(b""), node)
+        node.inputs["data"].connect(src)
+        src.set_value(GLib.Bytes.new(payload))
+        wait([node.partition])
+        self.assertIsNone(node.partition.last_error)
+        self.assertEqual(node.outputs["data"].props.val.get_data(), payload[::-1])
+
+    def test_failure(self):
+        node = ProcessNode(fail, {"x": 0}, {"y": 0})
+        graph, src = self.create_graph(0, node)
+        node.inputs["x"].connect(src)
+        src.set_value(1)
+        wait([node.partition])
+        self.assertIsInstance(node.partition.last_error, ValueError)
+        self.assertFalse(node.outputs["y"].props.valid)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python"))
+
+from gi.repository import GLib
+from gi.repository import GFlow
+
+from gtkflow.streams import achunks, awrite, chunks
+
+class TestStreams(unittest.TestCase):
+    def create_stream(self, capacity):
+        src = GFlow.StreamSource.new()
+        src.props.chunk_size = 4
+        snk = GFlow.StreamSink.new()
+        snk.props.capacity = capacity
+        snk.connect(src)
+        return src, snk
+
+    """
+    Tests that the chunks of a closed stream can be iterated
+    """
+    def test_chunks(self):
+        src, snk = self.create_stream(4)
+        self.assertTrue(src.try_write(GLib.Bytes.new(b"abcdefghij")))
+        src.close()
+        self.assertEqual(list(chunks(snk)), [b"abcd", b"efgh", b"ij"])
+
+    """
+    Tests that a producer waits for a slow consumer
+    """
+    def test_backpressure(self):
+        src, snk = self.create_stream(1)
+        received = []
+
+        async def produce():
+            await awrite(src, b"0123456789abcdef")
+            src.close()
+
+        async def consume():
+            async for chunk in achunks(snk):
+                self.assertLessEqual(snk.props.length, 1)
+                received.append(chunk)
+                await asyncio.sleep(0)
+
+        async def main():
+            await asyncio.gather(produce(), consume())
+
+        asyncio.run(main())
+        self.assertEqual(b"".join(received), b"0123456789abcdef")
+        self.assertEqual(len(received), 4)
@@ -3,6 +3,11 @@
 import unittest
 
 from dock import TestSinkSource
+from node import TestNode
+from aio import TestLatestValueRunner, TestAsyncNode
+from buffers import TestBufferDocks
+from streams import TestStreams
+from process_pool import TestMultiprocess
 
 if __name__ == "__main__":
     unittest.main()